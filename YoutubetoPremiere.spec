@@ -6,7 +6,12 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('app/sounds', 'sounds'), ('app/exec', 'exec')],
-    hiddenimports=['engineio.async_drivers.threading', 'socketio'],
+    hiddenimports=['engineio.async_drivers.threading', 'socketio',
+                   # SERVER_MODE 'asgi': uvicorn loads its loop/protocol modules by name
+                   'engineio.async_drivers.asgi', 'uvicorn.loops.auto', 'uvicorn.loops.asyncio',
+                   'uvicorn.protocols.http.auto', 'uvicorn.protocols.http.h11_impl',
+                   'uvicorn.protocols.websockets.auto', 'uvicorn.protocols.websockets.wsproto_impl',
+                   'uvicorn.lifespan.off', 'uvicorn.logging', 'a2wsgi'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
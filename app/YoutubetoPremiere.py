@@ -1,3 +1,11 @@
+import multiprocessing
+# Download worker processes (worker_pool) are started from this executable:
+# hand them over before any of the server setup below runs
+multiprocessing.freeze_support()
+
+import startup_profile
+startup_profile.enable_if_requested()
+
 import os
 import time
 import logging
@@ -7,16 +15,21 @@ import sys
 import socket
 from flask_cors import CORS
 from flask import Flask, request, jsonify
-from flask_socketio import SocketIO
 from routes import register_routes
-from utils import load_settings, monitor_premiere_and_shutdown, play_notification_sound, get_temp_dir, clear_temp_files, check_ffmpeg
+from utils import load_settings, remember_ffmpeg_path, monitor_premiere_and_shutdown, get_temp_dir, clear_temp_files, check_ffmpeg
+import import_batcher
+import sound_player
+import settings_store
+import warmup
+import ytdlp_cache
+import bandwidth
+import job_journal
+import job_metrics
 import re
 import subprocess
-import requests
 from pathlib import Path
-import app_init
 import tempfile
-from datetime import datetime
+from config import APP_VERSION, SERVER_MODE
 
 # Add Deno to PATH for yt-dlp External JavaScript Runtime support
 # This ensures Deno is available even if the terminal wasn't restarted after installation
@@ -69,8 +82,9 @@ def clear_previous_logs():
     except Exception as e:
         print(f"Warning: Could not clear previous logs: {e}")
 
-# Clear logs before setting up new logging
-clear_previous_logs()
+# Clear logs before setting up new logging (not when re-imported by a spawned download worker)
+if __name__ != '__mp_main__':
+    clear_previous_logs()
 
 # Configure logging with file and console handlers
 console_handler = logging.StreamHandler(sys.stdout)
@@ -114,44 +128,11 @@ logging.basicConfig(
 # Store log directory for later use
 os.environ['YTPP_LOG_DIR'] = log_dir
 
-def write_test_log():
-    """Write a test log to verify file logging works"""
-    try:
-        # Write session header and test to main log
-        session_header = f"""
-{'='*60}
-SESSION STARTED: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-YouTube to Premiere Pro Extension v3.0.22
-{'='*60}
-"""
-        with open(main_log_file, 'a', encoding='utf-8') as f:
-            f.write(session_header)
-            f.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - TEST - INFO - Logging system initialized\n")
-            f.flush()
-        
-        # Write session header to error log
-        with open(error_log_file, 'a', encoding='utf-8') as f:
-            f.write(session_header)
-            f.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - TEST - ERROR - Error logging initialized\n")
-            f.flush()
-    except Exception as e:
-        print(f"Failed to write test log: {e}")
-
-# Test direct file writing first
-write_test_log()
-
+logging.info(f"Session started - YouTube to Premiere Pro Extension v{APP_VERSION}")
 logging.info(f"Logging initialized. Log directory: {log_dir}")
 logging.info(f"Main log file: {main_log_file}")
 logging.info(f"Error log file: {error_log_file}")
 
-# Force an error log to test error handler
-logging.error("Test error log entry - this should appear in errors.log")
-
-# Manual flush of all handlers
-for handler in logging.getLogger().handlers:
-    if hasattr(handler, 'flush'):
-        handler.flush()
-
 # Set higher log levels for verbose libraries
 logging.getLogger('engineio.server').setLevel(logging.ERROR)
 logging.getLogger('socketio.server').setLevel(logging.ERROR)
@@ -234,19 +215,9 @@ logging.info(f'Python version: {sys.version}')
 logging.info(f'Platform: {platform.platform()}')
 logging.info(f'Process ID: {os.getpid()}')
 
-# Log yt-dlp version
-try:
-    import yt_dlp
-    logging.info(f'yt-dlp version: {yt_dlp.version.__version__}')
-except Exception as e:
-    logging.warning(f'Could not determine yt-dlp version: {e}')
-
 # Get and log all application paths (but hide sensitive user paths)
 paths = get_app_paths()
 
-# Setup Deno for YouTube challenge solver
-app_init.setup_deno_path()
-
 # Add ffmpeg to PATH - look in multiple possible locations
 script_dir = paths['script_dir']
 possible_ffmpeg_locations = [
@@ -300,9 +271,8 @@ try:
     app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max-limit
     app.config['PROPAGATE_EXCEPTIONS'] = True
 
-    socketio = SocketIO(app, 
+    socketio_options = dict(
         cors_allowed_origins="*",
-        async_mode='threading',  # Use threading mode (gevent not available in PyInstaller build)
         ping_timeout=60,  # Match client timeout
         ping_interval=25,  # Match client interval (in seconds, not ms)
         max_http_buffer_size=100 * 1024 * 1024,  # Increased to 100MB buffer
@@ -320,8 +290,21 @@ try:
         # Additional server stability options
         cors_credentials=False
     )
+    server_mode = os.environ.get('YTPP_SERVER_MODE', SERVER_MODE)
+    if server_mode == 'asgi':
+        # Imported only in this mode: uvicorn is not needed by the threading server
+        import async_server
+        server_mode = async_server.server_mode()
+    if server_mode == 'asgi':
+        # One event loop instead of a thread per connection (see async_server.py)
+        socketio = async_server.AsyncSocketIO(app, **socketio_options)
+    else:
+        # Use threading mode (gevent not available in PyInstaller build)
+        from flask_socketio import SocketIO
+        socketio = SocketIO(app, async_mode='threading', **socketio_options)
 
-    logging.info("Flask and SocketIO initialized successfully")
+    logging.info(f"Flask and SocketIO initialized successfully ({type(socketio).__name__})")
+    startup_profile.mark("Flask and SocketIO initialized")
 except Exception as e:
     logging.critical(f"Failed to initialize Flask/SocketIO: {str(e)}", exc_info=True)
     sys.exit(1)
@@ -593,7 +576,7 @@ def emit_to_client_type(event, data, client_type=None):
             app_logger.warning(f'[WARN] No {client_type} clients connected to send {event} event!')
             # For critical UI events, fall back to broadcast so the client gets
             # the event even if it briefly reconnected with a new SID.
-            critical_events = {'complete', 'download-failed', 'import_failed', 'download-complete', 'download-cancelled'}
+            critical_events = {'complete', 'download-failed', 'import_failed', 'download-complete', 'download-cancelled', 'import_videos'}
             if event in critical_events:
                 app_logger.info(f'[FALLBACK] Broadcasting {event} to all clients (no {client_type} registered)')
                 socketio.emit(event, data)
@@ -659,7 +642,7 @@ def handle_progress(data):
 
 @socketio.on('import_video')
 def handle_import_video(data):
-    """Forward import events only to Premiere extension"""
+    """Queue import requests for the Premiere extension (sent in batches)"""
     try:
         path = data.get('path', '')
         if not path:
@@ -673,10 +656,7 @@ def handle_import_video(data):
             return
             
         logging.info(f"Attempting to import video: {path}")
-        emit_to_client_type('import_video', data, 'premiere')
-        
-        # Add a delay to ensure the message is sent before any potential disconnection
-        time.sleep(0.5)
+        import_batcher.queue_import(path, data.get('bin', ''))
         
     except Exception as e:
         error_msg = f"Error during import: {str(e)}"
@@ -688,19 +668,15 @@ def handle_download_complete():
     """Notify only Chrome extension of download completion"""
     emit_to_client_type('download-complete', {}, 'chrome')
 
-@socketio.on('import_complete')
-def handle_import_complete(data):
-    """Handle import completion events from CEP Premiere panel."""
+def report_import_result(data):
+    """Forward one file's import result to Chrome. Returns True on success."""
     success = data.get('success', False)
     path = data.get('path', '')
+    job_metrics.import_finished(path, success)
 
     if success:
         logging.info(f'Successfully imported video: {path}')
-        # Play notification sound
-        settings = load_settings()
-        volume = settings.get('notificationVolume', 30) / 100
-        sound_type = settings.get('notificationSound', 'default')
-        play_notification_sound(volume=volume, sound_type=sound_type)
+        job_journal.mark_imported(path)
         # Forward 'complete' ONLY to Chrome clients (not broadcast to all, which
         # would loop back to CEP and re-trigger imports).
         emit_to_client_type('complete', {'success': True, 'path': path}, 'chrome')
@@ -708,6 +684,30 @@ def handle_import_complete(data):
         error = data.get('error', 'Unknown error')
         logging.error(f'Failed to import video: {path}. Error: {error}')
         emit_to_client_type('import_failed', {'path': path, 'error': error}, 'chrome')
+    return success
+
+def play_import_sound():
+    """Play the notification sound configured in settings"""
+    # Volume and sound follow the settings store (see run_server)
+    sound_player.play_sound()
+
+@socketio.on('import_complete')
+def handle_import_complete(data):
+    """Handle import completion events from CEP Premiere panel."""
+    if report_import_result(data):
+        play_import_sound()
+
+@socketio.on('import_batch_complete')
+def handle_import_batch_complete(data):
+    """Handle a batched import reply: one ordered result per file in the batch."""
+    results = import_batcher.complete_batch(data)
+    imported = 0
+    for result in results:
+        if report_import_result(result):
+            imported += 1
+    # One notification per batch instead of one per file
+    if imported:
+        play_import_sound()
 
 @socketio.on('cancel-import')  # alias emitted by Chrome extension
 @socketio.on('cancel-download')
@@ -790,6 +790,21 @@ def handle_cancel_download(data):
         app_logger.error(f'[CANCEL] Error handling download cancellation: {str(e)}')
         emit_to_client_type('download-failed', {'message': 'Erreur lors de l\'annulation du téléchargement'}, 'chrome')
 
+@socketio.on('set-download-priority')
+def handle_set_download_priority(data):
+    """Move a running download to another bandwidth class ('clip', 'full', 'audio')"""
+    target = data.get('jobId') or data.get('url')
+    priority = data.get('priority')
+    try:
+        changed = bandwidth.set_priority(target, priority)
+    except ValueError as e:
+        app_logger.warning(f'[BANDWIDTH] {e}')
+        emit_to_client_type('download-priority', {'success': False, 'error': str(e)}, 'chrome')
+        return
+    if not changed:
+        app_logger.warning(f'[BANDWIDTH] No active download matches {target}')
+    emit_to_client_type('download-priority', {'success': bool(changed), 'jobs': changed, 'priority': priority}, 'chrome')
+
 @socketio.on('get_project_path')
 def handle_get_project_path():
     logging.info('Requesting project path from panel')
@@ -815,22 +830,92 @@ def periodic_cleanup():
     cleanup_thread.start()
     return cleanup_thread
 
+def wait_for_port(port, timeout=10):
+    """Wait until the server accepts connections on port. Returns True once bound."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return True
+        except OSError:
+            time.sleep(0.005)
+    return False
+
+def background_startup():
+    """Warm up the download engine once the port is bound (readiness shown on /health)"""
+    from routes import load_video_processing
+
+    def warm_settings():
+        load_settings(resolve_ffmpeg=False)
+        return 'loaded'
+
+    def warm_ffmpeg():
+        config = prepare_environment()
+        logging.info(f"Environment setup complete. FFmpeg path: {config.get('ffmpeg_path')}")
+        remember_ffmpeg_path(config.get('ffmpeg_path'))
+        # Same verification the first download would run (ffmpeg -version)
+        result = load_video_processing().check_ffmpeg(None, None)
+        if not result['success']:
+            raise Exception(result['message'])
+        return result['path']
+
+    def warm_ytdlp():
+        load_video_processing()
+        import yt_dlp
+        logging.info(f'yt-dlp version: {yt_dlp.version.__version__}')
+        # yt-dlp imports extractors lazily; load the YouTube one now
+        with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True,
+                               'cachedir': ytdlp_cache.get_cache_dir()}) as ydl:
+            ydl.get_info_extractor('Youtube')
+        return yt_dlp.version.__version__
+
+    def warm_ytdlp_cache():
+        stats = ytdlp_cache.prune()
+        return f"{stats['files']} files, {stats['size_mb']} MB"
+
+    def warm_js_runtime():
+        # Setup Deno for YouTube challenge solver
+        import app_init
+        app_init.setup_deno_path()
+        runtime = load_video_processing().probe_js_runtime(force=True)
+        return 'deno' if runtime['deno_working'] else 'node/android fallback'
+
+    def warm_license():
+        license_key = load_settings().get('licenseKey')
+        if not license_key:
+            return 'no license key'
+        return 'valid' if load_video_processing().validate_license(license_key) else 'invalid'
+
+    try:
+        threads = warmup.start_warmup([
+            ('settings', warm_settings, ()),
+            ('ytdlp_cache', warm_ytdlp_cache, ()),
+            ('yt_dlp', warm_ytdlp, ()),
+            ('js_runtime', warm_js_runtime, ()),
+            ('ffmpeg', warm_ffmpeg, ('settings',)),
+            ('license', warm_license, ('settings',)),
+        ])
+        for thread in threads:
+            thread.join()
+        startup_profile.mark("Warm-up complete")
+    except Exception as e:
+        logging.error(f"Error during background startup: {e}")
+    finally:
+        startup_profile.report()
+
 def run_server():
     global socketio  # Make socketio accessible to progress_hook
-    settings = load_settings()
-    
-    # Create a sanitized version of settings for logging (hide sensitive data)
-    settings_for_logging = settings.copy()
-    if 'licenseKey' in settings_for_logging and settings_for_logging['licenseKey']:
-        # Show only first 4 and last 4 characters of license key
-        license_key = settings_for_logging['licenseKey']
-        if len(license_key) > 8:
-            settings_for_logging['licenseKey'] = f"{license_key[:4]}...{license_key[-4:]}"
-        else:
-            settings_for_logging['licenseKey'] = "****"
-    
-    logging.info('Settings loaded: %s', settings_for_logging)
+    # FFmpeg is resolved in the background once the port is bound
+    # The settings store logs the (sanitized) settings on first load
+    settings = load_settings(resolve_ffmpeg=False)
     register_routes(app, socketio, settings, emit_to_client_type)
+    import_batcher.set_emit_function(emit_to_client_type)
+    import_batcher.set_result_function(report_import_result)
+
+    # Initialize the mixer and decode sounds in the background
+    sound_player.apply_sound_settings(settings)
+    settings_store.subscribe(sound_player.apply_sound_settings, keys=('notificationVolume', 'notificationSound'))
+    sound_player.start_sound_service()
 
     # Start periodic cleanup task
     cleanup_thread = periodic_cleanup()
@@ -873,6 +958,13 @@ def run_server():
     
     server_thread = threading.Thread(target=run_server_safe)
     server_thread.start()
+
+    if wait_for_port(17845):
+        bound_ms = startup_profile.mark("Port 17845 bound")
+        logging.info(f"[STARTUP] Server listening on port 17845 after {bound_ms:.0f} ms")
+    else:
+        logging.warning("[STARTUP] Port 17845 not reachable after 10 s, continuing startup anyway")
+    threading.Thread(target=background_startup, daemon=True).start()
     
     # Browser opening disabled - not needed for CEP extension
     # if sys.platform == 'darwin' and getattr(sys, 'frozen', False):
@@ -1005,7 +1097,7 @@ def progress_hook(d, socketio):
             app_logger.error(f"Error in progress hook: {e}")
 
 def setup_environment():
-    """Set up the application environment"""
+    """Check that no other server instance owns the port before starting"""
     # Check if the server is already running before starting
     logging.info("Checking if server is already running on port 17845...")
     if check_server_running(17845):
@@ -1035,8 +1127,12 @@ def setup_environment():
                 sys.exit(0)
     
     logging.info("Port 17845 is available, continuing with setup...")
-    
+    return {'ffmpeg_path': None}
+
+def prepare_environment():
+    """Resolve FFmpeg and clean temp files (runs after the server is up)"""
     # Initialize all requirements
+    import app_init
     config = app_init.init()
     
     # Set environment variables
@@ -1103,9 +1199,9 @@ def main():
         
         logging.info("Signal handlers registered for graceful shutdown")
         
-        # Set up environment first
-        config = setup_environment()
-        logging.info(f"Environment setup complete. FFmpeg path: {config.get('ffmpeg_path')}")
+        # Only check for a running instance here; the rest of the setup
+        # runs in background_startup() once the port is bound
+        setup_environment()
         
         # Start the server
         run_server()
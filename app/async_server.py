@@ -0,0 +1,176 @@
+"""
+Event-loop server mode (SERVER_MODE = 'asgi').
+
+Flask-SocketIO in 'threading' mode runs on Werkzeug, where every Socket.IO
+connection holds an OS thread: a long-poll for its whole wait, a WebSocket for
+its whole life. Here a python-socketio AsyncServer runs on uvicorn instead, so
+connections are coroutines of one asyncio loop and cost no thread. WebSocket
+is listed first. The Flask app is mounted behind it through a2wsgi, so the
+HTTP routes are unchanged and run on a pool of SERVER_HTTP_THREADS threads.
+
+AsyncSocketIO stands in for the flask_socketio.SocketIO object the rest of the
+app uses (on, on_error, on_error_default, emit, run):
+- event handlers stay plain functions. They run on a pool of
+  SERVER_HANDLER_THREADS threads, inside a Flask request context carrying
+  request.sid, so they are written the same way in both modes;
+- emit() can be called from any thread (downloads, workers, timers). The emit
+  is handed to the loop and does not wait for delivery.
+
+Without uvicorn/a2wsgi, or with YTPP_SERVER_MODE=threading, the server stays on
+Flask-SocketIO threading mode.
+"""
+import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from flask import request
+from config import SERVER_MODE, SERVER_HTTP_THREADS, SERVER_HANDLER_THREADS
+
+try:
+    import uvicorn
+    import socketio
+    from a2wsgi import WSGIMiddleware
+    ASGI_AVAILABLE = True
+except ImportError:
+    ASGI_AVAILABLE = False
+
+DEFAULT_NAMESPACE = '/'
+# Options of flask_socketio.SocketIO() that AsyncServer does not take
+_FLASK_SOCKETIO_OPTIONS = ('async_mode', 'manage_session', 'reconnection', 'reconnection_attempts',
+                           'reconnection_delay', 'reconnection_delay_max')
+
+
+def server_mode():
+    """'asgi' or 'threading', from YTPP_SERVER_MODE or SERVER_MODE and what is installed"""
+    mode = os.environ.get('YTPP_SERVER_MODE', SERVER_MODE)
+    if mode == 'asgi' and not ASGI_AVAILABLE:
+        logging.warning("[SERVER] uvicorn/a2wsgi not installed, using the threading server")
+        return 'threading'
+    return 'asgi' if mode == 'asgi' else 'threading'
+
+
+class AsyncSocketIO:
+    """The subset of flask_socketio.SocketIO the app uses, on a python-socketio AsyncServer"""
+
+    def __init__(self, app, **options):
+        self.app = app
+        for name in _FLASK_SOCKETIO_OPTIONS:
+            options.pop(name, None)
+        # Clients that can open a WebSocket get one straight away
+        options['transports'] = ['websocket', 'polling']
+        self.server = socketio.AsyncServer(async_mode='asgi', **options)
+        self.asgi_app = socketio.ASGIApp(self.server,
+                                         other_asgi_app=WSGIMiddleware(app, workers=SERVER_HTTP_THREADS))
+        self._handlers = {}           # (namespace, event) -> handler, last registration wins
+        self._error_handlers = {}     # namespace -> handler
+        self._default_error_handler = None
+        self._environ = {}            # sid -> environ of the connect request
+        self._executor = ThreadPoolExecutor(max_workers=SERVER_HANDLER_THREADS,
+                                            thread_name_prefix='socketio-handler')
+        self._loop = None
+
+    # ---- handler registration ------------------------------------------------
+
+    def on(self, event, namespace=None):
+        namespace = namespace or DEFAULT_NAMESPACE
+
+        def decorator(handler):
+            registered = (namespace, event) in self._handlers
+            self._handlers[(namespace, event)] = handler
+            if not registered:
+                self.server.on(event, self._make_async_handler(event, namespace), namespace=namespace)
+            return handler
+        return decorator
+
+    def on_error(self, namespace=None):
+        def decorator(handler):
+            self._error_handlers[namespace or DEFAULT_NAMESPACE] = handler
+            return handler
+        return decorator
+
+    def on_error_default(self, handler):
+        self._default_error_handler = handler
+        return handler
+
+    def _make_async_handler(self, event, namespace):
+        if event == 'connect':
+            async def on_connect(sid, environ, auth=None):
+                environ.setdefault('wsgi.url_scheme', 'http')
+                self._environ[sid] = environ
+                result = await self._call(namespace, event, sid, auth)
+                if result is False:
+                    self._environ.pop(sid, None)
+                return result
+            return on_connect
+        if event == 'disconnect':
+            async def on_disconnect(sid, *args):
+                try:
+                    return await self._call(namespace, event, sid)
+                finally:
+                    self._environ.pop(sid, None)
+            return on_disconnect
+
+        async def on_event(sid, *args):
+            return await self._call(namespace, event, sid, *args)
+        return on_event
+
+    async def _call(self, namespace, event, sid, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._run_handler, namespace, event, sid, args)
+
+    def _run_handler(self, namespace, event, sid, args):
+        """Run a handler like Flask-SocketIO does: in a request context with request.sid"""
+        handler = self._handlers[(namespace, event)]
+        with self.app.request_context(self._environ.get(sid) or {'wsgi.url_scheme': 'http'}):
+            request.sid = sid
+            request.namespace = namespace
+            try:
+                if event == 'connect':
+                    try:
+                        return handler(args[0])
+                    except TypeError:
+                        return handler()
+                return handler(*args)
+            except Exception as e:
+                error_handler = self._error_handlers.get(namespace, self._default_error_handler)
+                if error_handler is None:
+                    raise
+                return error_handler(e)
+
+    # ---- emitting -----------------------------------------------------------
+
+    def emit(self, event, data=None, to=None, room=None, skip_sid=None, namespace=None, callback=None):
+        """Send an event from any thread (before the server runs there is nobody to send to)"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        coroutine = self.server.emit(event, data, to=to or room, skip_sid=skip_sid,
+                                     namespace=namespace or DEFAULT_NAMESPACE, callback=callback)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            loop.create_task(coroutine)
+        else:
+            asyncio.run_coroutine_threadsafe(coroutine, loop)
+
+    # ---- serving --------------------------------------------------------------
+
+    def run(self, app, host='127.0.0.1', port=5000, **kwargs):
+        """Serve until the process exits (the Werkzeug-only keyword arguments are ignored)"""
+        config = uvicorn.Config(self.asgi_app, host=host, port=port, loop='asyncio', lifespan='off',
+                                log_level='warning', access_log=False)
+        # Bind before uvicorn loads its protocol modules: the port is taken, and
+        # connections wait in the backlog, while the loop is still starting
+        sock = config.bind_socket()
+        sock.listen(config.backlog)
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        logging.info(f"[SERVER] Event-loop server (uvicorn) listening on {host}:{port}")
+        try:
+            loop.run_until_complete(uvicorn.Server(config).serve(sockets=[sock]))
+        finally:
+            self._loop = None
+            loop.close()
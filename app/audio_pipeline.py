@@ -0,0 +1,66 @@
+"""
+Codec-aware audio handling.
+
+YouTube's itag 140 (and other m4a streams) is already AAC, which Premiere Pro
+imports as-is, so it is stream-copied. Only sources Premiere cannot read
+(opus/vorbis in webm) are transcoded to AAC, and those encodes share a small
+pool so parallel downloads do not all run FFmpeg encoders at once.
+"""
+import logging
+import threading
+import media_probe
+from contextlib import contextmanager
+from config import AUDIO_TRANSCODE_BITRATE, AUDIO_ENCODER_POOL_SIZE
+
+# Audio codecs that go into the MP4/M4A output without re-encoding
+STREAM_COPY_AUDIO_CODECS = ('aac',)
+
+_encoder_pool = threading.BoundedSemaphore(AUDIO_ENCODER_POOL_SIZE)
+
+
+def normalize_audio_codec(acodec):
+    """Map yt-dlp/FFmpeg codec names ('mp4a.40.2', 'aac', 'opus'...) to a short name"""
+    if not acodec or acodec == 'none':
+        return None
+    acodec = acodec.lower()
+    if acodec.startswith('mp4a') or acodec == 'aac':
+        return 'aac'
+    return acodec.split('.')[0]
+
+
+def probe_audio_codec(ffmpeg_path, file_path):
+    """Return the codec of the first audio stream of a file (None if unknown)"""
+    media = media_probe.probe(file_path, ffmpeg_path)
+    if not media.has_audio:
+        logging.warning(f"[AUDIO-CODEC] No audio stream found in {file_path}")
+    return normalize_audio_codec(media.audio_codec)
+
+
+def needs_transcode(codec):
+    """True if the audio must be encoded to AAC for Premiere (opus, vorbis, unknown)"""
+    return codec not in STREAM_COPY_AUDIO_CODECS
+
+
+def audio_codec_args(codec):
+    """FFmpeg audio codec arguments: stream copy when possible, AAC otherwise"""
+    if needs_transcode(codec):
+        return ['-c:a', 'aac', '-b:a', AUDIO_TRANSCODE_BITRATE]
+    return ['-c:a', 'copy']
+
+
+@contextmanager
+def encoder_slot(codec=None):
+    """Hold one of the AUDIO_ENCODER_POOL_SIZE encoder slots while transcoding.
+
+    Stream copies do not take a slot, so they never queue behind encodes.
+    """
+    if not needs_transcode(codec):
+        yield
+        return
+    if not _encoder_pool.acquire(blocking=False):
+        logging.info(f"[AUDIO-CODEC] All {AUDIO_ENCODER_POOL_SIZE} encoder slots busy, waiting...")
+        _encoder_pool.acquire()
+    try:
+        yield
+    finally:
+        _encoder_pool.release()
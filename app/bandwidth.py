@@ -0,0 +1,271 @@
+"""
+Shared download bandwidth scheduler.
+
+Every download job registers with a priority class ('clip', 'full', 'audio')
+when it starts, and the bandwidth is split between the active jobs by class
+weight (weighted fair share). Without a configured cap the top active class is
+never limited: lower classes are only slowed down while a higher one is
+running, so an interactive clip is not starved by a 4K VOD. With a cap
+(BANDWIDTH_LIMIT_MBPS or the 'bandwidthLimitMbps' setting) every job gets its
+weighted share of the cap.
+
+The shares are enforced where each download path allows it:
+- yt-dlp: the job's ydl.params['ratelimit'] is updated every tick (open_ydl
+  attaches each YoutubeDL to the job of the calling thread),
+- segmented downloader: consume() is a token bucket per job,
+- direct FFmpeg clips: FFmpeg's HTTP input cannot be rate-limited, so a clip
+  only claims its share and the other jobs yield bandwidth to it.
+
+A job's class can be changed while it runs (set_priority, exposed as the
+'set-download-priority' Socket.IO event).
+
+Jobs run in download worker processes (worker_pool) are scheduled by the
+server too: the server registers each one, the worker reports its received
+bytes and applies the rate the server gives it (set_external).
+"""
+import time
+import logging
+import itertools
+import threading
+from config import BANDWIDTH_LIMIT_MBPS, BANDWIDTH_TICK_SECONDS
+
+CLASS_WEIGHTS = {'clip': 8, 'full': 2, 'audio': 1}
+# Never throttle a job below this rate (bytes/s), so it keeps its connection alive
+MIN_RATE = 64 * 1024
+# The throughput estimate (no cap) decays by this factor per tick while nobody is throttled
+CAPACITY_DECAY = 0.98
+
+_lock = threading.Lock()
+_jobs = {}                    # job_id -> state dict
+_sequence = itertools.count(1)
+_local = threading.local()
+_ticker = None
+_cap = None                   # bytes/s, None = unlimited
+_capacity = 0.0               # estimated link throughput (bytes/s)
+_throughput = 0.0             # aggregate throughput over the last tick
+_external = None              # (rate, received bytes) shared with the server, in worker processes
+
+
+def _mbps_to_rate(mbps):
+    try:
+        mbps = float(mbps or 0)
+    except (TypeError, ValueError):
+        return None
+    return mbps * 1000 * 1000 / 8 if mbps > 0 else None
+
+
+def job_class(download_type):
+    """Priority class of a download type ('clip', 'audio', anything else is 'full')"""
+    return download_type if download_type in CLASS_WEIGHTS else 'full'
+
+
+def start_job(priority, url=None, settings=None):
+    """Register a job for the calling thread and return its id"""
+    global _cap, _ticker
+    priority = job_class(priority)
+    job_id = f"{priority}-{next(_sequence)}"
+    with _lock:
+        limit = settings.get('bandwidthLimitMbps') if settings else None
+        _cap = _mbps_to_rate(BANDWIDTH_LIMIT_MBPS if limit is None else limit)
+        _jobs[job_id] = {
+            'id': job_id,
+            'url': url,
+            'priority': priority,
+            'rate': None,
+            'bytes': 0,
+            'last_bytes': 0,
+            'tokens': 0.0,
+            'refilled': time.time(),
+            'ydls': [],
+        }
+        _rebalance()
+        if _ticker is None or not _ticker.is_alive():
+            _ticker = threading.Thread(target=_tick_loop, daemon=True)
+            _ticker.start()
+    _local.job_id = job_id
+    logging.info(f"[BANDWIDTH] Job {job_id} started ({len(_jobs)} active)")
+    return job_id
+
+
+def end_job(job_id):
+    with _lock:
+        job = _jobs.pop(job_id, None)
+        if job and _external:
+            # Bytes received since the last tick
+            with _external[1].get_lock():
+                _external[1].value += job['bytes'] - job['last_bytes']
+        _rebalance()
+    if getattr(_local, 'job_id', None) == job_id:
+        _local.job_id = None
+    if job:
+        logging.info(f"[BANDWIDTH] Job {job_id} finished ({job['bytes'] / 1024 / 1024:.1f} MB)")
+
+
+def bind(job_id):
+    """Attach the calling (helper) thread to a job started in another thread"""
+    _local.job_id = job_id
+
+
+def current_job():
+    return getattr(_local, 'job_id', None)
+
+
+def set_priority(target, priority):
+    """Change the class of the jobs matching target (a job id or a video URL).
+
+    Returns the ids of the jobs that were changed.
+    """
+    if priority not in CLASS_WEIGHTS:
+        raise ValueError(f"Unknown priority class: {priority}")
+    with _lock:
+        changed = [job['id'] for job in _jobs.values() if target in (job['id'], job['url'])]
+        for job_id in changed:
+            _jobs[job_id]['priority'] = priority
+        if changed:
+            _rebalance()
+            _apply_ydl_rates()
+    for job_id in changed:
+        logging.info(f"[BANDWIDTH] Job {job_id} moved to priority '{priority}'")
+    return changed
+
+
+def set_external(rate_value, bytes_value):
+    """In a download worker process: apply the rate the server's scheduler sets in rate_value
+    (bytes/s, 0 = unlimited) and add the bytes received to bytes_value"""
+    global _external
+    _external = (rate_value, bytes_value)
+
+
+def get_rate(job_id):
+    """Current rate of a job (bytes/s, None = unlimited)"""
+    with _lock:
+        job = _jobs.get(job_id)
+        return job['rate'] if job else None
+
+
+def add_bytes(job_id, nbytes):
+    """Account bytes a job received in a worker process"""
+    with _lock:
+        if job_id in _jobs:
+            _jobs[job_id]['bytes'] += nbytes
+
+
+def attach_ydl(ydl):
+    """Let the current job's share drive this YoutubeDL's ratelimit"""
+    job_id = current_job()
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return
+        job['ydls'].append(ydl)
+        _set_ydl_rate(ydl, job['rate'])
+    seen = {}
+
+    def _count_bytes(d):
+        downloaded = d.get('downloaded_bytes') or 0
+        filename = d.get('filename') or d.get('tmpfilename')
+        delta = downloaded - seen.get(filename, 0)
+        seen[filename] = downloaded
+        if delta > 0:
+            with _lock:
+                if job_id in _jobs:
+                    _jobs[job_id]['bytes'] += delta
+
+    ydl.add_progress_hook(_count_bytes)
+
+
+def consume(job_id, nbytes):
+    """Account nbytes received by job_id, sleeping as needed to stay within its share"""
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return
+        job['bytes'] += nbytes
+        rate = job['rate']
+        if not rate:
+            return
+        now = time.time()
+        # Allow half a second of burst
+        job['tokens'] = min(rate / 2, job['tokens'] + (now - job['refilled']) * rate) - nbytes
+        job['refilled'] = now
+        wait = -job['tokens'] / rate if job['tokens'] < 0 else 0
+    if wait:
+        time.sleep(wait)
+
+
+def _set_ydl_rate(ydl, rate):
+    # yt-dlp's HTTP downloader reads params['ratelimit'] on every block
+    ydl.params['ratelimit'] = int(rate) if rate else None
+
+
+def _apply_ydl_rates():
+    for job in _jobs.values():
+        for ydl in job['ydls']:
+            _set_ydl_rate(ydl, job['rate'])
+
+
+def _rebalance():
+    """Recompute each job's rate (bytes/s, None = unlimited). Caller holds _lock."""
+    if not _jobs:
+        return
+    if _external:
+        rate = _external[0].value
+        for job in _jobs.values():
+            job['rate'] = rate or None
+        return
+    active = {job['priority'] for job in _jobs.values()}
+    total_weight = sum(CLASS_WEIGHTS[job['priority']] for job in _jobs.values())
+    top_weight = max(CLASS_WEIGHTS[priority] for priority in active)
+
+    for job in _jobs.values():
+        weight = CLASS_WEIGHTS[job['priority']]
+        if _cap:
+            job['rate'] = max(MIN_RATE, _cap * weight / total_weight)
+        elif weight == top_weight or not _capacity:
+            job['rate'] = None
+        else:
+            job['rate'] = max(MIN_RATE, _capacity * weight / total_weight)
+
+
+def _tick_loop():
+    global _capacity, _throughput, _ticker
+    last = time.time()
+    while True:
+        time.sleep(BANDWIDTH_TICK_SECONDS)
+        with _lock:
+            if not _jobs:
+                _ticker = None
+                return
+            now = time.time()
+            received = 0
+            for job in _jobs.values():
+                received += job['bytes'] - job['last_bytes']
+                job['last_bytes'] = job['bytes']
+            _throughput = received / max(now - last, 0.001)
+            last = now
+            if _external:
+                with _external[1].get_lock():
+                    _external[1].value += received
+            elif any(job['rate'] for job in _jobs.values()):
+                # Throttled jobs lower the measured total: only raise the estimate
+                _capacity = max(_capacity, _throughput)
+            else:
+                _capacity = max(_throughput, _capacity * CAPACITY_DECAY)
+            _rebalance()
+            _apply_ydl_rates()
+
+
+def get_status():
+    """Active jobs and their shares, for /health"""
+    with _lock:
+        return {
+            'cap_mbps': round(_cap * 8 / 1000 / 1000, 1) if _cap else None,
+            'throughput_mbps': round(_throughput * 8 / 1000 / 1000, 1),
+            'jobs': [{
+                'id': job['id'],
+                'url': job['url'],
+                'priority': job['priority'],
+                'rate_mbps': round(job['rate'] * 8 / 1000 / 1000, 1) if job['rate'] else None,
+                'downloaded_mb': round(job['bytes'] / 1024 / 1024, 1),
+            } for job in _jobs.values()],
+        }
@@ -0,0 +1,21 @@
+"""
+Offline benchmarks for the download pipeline.
+
+fake_cdn serves synthetic media (progressive MP4, DASH video/audio, HLS) from
+127.0.0.1 with Range support, optional throttling and 403 injection. fixtures
+holds YouTube-like info dicts pointing at it and routes yt-dlp's extraction of
+the fixture URLs to them. The runner (python -m bench, from app/) drives
+handle_video_url end to end for clip, full and audio jobs and reports per-phase
+latency percentiles from job_metrics against a stored baseline.
+
+socket_load starts the Socket.IO server (socket_server) with many simulated
+Chrome and Premiere clients and measures event latency, drops, server CPU and
+memory, and reconnect storms.
+"""
+import math
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
@@ -0,0 +1,260 @@
+"""
+Benchmark runner: python -m bench [options], from the app directory.
+
+Each scenario runs handle_video_url end to end against the fake CDN, in a
+throwaway settings/download directory. The spans job_metrics records for the
+job give the per-phase durations. p50/p90/p99 per phase are printed and
+compared with the baseline (bench/baseline.json unless --baseline is given).
+The runner exits with status 1 when a phase's p50, or the bytes fetched, grew
+past --threshold. --save-baseline stores the scenarios run as the new baseline
+(the others keep theirs).
+
+The clip-* scenarios pin the 'clipStrategy' setting. They compare direct
+FFmpeg HTTP seeking, DASH partial download and yt-dlp download_ranges on the
+same media. A pinned strategy that fails fails the run instead of falling
+back to another strategy.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from bench import percentile
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+PERCENTILES = (50, 90, 99)
+# Slowdowns smaller than this are noise whatever the ratio
+MIN_REGRESSION_SECONDS = 0.05
+
+# name -> (download type, fixture, clipStrategy)
+SCENARIOS = {
+    'clip': ('clip', 'dash', 'auto'),
+    'clip-direct': ('clip', 'dash', 'direct'),
+    'clip-dash-partial': ('clip', 'dash', 'dash-partial'),
+    'clip-ranges': ('clip', 'dash', 'ranges'),
+    'clip-hls': ('clip', 'hls', 'auto'),
+    'full': ('full', 'dash', 'auto'),
+    'audio': ('audio', 'dash', 'auto'),
+}
+
+
+class _EventRecorder:
+    """Stands in for the server's socketio object; counts emitted events"""
+
+    def __init__(self):
+        self.events = {}
+
+    def emit(self, event, data=None, **kwargs):
+        self.events[event] = self.events.get(event, 0) + 1
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m bench', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('scenarios', nargs='*', default=list(SCENARIOS), metavar='SCENARIO',
+                        help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('-n', '--iterations', type=int, default=5)
+    parser.add_argument('--duration', type=int, default=120, help='length of the synthetic video (s)')
+    parser.add_argument('--clip-seconds', type=float, default=10)
+    parser.add_argument('--resolution', default='720')
+    parser.add_argument('--throttle-mbps', type=float, default=0, help='per-connection CDN speed (0: unlimited)')
+    parser.add_argument('--inject-403', type=float, default=0, help='share of CDN requests answered with 403')
+    parser.add_argument('--media-dir', help='keep the generated media here between runs')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed p50 growth (0.2 = 20%%)')
+    parser.add_argument('--output', help='also write this run as JSON')
+    parser.add_argument('-v', '--verbose', action='store_true', help='show the pipeline log')
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    return args
+
+
+def run_scenario(name, args, cdn, work_dir, video_urls, clip_start):
+    import job_metrics
+    import license_check
+    import settings_store
+    import video_processing
+    from bench import fixtures
+
+    download_type, fixture, clip_strategy = SCENARIOS[name]
+    settings = dict(settings_store.DEFAULT_SETTINGS,
+                    resolution=args.resolution,
+                    downloadPath=os.path.join(work_dir, 'downloads', name),
+                    licenseKey='bench',
+                    clipStrategy=clip_strategy)
+    os.makedirs(settings['downloadPath'], exist_ok=True)
+
+    runs = []
+    for iteration in range(args.iterations):
+        fixtures.new_run()
+        # Offline: the license check is answered from the cache
+        license_check.license_cache.update({'key': 'bench', 'is_valid': True, 'timestamp': time.time()})
+        job_id = f'bench-{name}-{iteration + 1}'
+        job_metrics.bind(job_id)
+        socketio = _EventRecorder()
+        current_download = {'process': None, 'ydl': None, 'cancel_callback': None}
+        clip_window = (clip_start, clip_start + args.clip_seconds) if download_type == 'clip' else (None, None)
+        cdn.take_stats()
+
+        started = time.time()
+        result = video_processing.handle_video_url(video_urls[fixture], download_type, current_download,
+                                                   socketio, dict(settings), *clip_window)
+        total = time.time() - started
+        job_metrics.finish_job(job_id, result)
+        job_metrics.bind(None)
+
+        phases = {'total': total}
+        strategy = None
+        for span in job_metrics.get_timeline(job_id)['spans']:
+            phases[span['phase']] = phases.get(span['phase'], 0) + span['seconds']
+            if span['phase'] == 'clip_cut':
+                strategy = span.get('strategy')
+        traffic = cdn.take_stats().values()
+        runs.append({
+            'ok': bool(result and result.get('success')),
+            'error': None if result and result.get('success') else str((result or {}).get('error')),
+            'phases': phases,
+            'strategy': strategy,
+            'bytes': sum(entry['bytes'] for entry in traffic),
+            'requests': sum(entry['requests'] for entry in traffic),
+        })
+        status = 'ok' if runs[-1]['ok'] else f"FAILED: {runs[-1]['error'][:120]}"
+        print(f"  {name} #{iteration + 1}: {total:.2f}s, {runs[-1]['bytes'] / 1024 / 1024:.1f} MB, {status}")
+    return runs
+
+
+def summarize(runs):
+    ok_runs = [run for run in runs if run['ok']]
+    phases = {}
+    for phase in sorted({phase for run in ok_runs for phase in run['phases']}):
+        values = [run['phases'][phase] for run in ok_runs if phase in run['phases']]
+        phases[phase] = dict({f'p{pct}': round(percentile(values, pct), 4) for pct in PERCENTILES}, n=len(values))
+    strategies = {}
+    for run in ok_runs:
+        if run['strategy']:
+            strategies[run['strategy']] = strategies.get(run['strategy'], 0) + 1
+    return {
+        'runs': len(runs),
+        'failures': len(runs) - len(ok_runs),
+        'errors': sorted({run['error'] for run in runs if run['error']}),
+        'bytes_p50': percentile([run['bytes'] for run in ok_runs], 50) if ok_runs else None,
+        'requests_p50': percentile([run['requests'] for run in ok_runs], 50) if ok_runs else None,
+        'strategies': strategies,
+        'phases': phases,
+    }
+
+
+def compare(name, summary, baseline, threshold):
+    """Print the summary next to the baseline; return the regressions found"""
+    base = (baseline or {}).get(name) or {}
+    regressions = []
+    print(f"\n{name}: {summary['runs'] - summary['failures']}/{summary['runs']} ok"
+          + (f", strategy {summary['strategies']}" if summary['strategies'] else '')
+          + (f", {summary['bytes_p50'] / 1024 / 1024:.1f} MB / {summary['requests_p50']} requests"
+             if summary['bytes_p50'] is not None else ''))
+    for error in summary['errors']:
+        print(f"  error: {error[:200]}")
+    print(f"  {'phase':<20}" + ''.join(f"{'p' + str(pct):>10}" for pct in PERCENTILES) + f"{'base p50':>10}{'change':>11}")
+    for phase, stats in summary['phases'].items():
+        base_p50 = (base.get('phases') or {}).get(phase, {}).get('p50')
+        change = ''
+        if base_p50:
+            ratio = stats['p50'] / base_p50 - 1
+            change = f'{ratio:+.0%}'
+            if ratio > threshold and stats['p50'] - base_p50 > MIN_REGRESSION_SECONDS:
+                regressions.append(f"{name}/{phase}: p50 {base_p50:.3f}s -> {stats['p50']:.3f}s ({change})")
+                change += ' !'
+        print(f"  {phase:<20}" + ''.join(f"{stats[f'p{pct}']:>10.3f}" for pct in PERCENTILES)
+              + (f"{base_p50:>10.3f}" if base_p50 else f"{'-':>10}") + f"{change:>11}")
+    if base.get('bytes_p50') and summary['bytes_p50'] is not None:
+        if summary['bytes_p50'] > base['bytes_p50'] * (1 + threshold):
+            regressions.append(f"{name}: bytes {base['bytes_p50']} -> {summary['bytes_p50']}")
+    if base and summary['failures'] > base.get('failures', 0):
+        regressions.append(f"{name}: {summary['failures']} failed run(s), baseline had {base.get('failures', 0)}")
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s %(levelname)s %(message)s')
+    ffmpeg_path = shutil.which('ffmpeg')
+    if not ffmpeg_path:
+        print('FFmpeg was not found on PATH; it is needed to generate the media and to run the pipeline.')
+        return 2
+
+    # Settings, caches and the journal go to a throwaway home, never the user's
+    work_dir = tempfile.mkdtemp(prefix='ytp-bench-')
+    for variable in ('HOME', 'APPDATA', 'USERPROFILE'):
+        os.environ[variable] = work_dir
+
+    import video_processing
+    import import_batcher
+    from bench import fixtures
+    from bench.fake_cdn import FakeCDN, generate_media
+
+    media_dir = generate_media(ffmpeg_path, args.media_dir or os.path.join(work_dir, 'media'), args.duration)
+    cdn = FakeCDN(media_dir, throttle_bps=args.throttle_mbps * 1000 * 1000 / 8,
+                  inject_403=args.inject_403).start()
+    fixtures.install(fixtures.build_fixtures(cdn, args.duration, int(args.resolution)))
+    video_urls = {'dash': fixtures.watch_url(fixtures.DASH_VIDEO_ID), 'hls': fixtures.watch_url(fixtures.HLS_VIDEO_ID)}
+    video_processing.set_emit_function(lambda event, data, client_type=None: None)
+    import_batcher.set_forward_function(lambda path, bin_path: None)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('scenarios')
+
+    summaries = {}
+    try:
+        for name in args.scenarios:
+            print(f"Running {name} ({args.iterations} iterations)")
+            runs = run_scenario(name, args, cdn, work_dir, video_urls, clip_start=args.duration / 2)
+            summaries[name] = summarize(runs)
+    finally:
+        fixtures.uninstall()
+        cdn.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    regressions = []
+    for name, summary in summaries.items():
+        regressions += compare(name, summary, baseline, args.threshold)
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'options': {key: getattr(args, key) for key in
+                    ('iterations', 'duration', 'clip_seconds', 'resolution', 'throttle_mbps', 'inject_403')},
+        'scenarios': summaries,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        # Scenarios not run this time keep their baseline
+        saved = dict(report, scenarios=dict(baseline or {}, **summaries))
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(saved, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+
+    if regressions:
+        print('\nRegressions:')
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
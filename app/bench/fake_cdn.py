@@ -0,0 +1,216 @@
+"""
+Local stand-in for the YouTube CDN.
+
+generate_media() renders a synthetic video once with FFmpeg (test pattern +
+sine tone) in every shape the pipeline meets on YouTube: a progressive MP4
+with audio, DASH-style video-only MP4 and audio-only M4A, and an HLS playlist
+with TS segments. FakeCDN serves them on 127.0.0.1 with HTTP Range support
+(FFmpeg input seeking, segmented downloads and yt-dlp resume all depend on
+it), and can throttle each connection or answer a share of requests with 403
+like an expired googlevideo URL. Bytes served are counted per file so clip
+strategies can be compared on traffic as well as time.
+"""
+import os
+import re
+import time
+import sys
+import random
+import logging
+import threading
+import subprocess
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, urlencode
+
+CHUNK_SIZE = 64 * 1024
+CONTENT_TYPES = {
+    '.mp4': 'video/mp4',
+    '.m4a': 'audio/mp4',
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.ts': 'video/mp2t',
+}
+# Files generate_media() produces, relative to the media dir
+MEDIA_FILES = ('video.mp4', 'audio.m4a', 'progressive.mp4', 'hls/index.m3u8')
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def generate_media(ffmpeg_path, media_dir, duration=120, height=720, video_kbps=2500):
+    """Render the synthetic media into media_dir (skipped when already there)"""
+    if all(os.path.exists(os.path.join(media_dir, name)) for name in MEDIA_FILES):
+        return media_dir
+    os.makedirs(os.path.join(media_dir, 'hls'), exist_ok=True)
+    width = height * 16 // 9
+    video = os.path.join(media_dir, 'video.mp4')
+    audio = os.path.join(media_dir, 'audio.m4a')
+    progressive = os.path.join(media_dir, 'progressive.mp4')
+    commands = [
+        # Keyframe every 2s, like YouTube's DASH renditions
+        [ffmpeg_path, '-y', '-f', 'lavfi', '-i', f'testsrc2=size={width}x{height}:rate=30:duration={duration}',
+         '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p', '-g', '60',
+         '-b:v', f'{video_kbps}k', '-maxrate', f'{video_kbps}k', '-bufsize', f'{video_kbps * 2}k',
+         '-an', '-movflags', '+faststart', video],
+        [ffmpeg_path, '-y', '-f', 'lavfi', '-i', f'sine=frequency=440:sample_rate=44100:duration={duration}',
+         '-c:a', 'aac', '-b:a', '128k', '-movflags', '+faststart', audio],
+        [ffmpeg_path, '-y', '-i', video, '-i', audio, '-c', 'copy', '-movflags', '+faststart', progressive],
+        [ffmpeg_path, '-y', '-i', progressive, '-c', 'copy', '-f', 'hls', '-hls_time', '4',
+         '-hls_playlist_type', 'vod',
+         '-hls_segment_filename', os.path.join(media_dir, 'hls', 'seg%03d.ts'),
+         os.path.join(media_dir, 'hls', 'index.m3u8')],
+    ]
+    for command in commands:
+        logging.info(f"[BENCH] Generating {os.path.basename(command[-1])}")
+        subprocess.run(command, check=True, capture_output=True)
+    return media_dir
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logging.debug(f"[FAKE-CDN] {format % args}")
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        cdn = self.server.cdn
+        path = urlparse(self.path).path
+        if not path.startswith('/media/'):
+            return self._fail(404)
+        name = os.path.normpath(path[len('/media/'):]).replace('\\', '/')
+        file_path = os.path.join(cdn.media_dir, name)
+        if name.startswith('..') or not os.path.isfile(file_path):
+            return self._fail(404)
+        if cdn.should_reject():
+            cdn.count(name, 403)
+            return self._fail(403)
+
+        size = os.path.getsize(file_path)
+        start, end, status = 0, size - 1, 200
+        range_header = self.headers.get('Range')
+        if range_header:
+            match = _RANGE.match(range_header.strip())
+            if not match or not (match.group(1) or match.group(2)):
+                return self._fail(416, size)
+            if match.group(1):
+                start = int(match.group(1))
+                if match.group(2):
+                    end = min(int(match.group(2)), size - 1)
+            else:
+                start = max(0, size - int(match.group(2)))
+            if start >= size or start > end:
+                return self._fail(416, size)
+            status = 206
+
+        self.send_response(status)
+        self.send_header('Content-Type', CONTENT_TYPES.get(os.path.splitext(name)[1], 'application/octet-stream'))
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.end_headers()
+        cdn.count(name, status)
+        if not send_body:
+            return
+
+        sent = 0
+        began = time.time()
+        try:
+            with open(file_path, 'rb') as f:
+                f.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    data = f.read(min(CHUNK_SIZE, remaining))
+                    if not data:
+                        break
+                    self.wfile.write(data)
+                    cdn.count_bytes(name, len(data))
+                    sent += len(data)
+                    remaining -= len(data)
+                    if cdn.throttle_bps:
+                        ahead = sent / cdn.throttle_bps - (time.time() - began)
+                        if ahead > 0:
+                            time.sleep(ahead)
+        except (BrokenPipeError, ConnectionResetError):
+            # FFmpeg and yt-dlp drop the connection once they have enough bytes
+            self.close_connection = True
+
+    def _fail(self, status, size=None):
+        self.send_response(status)
+        if size is not None:
+            self.send_header('Content-Range', f'bytes */{size}')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up between requests are as expected as mid-body
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class FakeCDN:
+    """Range-capable HTTP server for the generated media"""
+
+    def __init__(self, media_dir, throttle_bps=0, inject_403=0.0, seed=0):
+        self.media_dir = media_dir
+        self.throttle_bps = throttle_bps
+        self.inject_403 = inject_403
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._server = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._server = _Server(('127.0.0.1', 0), _Handler)
+        self._server.cdn = self
+        threading.Thread(target=self._server.serve_forever, name='fake-cdn', daemon=True).start()
+        logging.info(f"[BENCH] Fake CDN serving {self.media_dir} on {self.base_url}")
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def url(self, name, lifetime=6 * 3600):
+        """Stream URL of a media file, with a googlevideo-style expire parameter"""
+        query = urlencode({'expire': int(time.time() + lifetime), 'id': name})
+        return f'{self.base_url}/media/{name}?{query}'
+
+    def should_reject(self):
+        with self._lock:
+            return bool(self.inject_403) and self._random.random() < self.inject_403
+
+    def _entry(self, name):
+        return self._stats.setdefault(name, {'requests': 0, 'bytes': 0, 'rejected': 0})
+
+    def count(self, name, status):
+        with self._lock:
+            entry = self._entry(name)
+            entry['requests'] += 1
+            if status == 403:
+                entry['rejected'] += 1
+
+    def count_bytes(self, name, nbytes):
+        with self._lock:
+            self._entry(name)['bytes'] += nbytes
+
+    def take_stats(self):
+        """Per-file counters since the last call"""
+        with self._lock:
+            stats, self._stats = self._stats, {}
+        return stats
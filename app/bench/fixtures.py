@@ -0,0 +1,100 @@
+"""
+Recorded-style YouTube info dicts for the benchmarks.
+
+The dicts mirror what yt-dlp's YouTube extractor returns (format ids, codecs,
+protocols, expire= stream URLs) but point at a FakeCDN. install() routes
+YoutubeDL.extract_info for the fixture URLs to them: the info dict goes through
+yt-dlp's own process_ie_result, so format selection, downloaders and
+postprocessors run unchanged and only the network extraction is skipped.
+"""
+import os
+import copy
+import itertools
+import yt_dlp
+import inflight_jobs
+
+DASH_VIDEO_ID = 'benchDASH01'
+HLS_VIDEO_ID = 'benchHLS001'
+
+_fixtures = {}                # video ID -> info dict
+_run = itertools.count(1)
+_run_suffix = ''
+_original_extract_info = None
+
+
+def watch_url(video_id):
+    return f'https://www.youtube.com/watch?v={video_id}'
+
+
+def _format(cdn, name, **fields):
+    size = os.path.getsize(os.path.join(cdn.media_dir, name))
+    return dict(fields, url=cdn.url(name), filesize=size, http_headers={})
+
+
+def build_fixtures(cdn, duration, height=720):
+    """Info dicts for a DASH video (with HLS and progressive formats too) and an HLS-only video"""
+    width = height * 16 // 9
+    video = dict(vcodec='avc1.64001f', width=width, height=height, fps=30)
+    progressive = _format(cdn, 'progressive.mp4', format_id='18', ext='mp4', protocol='https',
+                          acodec='mp4a.40.2', asr=44100, **video)
+    hls = _format(cdn, 'hls/index.m3u8', format_id=f'hls-{height}', ext='mp4', protocol='m3u8_native',
+                  acodec='mp4a.40.2', **video)
+    hls['manifest_url'] = hls['url']
+    dash_video = _format(cdn, 'video.mp4', format_id='136', ext='mp4', protocol='https',
+                         acodec='none', format_note=f'{height}p', **video)
+    dash_audio = _format(cdn, 'audio.m4a', format_id='140', ext='m4a', protocol='https',
+                         vcodec='none', acodec='mp4a.40.2', asr=44100, abr=128, format_note='medium')
+
+    def info(video_id, title, formats):
+        return {
+            'id': video_id,
+            'title': title,
+            'duration': duration,
+            'uploader': 'Bench',
+            'channel': 'Bench',
+            'webpage_url': watch_url(video_id),
+            'original_url': watch_url(video_id),
+            'extractor': 'youtube',
+            'extractor_key': 'Youtube',
+            'formats': formats,
+        }
+
+    return {
+        DASH_VIDEO_ID: info(DASH_VIDEO_ID, 'Bench DASH video', [progressive, hls, dash_audio, dash_video]),
+        HLS_VIDEO_ID: info(HLS_VIDEO_ID, 'Bench HLS video', [hls]),
+    }
+
+
+def new_run():
+    """Give the fixtures fresh IDs so the download cache and resume index start empty"""
+    global _run_suffix
+    _run_suffix = f'-{next(_run)}'
+
+
+def install(fixtures):
+    """Serve extract_info for the fixture URLs from fixtures (other URLs are untouched)"""
+    global _original_extract_info
+    _fixtures.update(fixtures)
+    if _original_extract_info is not None:
+        return
+    _original_extract_info = yt_dlp.YoutubeDL.extract_info
+
+    def extract_info(self, url, download=True, ie_key=None, extra_info=None, process=True, **kwargs):
+        fixture = _fixtures.get(inflight_jobs.video_id(url))
+        if fixture is None:
+            return _original_extract_info(self, url, download, ie_key, extra_info, process, **kwargs)
+        info = copy.deepcopy(fixture)
+        info['id'] += _run_suffix
+        if not process:
+            return info
+        return self.process_ie_result(info, download=download)
+
+    yt_dlp.YoutubeDL.extract_info = extract_info
+
+
+def uninstall():
+    global _original_extract_info
+    if _original_extract_info is not None:
+        yt_dlp.YoutubeDL.extract_info = _original_extract_info
+        _original_extract_info = None
+    _fixtures.clear()
@@ -0,0 +1,370 @@
+"""
+Socket.IO load test: python -m bench.socket_load [options], from app/.
+
+Starts the real server (bench.socket_server) in a child process with a
+throwaway HOME/TMPDIR. Connects --chrome and --premiere python-socketio
+clients (client_type=chrome|premiere, like the extensions). Then runs:
+
+1. Synthetic download jobs. Each job emits progress at --progress-hz for
+   --job-seconds, then goes through the Premiere import batch and the
+   'complete' reply. The first Premiere client answers import batches like
+   the panel.
+2. A reconnect storm: --storm-fraction of the clients disconnect, then all of
+   them reconnect at once, --storm-rounds times.
+3. The same jobs again, to see whether delivery survived the storm.
+
+It reports, per event and intended audience:
+- events expected and received, and the share dropped;
+- events delivered to a client type they were not meant for;
+- latency from the server emit to client receipt (p50/p90/p99).
+
+Server-side it reports CPU milliseconds per emit and per delivered message,
+emit_to_client_type and cleanup_stale_connections call times, RSS and
+thread growth, and the connected_clients registry against the clients
+actually connected.
+
+Only clean disconnects are simulated. A silently dropped client is noticed by
+the server only after the ping timeout (85 s), which is outside what this
+measures.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, APP_DIR)
+
+import requests
+import socketio
+
+from bench import percentile
+
+PERCENTILES = (50, 90, 99)
+# Time left for the last events and the import round trip to arrive
+SETTLE_SECONDS = 3
+
+
+class _Client:
+    """One simulated extension"""
+
+    def __init__(self, kind, index, url, answers_imports=False):
+        self.kind = kind
+        self.index = index
+        self.url = f'{url}?client_type={kind}'
+        self.answers_imports = answers_imports
+        self.lock = threading.Lock()
+        self.received = {}        # (event, intended audience) -> count of bench events
+        self.latencies = {}       # (event, intended audience) -> [seconds]
+        self.import_paths = set()
+        self.sio = socketio.Client(reconnection=False)
+        for event in ('progress', 'percentage'):
+            self.sio.on(event, self._marker_handler(event))
+        self.sio.on('complete', self._on_complete)
+        self.sio.on('import_videos', self._on_import_videos)
+
+    def _record(self, key, latency):
+        with self.lock:
+            self.received[key] = self.received.get(key, 0) + 1
+            self.latencies.setdefault(key, []).append(latency)
+
+    def _marker_handler(self, event):
+        def handler(data):
+            if isinstance(data, dict) and isinstance(data.get('bench'), dict):
+                marker = data['bench']
+                self._record((event, marker['audience']), time.time() - marker['sent'])
+        return handler
+
+    def _on_complete(self, data):
+        path = (data or {}).get('path') or ''
+        if path.startswith('bench-'):
+            finished = float(path[:-len('.mp4')].rsplit('-', 1)[1])
+            self._record(('complete', 'chrome'), time.time() - finished)
+
+    def _on_import_videos(self, data):
+        paths = [path for path in (data or {}).get('paths') or [] if path.startswith('bench-')]
+        if not paths:
+            return
+        now = time.time()
+        for path in paths:
+            self._record(('import_videos', 'premiere'), now - float(path[:-len('.mp4')].rsplit('-', 1)[1]))
+        with self.lock:
+            self.import_paths.update(paths)
+        if self.answers_imports:
+            self.sio.emit('import_batch_complete', {'batch_id': data.get('batch_id'),
+                                                    'results': [{'success': True} for _ in data['paths']]})
+
+    def connect(self):
+        """Connect and return the time it took (None on failure)"""
+        started = time.time()
+        try:
+            self.sio.connect(self.url, wait_timeout=30)
+        except Exception:
+            return None
+        return time.time() - started
+
+    def disconnect(self):
+        try:
+            self.sio.disconnect()
+        except Exception:
+            pass
+
+    def take(self):
+        with self.lock:
+            received, latencies, paths = self.received, self.latencies, self.import_paths
+            self.received, self.latencies, self.import_paths = {}, {}, set()
+        return received, latencies, paths
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _start_server(work_dir, port, server_mode=None):
+    env = dict(os.environ)
+    for variable in ('HOME', 'APPDATA', 'USERPROFILE', 'TMPDIR', 'TEMP', 'TMP'):
+        env[variable] = work_dir
+    if server_mode:
+        env['YTPP_SERVER_MODE'] = server_mode
+    log = open(os.path.join(work_dir, 'server.log'), 'w', encoding='utf-8')
+    process = subprocess.Popen([sys.executable, '-m', 'bench.socket_server', '--port', str(port)],
+                               cwd=APP_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}, see {log.name}")
+        try:
+            if requests.get(f'{url}/health', timeout=1).ok:
+                return process, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Server did not answer on {url} within 60s, see {log.name}")
+
+
+def _stats(url, reset=False):
+    return requests.get(f'{url}/bench/stats', params={'reset': 1} if reset else None, timeout=30).json()
+
+
+def _connect_all(clients):
+    with ThreadPoolExecutor(max_workers=min(64, len(clients))) as pool:
+        return list(pool.map(lambda client: client.connect(), clients))
+
+
+def _distribution(values, scale=1000):
+    """p50/p90/p99 (ms by default) of values"""
+    if not values:
+        return None
+    return {f'p{pct}': round(percentile(values, pct) * scale, 2) for pct in PERCENTILES}
+
+
+def run_jobs(args, url, clients, first_job):
+    """Run the synthetic jobs and return delivery, latency and server cost figures"""
+    for client in clients:
+        client.take()
+    before = _stats(url, reset=True)
+    response = requests.post(f'{url}/bench/jobs', timeout=args.job_seconds + 120,
+                             json={'jobs': args.jobs, 'seconds': args.job_seconds,
+                                   'progress_hz': args.progress_hz, 'first': first_job}).json()
+    time.sleep(SETTLE_SECONDS)
+    after = _stats(url)
+
+    connected = [client for client in clients if client.sio.connected]
+    per_kind = {kind: sum(1 for client in connected if client.kind == kind) for kind in ('chrome', 'premiere')}
+    taken = [(client, client.take()) for client in connected]
+
+    # Per (event, audience): messages the audience should have received vs did receive
+    expected = {}
+    emit_calls = 0
+    for entry in response['emitted']:
+        event, audience, count = entry['event'], entry['audience'], entry['count']
+        emit_calls += count
+        kinds = ('chrome', 'premiere') if audience == 'all' else (audience,)
+        if event == 'import_videos':
+            # Batched: count files once, on the Premiere side
+            expected[(event, audience)] = count
+        else:
+            expected[(event, audience)] = count * sum(per_kind[kind] for kind in kinds)
+    # Each imported file is answered with one 'complete' per Chrome client
+    expected[('complete', 'chrome')] = args.jobs * per_kind['chrome']
+
+    events = []
+    delivered_total = 0
+    for (event, audience), count in sorted(expected.items()):
+        kinds = ('chrome', 'premiere') if audience == 'all' else (audience,)
+        key = (event, audience)
+        if event == 'import_videos':
+            paths = set()
+            for client, (_, _, client_paths) in taken:
+                if client.kind == 'premiere':
+                    paths |= client_paths
+            received = len(paths)
+        else:
+            received = sum(counts.get(key, 0) for client, (counts, _, _) in taken if client.kind in kinds)
+        latencies = [latency for client, (_, client_latencies, _) in taken if client.kind in kinds
+                     for latency in client_latencies.get(key, [])]
+        delivered_total += received
+        events.append({
+            'event': event,
+            'audience': audience,
+            'expected': count,
+            'received': received,
+            'dropped_pct': round(100 * max(0, count - received) / count, 2) if count else 0,
+            'latency_ms': _distribution(latencies),
+        })
+
+    # Events that reached a client type they were not meant for (broadcast fallbacks)
+    misrouted = {}
+    for client, (counts, _, _) in taken:
+        for (event, audience), count in counts.items():
+            if audience not in ('all', client.kind):
+                name = f'{event}->{client.kind}'
+                misrouted[name] = misrouted.get(name, 0) + count
+
+    cpu = after['cpu_seconds'] - before['cpu_seconds']
+    return {
+        'emit_calls': emit_calls,
+        'delivered': delivered_total,
+        'events': events,
+        'misrouted': misrouted,
+        'server_cpu_seconds': round(cpu, 3),
+        'cpu_ms_per_emit': round(cpu * 1000 / emit_calls, 3) if emit_calls else None,
+        'cpu_ms_per_delivery': round(cpu * 1000 / delivered_total, 4) if delivered_total else None,
+        'emit_to_client_type_ms': _distribution(after['timings']['emit_to_client_type']),
+        'cleanup_stale_connections_ms': _distribution(after['timings']['cleanup_stale_connections']),
+        'rss': after.get('rss'),
+        'threads': after['threads'],
+    }
+
+
+def run_storm(args, url, clients):
+    """Disconnect a share of the clients, reconnect everyone at once, check the registry"""
+    rounds = []
+    victims = clients[:max(1, int(len(clients) * args.storm_fraction))]
+    for _ in range(args.storm_rounds):
+        for client in victims:
+            client.disconnect()
+        time.sleep(0.5)
+        started = time.time()
+        connect_times = _connect_all([client for client in clients if not client.sio.connected])
+        storm_seconds = time.time() - started
+        time.sleep(1)
+        stats = _stats(url)
+        connected = {kind: sum(1 for client in clients if client.kind == kind and client.sio.connected)
+                     for kind in ('chrome', 'premiere')}
+        rounds.append({
+            'reconnected': sum(1 for t in connect_times if t is not None),
+            'failed': sum(1 for t in connect_times if t is None),
+            'seconds': round(storm_seconds, 3),
+            'connect_ms': _distribution([t for t in connect_times if t is not None]),
+            'connected': connected,
+            'registry': stats['registry'],
+            'rss': stats.get('rss'),
+            'threads': stats['threads'],
+        })
+    return rounds
+
+
+def print_report(report):
+    connect = report['connect']
+    print(f"\nClients: {report['options']['chrome']} chrome + {report['options']['premiere']} premiere, "
+          f"{connect['failed']} failed to connect, connect {connect['connect_ms']} ms")
+    for name in ('jobs', 'jobs_after_storm'):
+        phase = report.get(name)
+        if not phase:
+            continue
+        print(f"\n{name}: {phase['emit_calls']} emits -> {phase['delivered']} deliveries, "
+              f"server CPU {phase['server_cpu_seconds']}s ({phase['cpu_ms_per_emit']} ms/emit, "
+              f"{phase['cpu_ms_per_delivery']} ms/delivery)")
+        print(f"  {'event':<15}{'audience':<10}{'expected':>9}{'received':>9}{'dropped':>9}"
+              + ''.join(f"{'p' + str(pct) + ' ms':>10}" for pct in PERCENTILES))
+        for event in phase['events']:
+            latency = event['latency_ms'] or {}
+            print(f"  {event['event']:<15}{event['audience']:<10}{event['expected']:>9}{event['received']:>9}"
+                  f"{event['dropped_pct']:>8}%" + ''.join(f"{latency.get(f'p{pct}', '-'):>10}" for pct in PERCENTILES))
+        if phase['misrouted']:
+            print(f"  misrouted: {phase['misrouted']}")
+        print(f"  emit_to_client_type {phase['emit_to_client_type_ms']} ms, "
+              f"cleanup_stale_connections {phase['cleanup_stale_connections_ms']} ms")
+    for number, storm in enumerate(report['storms'], 1):
+        print(f"\nstorm {number}: {storm['reconnected']} reconnected, {storm['failed']} failed in {storm['seconds']}s "
+              f"(connect {storm['connect_ms']} ms); connected {storm['connected']}, registry {storm['registry']}")
+    memory = report['memory']
+    if memory.get('rss_start'):
+        print(f"\nServer RSS {memory['rss_start'] / 1024 / 1024:.1f} MB -> {memory['rss_end'] / 1024 / 1024:.1f} MB, "
+              f"threads {memory['threads_start']} -> {memory['threads_end']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m bench.socket_load',
+                                     description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chrome', type=int, default=20, help='Chrome extension clients')
+    parser.add_argument('--premiere', type=int, default=2, help='Premiere panel clients')
+    parser.add_argument('--jobs', type=int, default=4, help='concurrent synthetic download jobs')
+    parser.add_argument('--job-seconds', type=float, default=10)
+    parser.add_argument('--progress-hz', type=float, default=2, help='progress updates per second per job')
+    parser.add_argument('--storm-rounds', type=int, default=3)
+    parser.add_argument('--storm-fraction', type=float, default=1.0, help='share of clients dropped per storm')
+    parser.add_argument('--server-mode', choices=('asgi', 'threading'),
+                        help='server core to test (default: what the app would pick)')
+    parser.add_argument('--output', help='also write the report as JSON')
+    parser.add_argument('--keep', action='store_true', help='keep the work dir (server log)')
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix='ytp-socket-load-')
+    process, url = _start_server(work_dir, _free_port(), args.server_mode)
+    clients = ([_Client('premiere', index, url, answers_imports=(index == 0)) for index in range(args.premiere)]
+               + [_Client('chrome', index, url) for index in range(args.chrome)])
+    try:
+        start = _stats(url)
+        connect_times = _connect_all(clients)
+        report = {
+            'options': vars(args),
+            'connect': {
+                'failed': sum(1 for t in connect_times if t is None),
+                'connect_ms': _distribution([t for t in connect_times if t is not None]),
+            },
+        }
+        print(f"Running {args.jobs} jobs of {args.job_seconds}s")
+        report['jobs'] = run_jobs(args, url, clients, first_job=1)
+        print(f"Reconnect storm x{args.storm_rounds}")
+        report['storms'] = run_storm(args, url, clients)
+        print("Running the jobs again")
+        report['jobs_after_storm'] = run_jobs(args, url, clients, first_job=args.jobs + 1)
+        end = _stats(url)
+        report['memory'] = {'rss_start': start.get('rss'), 'rss_end': end.get('rss'),
+                            'threads_start': start['threads'], 'threads_end': end['threads']}
+    finally:
+        for client in clients:
+            client.disconnect()
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        if args.keep:
+            print(f"Work dir kept: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
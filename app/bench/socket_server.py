@@ -0,0 +1,151 @@
+"""
+The real Socket.IO server, instrumented for bench.socket_load.
+
+Imports YoutubetoPremiere (app, socketio and its handlers), registers the
+routes as run_server does, and serves on 127.0.0.1:<port> without the
+Premiere monitor, sounds or warm-up. emit_to_client_type and
+cleanup_stale_connections are wrapped to time every call. Two extra HTTP
+endpoints drive the load test:
+
+- POST /bench/jobs runs synthetic download jobs. Each job emits progress the
+  way download_video (broadcast 'progress' + 'percentage') and the yt-dlp
+  progress hook (targeted 'progress' to Chrome) do, then queues its file for
+  import, so the Premiere batch and 'complete' round trip runs too. The
+  request returns once the jobs are done, with the number of events emitted
+  per (event, audience).
+- GET /bench/stats returns CPU time, memory, thread count, the
+  connected_clients registry and the emit/cleanup timings.
+
+Start it through bench.socket_load, which gives it a throwaway HOME/TMPDIR
+(logs and the job journal go there).
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+import YoutubetoPremiere as server
+import import_batcher
+from flask import request, jsonify
+from routes import register_routes
+from utils import load_settings
+
+_lock = threading.Lock()
+_emitted = {}                 # (event, audience) -> count
+_timings = {'emit_to_client_type': [], 'cleanup_stale_connections': []}
+_original_emit = server.emit_to_client_type
+_original_cleanup = server.cleanup_stale_connections
+
+
+def _timed(name, function):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            with _lock:
+                _timings[name].append(elapsed)
+    return wrapper
+
+
+# emit_to_client_type looks both names up as module globals
+server.emit_to_client_type = _timed('emit_to_client_type', _original_emit)
+server.cleanup_stale_connections = _timed('cleanup_stale_connections', _original_cleanup)
+
+
+def _count(event, audience):
+    with _lock:
+        _emitted[(event, audience)] = _emitted.get((event, audience), 0) + 1
+
+
+def _marker(job, audience):
+    """Payload field telling the client who the event was meant for and when it was sent"""
+    return {'job': job, 'audience': audience, 'sent': time.time()}
+
+
+def _synthetic_job(number, seconds, progress_hz):
+    """Progress events at progress_hz for `seconds`, then an import of the job's (fake) file"""
+    ticks = max(1, int(seconds * progress_hz))
+    for tick in range(ticks + 1):
+        percent = tick * 100 // ticks
+        # download_video: broadcast
+        server.socketio.emit('progress', {'progress': str(percent), 'type': 'full', 'bench': _marker(number, 'all')})
+        _count('progress', 'all')
+        server.socketio.emit('percentage', {'percentage': f'{percent}%', 'bench': _marker(number, 'all')})
+        _count('percentage', 'all')
+        # yt-dlp progress hook: Chrome only
+        server.emit_to_client_type('progress', {'progress': str(percent), 'type': 'full',
+                                                'bench': _marker(number, 'chrome')}, 'chrome')
+        _count('progress', 'chrome')
+        time.sleep(1 / progress_hz)
+    # The file name carries the finish time so clients can time the import round trip
+    import_batcher.queue_import(f'bench-{number}-{time.time():.6f}.mp4', '')
+    _count('import_videos', 'premiere')
+
+
+def _register_bench_routes(app):
+    @app.route('/bench/jobs', methods=['POST'])
+    def bench_jobs():
+        data = request.get_json(silent=True) or {}
+        jobs = int(data.get('jobs', 1))
+        seconds = float(data.get('seconds', 10))
+        progress_hz = float(data.get('progress_hz', 2))
+        first = int(data.get('first', 1))
+        with _lock:
+            _emitted.clear()
+        threads = [threading.Thread(target=_synthetic_job, args=(first + index, seconds, progress_hz), daemon=True)
+                   for index in range(jobs)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with _lock:
+            emitted = [{'event': event, 'audience': audience, 'count': count}
+                       for (event, audience), count in sorted(_emitted.items())]
+        return jsonify({'emitted': emitted})
+
+    @app.route('/bench/stats')
+    def bench_stats():
+        with _lock:
+            timings = {name: list(values) for name, values in _timings.items()}
+            if request.args.get('reset'):
+                for values in _timings.values():
+                    values.clear()
+        stats = {
+            'cpu_seconds': time.process_time(),
+            'threads': threading.active_count(),
+            'registry': {client_type: len(clients) for client_type, clients in server.connected_clients.items()},
+            'timings': timings,
+        }
+        if PSUTIL_AVAILABLE:
+            process = psutil.Process()
+            stats['rss'] = process.memory_info().rss
+            stats['open_files'] = len(process.open_files())
+        return jsonify(stats)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, required=True)
+    args = parser.parse_args()
+
+    settings = load_settings(resolve_ffmpeg=False)
+    register_routes(server.app, server.socketio, settings, server.emit_to_client_type)
+    import_batcher.set_emit_function(server.emit_to_client_type)
+    _register_bench_routes(server.app)
+    server.socketio.run(server.app, host='127.0.0.1', port=args.port, debug=False, use_reloader=False,
+                        log_output=False, allow_unsafe_werkzeug=True)
+
+
+if __name__ == '__main__':
+    main()
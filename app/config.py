@@ -21,3 +21,72 @@ LICENSE_CACHE_DURATION = 3600  # 1 heure
 # Version de l'application
 APP_VERSION = "3.0.32"
 
+
+# Regroupement des imports Premiere (import_batcher)
+# Fenêtre de collecte avant l'envoi d'un lot (en secondes)
+IMPORT_BATCH_WINDOW = 0.75
+# Nombre maximum de fichiers par lot avant envoi immédiat
+IMPORT_BATCH_MAX_FILES = 10
+# Délai d'attente de la réponse du panneau pour un lot ; au-delà ses fichiers sont signalés en échec (en secondes)
+IMPORT_BATCH_TIMEOUT = 120
+
+# Son de notification : fenêtre de regroupement des lectures (en secondes)
+SOUND_COALESCE_WINDOW = 0.5
+
+# Préchauffage au démarrage : attente maximale d'un composant encore en cours (en secondes)
+WARMUP_WAIT_TIMEOUT = 60
+
+# Paramètres : intervalle minimal entre deux vérifications de modification de settings.json (en secondes)
+SETTINGS_MTIME_CHECK_INTERVAL = 1.0
+
+# Extraits (stratégie DASH partielle) : télécharger la vidéo et l'audio en parallèle
+CLIP_PARALLEL_STREAMS = True
+
+# Audio : débit AAC utilisé quand la source doit être convertie (opus/vorbis)
+AUDIO_TRANSCODE_BITRATE = '192k'
+# Nombre maximum d'encodages audio simultanés (les copies de flux ne sont pas limitées)
+AUDIO_ENCODER_POOL_SIZE = 2
+
+# FFmpeg : nombre maximum de processus simultanés (extraits > vidéos complètes > audio)
+FFMPEG_MAX_CONCURRENT = max(1, min(4, (os.cpu_count() or 2) // 2))
+
+# Cache yt-dlp (lecteur JS YouTube, signatures résolues) : taille maximale avant élagage LRU (en Mo)
+YTDLP_CACHE_MAX_MB = 200
+# Intervalle minimal entre deux élagages du cache yt-dlp (en secondes)
+YTDLP_CACHE_PRUNE_INTERVAL = 3600
+
+# Réservation des noms de fichiers entre processus : durée après laquelle une réservation est périmée (en secondes)
+NAME_RESERVATION_TTL = 24 * 3600
+
+# Téléchargeur segmenté (flux DASH https) : connexions simultanées par fichier
+SEGMENTED_CONNECTIONS = 4
+# Taille minimale d'un flux pour utiliser le téléchargeur segmenté (en Mo)
+SEGMENTED_MIN_SIZE_MB = 8
+
+# Bande passante : débit total maximal des téléchargements en Mbit/s (0 = illimité)
+BANDWIDTH_LIMIT_MBPS = 0
+# Intervalle de recalcul des parts de bande passante entre les téléchargements (en secondes)
+BANDWIDTH_TICK_SECONDS = 1.0
+
+# Processus de téléchargement (paramètre 'processWorkers') : nombre de processus
+DOWNLOAD_WORKER_PROCESSES = 2
+# Délai avant de tuer un processus dont le téléchargement annulé ne s'arrête pas (en secondes)
+WORKER_CANCEL_GRACE = 10
+# Un processus sans aucune activité pendant ce délai est considéré bloqué et tué (en secondes)
+WORKER_STALL_TIMEOUT = 900
+
+# Journal des téléchargements : durée de conservation des tâches terminées (en secondes)
+JOB_JOURNAL_MAX_AGE = 7 * 24 * 3600
+# Nombre maximum de reprises d'une tâche interrompue (plantage ou arrêt du serveur)
+JOB_JOURNAL_MAX_ATTEMPTS = 3
+
+# Mesures par tâche : nombre de chronologies conservées pour /jobs/<id>/timeline
+JOB_TIMELINE_MAX = 200
+
+# Serveur : 'asgi' (boucle d'événements uvicorn, sans thread par connexion) ou 'threading' (Werkzeug).
+# Repli sur 'threading' si uvicorn/a2wsgi manquent ; la variable YTPP_SERVER_MODE remplace ce choix
+SERVER_MODE = 'asgi'
+# Mode 'asgi' : threads exécutant les routes HTTP Flask
+SERVER_HTTP_THREADS = 16
+# Mode 'asgi' : threads exécutant les gestionnaires d'événements Socket.IO
+SERVER_HANDLER_THREADS = 8
@@ -0,0 +1,490 @@
+"""
+Shared YouTube cookie store.
+
+Cookies are parsed once into in-memory cookie jars that every job shares, and
+are handed to yt-dlp directly (see open_ydl) instead of being written to
+temporary Netscape files that yt-dlp parses again. Three sources, in order:
+
+- cookies sent by the browser extension with a request,
+- cookies stored with /set-youtube-cookies (persisted in youtube_cookies.txt),
+- cookies extracted from the local browser.
+
+Decrypting a browser's cookie database is slow, so browser cookies are
+extracted once and kept in memory and in an on-disk cache. They are
+re-extracted only when the browser's cookie database changes (mtime) or when
+YouTube rejects them. Extraction is lazy: jobs that succeed without
+authentication never trigger it.
+
+Jobs refer to a source by a key (the value passed as cookies_file to
+get_robust_ydl_options), resolved to a jar with get_jar().
+"""
+import os
+import sys
+import glob
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+import http.cookiejar
+import urllib.request
+import bandwidth
+import job_metrics
+
+# Cookie source keys
+FROM_BROWSER = 'browser'
+STORED = 'stored'
+EXTENSION_PREFIX = 'extension:'
+
+BROWSERS = ('chrome', 'edge', 'firefox')
+COOKIE_DOMAINS = ('youtube.com', 'google.com')
+
+# Cookies the extension sends that are not needed for YouTube auth
+IGNORED_COOKIES = (
+    'GMAIL_AT', 'COMPASS', '__utma', '__utmb', '__utmc', '__utmz', 'IDE', 'DV',
+    'WML', 'GX', 'SMSV', 'ACCOUNT_CHOOSER', 'UULE', '__Host-GMAIL_SCH_GMN',
+    '__Host-GMAIL_SCH_GMS', '__Host-GMAIL_SCH_GML', '__Host-GMAIL_SCH',
+    '__Host-GAPS', '__Host-1PLSID', '__Host-3PLSID', '__Secure-DIVERSION_ID',
+    'LSOLH', '__Secure-ENID', 'OTZ', 'LSID', 'user_id', 'GEM'
+)
+ALLOWED_COOKIE_DOMAINS = ('.youtube.com', 'www.youtube.com', 'youtube.com', 'm.youtube.com',
+                          '.google.com', 'accounts.google.com')
+MAX_EXTENSION_JARS = 4
+# yt-dlp errors meaning YouTube refused the cookies (anything else says nothing about them)
+AUTH_REJECTION_MARKERS = ('sign in to confirm', 'sign in to view', 'login required', 'cookies are no longer valid',
+                          'http error 403', '403: forbidden')
+
+_lock = threading.RLock()
+_browser_cache = None      # {'browser', 'db_mtime', 'path', 'jar'}
+_failed_signature = None   # cookie DB mtimes when extraction last failed everywhere
+_stored_cache = None       # {'mtime', 'jar'}
+_extension_jars = {}       # key -> jar, least recently used first
+_extension_pins = {}       # key -> number of running jobs using the jar (never evicted)
+_ydl_class = None
+
+
+def get_cookies_dir():
+    """Directory holding the persisted cookie files"""
+    cookies_dir = os.path.join(os.environ.get('TEMP', tempfile.gettempdir()), 'YoutubetoPremiere')
+    os.makedirs(cookies_dir, exist_ok=True)
+    return cookies_dir
+
+
+def _cookie_db_patterns(browser):
+    """Glob patterns of a browser's cookie database, per platform"""
+    home = os.path.expanduser('~')
+    if sys.platform == 'win32':
+        local = os.environ.get('LOCALAPPDATA', os.path.join(home, 'AppData', 'Local'))
+        roaming = os.environ.get('APPDATA', os.path.join(home, 'AppData', 'Roaming'))
+        roots = {
+            'chrome': os.path.join(local, 'Google', 'Chrome', 'User Data'),
+            'edge': os.path.join(local, 'Microsoft', 'Edge', 'User Data'),
+            'firefox': os.path.join(roaming, 'Mozilla', 'Firefox', 'Profiles'),
+        }
+    elif sys.platform == 'darwin':
+        support = os.path.join(home, 'Library', 'Application Support')
+        roots = {
+            'chrome': os.path.join(support, 'Google', 'Chrome'),
+            'edge': os.path.join(support, 'Microsoft Edge'),
+            'firefox': os.path.join(support, 'Firefox', 'Profiles'),
+        }
+    else:
+        roots = {
+            'chrome': os.path.join(home, '.config', 'google-chrome'),
+            'edge': os.path.join(home, '.config', 'microsoft-edge'),
+            'firefox': os.path.join(home, '.mozilla', 'firefox'),
+        }
+    root = roots[browser]
+    if browser == 'firefox':
+        return [os.path.join(root, '*', 'cookies.sqlite')]
+    return [os.path.join(root, '*', 'Network', 'Cookies'), os.path.join(root, '*', 'Cookies')]
+
+
+def get_cookie_db_mtime(browser):
+    """Latest mtime of the browser's cookie database(s), None if not installed"""
+    mtimes = []
+    for pattern in _cookie_db_patterns(browser):
+        for path in glob.glob(pattern):
+            try:
+                mtimes.append(os.path.getmtime(path))
+            except OSError:
+                pass
+    return max(mtimes) if mtimes else None
+
+
+def _cache_paths():
+    cookies_dir = get_cookies_dir()
+    return (os.path.join(cookies_dir, 'youtube_browser_cookies.txt'),
+            os.path.join(cookies_dir, 'youtube_browser_cookies.json'))
+
+
+def _extract_from_browser(browser):
+    """Decrypt the browser's cookies and keep only YouTube/Google ones"""
+    from yt_dlp.cookies import extract_cookies_from_browser, YoutubeDLCookieJar
+    jar = YoutubeDLCookieJar()
+    for cookie in extract_cookies_from_browser(browser):
+        if cookie.domain.lstrip('.').endswith(COOKIE_DOMAINS):
+            jar.set_cookie(cookie)
+    return jar
+
+
+def _load_disk_cache():
+    """Reuse the cookies extracted by a previous run if the browser DB is unchanged"""
+    cookies_path, meta_path = _cache_paths()
+    try:
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        browser = meta.get('browser')
+        if browser not in BROWSERS or not os.path.exists(cookies_path):
+            return None
+        if get_cookie_db_mtime(browser) != meta.get('db_mtime'):
+            return None
+        from yt_dlp.cookies import YoutubeDLCookieJar
+        jar = YoutubeDLCookieJar(cookies_path)
+        jar.load(ignore_discard=True, ignore_expires=True)
+        logging.info(f"[COOKIES] Using cached {browser} cookies ({len(jar)} cookies, browser unchanged)")
+        return {'browser': browser, 'db_mtime': meta['db_mtime'], 'path': cookies_path, 'jar': jar}
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.debug(f"[COOKIES] Ignoring browser cookies cache: {e}")
+        return None
+
+
+def _cache_is_current(cache):
+    return (cache is not None
+            and os.path.exists(cache['path'])
+            and get_cookie_db_mtime(cache['browser']) == cache['db_mtime'])
+
+
+def get_browser_cookies():
+    """Return the cached browser cookies {'browser', 'path', 'jar', ...} or None.
+
+    Extracts from Chrome, then Edge, then Firefox only when there is no cache
+    or the browser's cookie database changed since the last extraction.
+    """
+    global _browser_cache, _failed_signature
+    with _lock:
+        if _cache_is_current(_browser_cache):
+            return _browser_cache
+
+        if _browser_cache is None:
+            _browser_cache = _load_disk_cache()
+            if _browser_cache is not None:
+                return _browser_cache
+
+        signature = tuple(get_cookie_db_mtime(b) for b in BROWSERS)
+        if signature == _failed_signature:
+            # Nothing changed since every browser failed; don't decrypt again
+            return None
+
+        cookies_path, meta_path = _cache_paths()
+        for browser, db_mtime in zip(BROWSERS, signature):
+            if db_mtime is None:
+                continue
+            try:
+                logging.info(f"[COOKIES] Extracting YouTube cookies from {browser}")
+                jar = _extract_from_browser(browser)
+                if not len(jar):
+                    logging.info(f"[COOKIES] No YouTube cookies in {browser}")
+                    continue
+                jar.save(cookies_path, ignore_discard=True, ignore_expires=True)
+                with open(meta_path, 'w') as f:
+                    json.dump({'browser': browser, 'db_mtime': db_mtime}, f)
+                _browser_cache = {'browser': browser, 'db_mtime': db_mtime, 'path': cookies_path, 'jar': jar}
+                _failed_signature = None
+                logging.info(f"[COOKIES] Extracted {len(jar)} cookies from {browser}")
+                return _browser_cache
+            except Exception as e:
+                logging.debug(f"Failed to extract cookies from {browser}: {e}")
+
+        logging.warning("Could not extract cookies from any browser")
+        _browser_cache = None
+        _failed_signature = signature
+        return None
+
+
+def is_auth_rejection(error):
+    """True when a yt-dlp error says the cookies were rejected (not a private video, geo-block, network error...)"""
+    message = str(error).lower()
+    return any(marker in message for marker in AUTH_REJECTION_MARKERS)
+
+
+def report_auth_failure():
+    """YouTube rejected the browser cookies: re-extract them on next use"""
+    global _browser_cache, _failed_signature
+    with _lock:
+        if _browser_cache is None:
+            return
+        logging.info(f"[COOKIES] Authentication failed with cached {_browser_cache['browser']} cookies, will re-extract")
+        _browser_cache = None
+        _failed_signature = None
+        for path in _cache_paths():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def verify_authentication_cookies(cookies_list):
+    """Verify if the cookies contain necessary authentication data for YouTube"""
+    if not cookies_list:
+        return False, "No cookies provided"
+
+    names = {cookie.get('name', '') for cookie in cookies_list}
+    has_login_info = 'LOGIN_INFO' in names
+    has_sapisid = 'SAPISID' in names or '__Secure-3PAPISID' in names
+    has_sid = 'SID' in names
+
+    if has_login_info and has_sapisid:
+        return True, "Full authentication detected"
+    elif has_sapisid or has_sid:
+        return True, "Partial authentication detected"
+    else:
+        return False, "No authentication cookies found"
+
+
+def _clean(value):
+    return str(value).replace('\t', '').replace('\n', '').replace('\r', '').strip()
+
+
+def cookie_from_extension(cookie):
+    """Convert a Chrome extension cookie dict to a cookiejar Cookie (None if not needed)"""
+    name = _clean(cookie.get('name', ''))
+    value = _clean(cookie.get('value', ''))
+    domain = _clean(cookie.get('domain', '.youtube.com'))
+    path = _clean(cookie.get('path', '/')) or '/'
+
+    # Skip invalid, overly long or unneeded cookies
+    if not name or not value or len(value) > 8192:
+        return None
+    if name.startswith('__Host-') or name in IGNORED_COOKIES:
+        return None
+    if domain not in ALLOWED_COOKIE_DOMAINS:
+        return None
+
+    try:
+        expires = int(float(cookie.get('expirationDate') or 0)) or None
+    except (ValueError, TypeError):
+        expires = None
+
+    return http.cookiejar.Cookie(
+        version=0, name=name, value=value, port=None, port_specified=False,
+        domain=domain, domain_specified=True, domain_initial_dot=domain.startswith('.'),
+        path=path, path_specified=True, secure=bool(cookie.get('secure', False)),
+        expires=expires, discard=expires is None, comment=None, comment_url=None, rest={})
+
+
+def jar_from_cookie_list(cookies_list):
+    """Build a cookie jar from the cookies sent by the browser extension"""
+    from yt_dlp.cookies import YoutubeDLCookieJar
+    jar = YoutubeDLCookieJar()
+    for cookie in cookies_list:
+        converted = cookie_from_extension(cookie)
+        if converted is not None:
+            jar.set_cookie(converted)
+    return jar
+
+
+def _pin(key):
+    _extension_pins[key] = _extension_pins.get(key, 0) + 1
+
+
+def _evict_extension_jars():
+    """Drop the least recently used jars no running job holds, down to MAX_EXTENSION_JARS"""
+    for key in [key for key in _extension_jars if key not in _extension_pins]:
+        if len(_extension_jars) <= MAX_EXTENSION_JARS:
+            break
+        del _extension_jars[key]
+
+
+def use_extension_cookies(cookies_list, pin=False):
+    """Parse cookies sent with a request once; returns their source key or None.
+
+    With pin=True the jar is kept until release_extension_cookies(key).
+    """
+    cookies_str = str(sorted((c.get('name', ''), c.get('value', '')) for c in cookies_list))
+    key = EXTENSION_PREFIX + hashlib.md5(cookies_str.encode()).hexdigest()
+    with _lock:
+        if key in _extension_jars:
+            logging.debug("[COOKIES] Reusing parsed extension cookies")
+            _extension_jars[key] = _extension_jars.pop(key)
+            if pin:
+                _pin(key)
+            return key
+
+    is_authenticated, auth_status = verify_authentication_cookies(cookies_list)
+    logging.info(f"Cookie authentication status: {auth_status}")
+    if not is_authenticated:
+        logging.warning("Warning: No valid authentication cookies found. Downloads may fail for age-restricted content.")
+
+    jar = jar_from_cookie_list(cookies_list)
+    if not len(jar):
+        logging.error("No usable cookies in the cookies sent by the extension")
+        return None
+
+    with _lock:
+        _extension_jars[key] = jar
+        if pin:
+            _pin(key)
+        _evict_extension_jars()
+    logging.info(f"[COOKIES] Parsed {len(jar)} extension cookies into the shared jar")
+    return key
+
+
+def hold_extension_cookies(cookies_list):
+    """Parse the cookies a job was sent and keep their jar while the job runs (see release_extension_cookies)"""
+    return use_extension_cookies(cookies_list, pin=True) if cookies_list else None
+
+
+def release_extension_cookies(key):
+    """The job holding key is over: its jar can be evicted again"""
+    if not key:
+        return
+    with _lock:
+        count = _extension_pins.get(key, 0) - 1
+        if count > 0:
+            _extension_pins[key] = count
+        else:
+            _extension_pins.pop(key, None)
+        _evict_extension_jars()
+
+
+def get_stored_cookies_path():
+    return os.path.join(get_cookies_dir(), 'youtube_cookies.txt')
+
+
+def _get_stored_jar():
+    """Cookies saved with /set-youtube-cookies, re-read only if the file changed"""
+    global _stored_cache
+    path = get_stored_cookies_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        _stored_cache = None
+        return None
+    if _stored_cache is None or _stored_cache['mtime'] != mtime:
+        from yt_dlp.cookies import YoutubeDLCookieJar
+        jar = YoutubeDLCookieJar(path)
+        try:
+            jar.load()
+        except Exception as e:
+            logging.error(f"[COOKIES] Could not load stored cookies: {e}")
+            return None
+        _stored_cache = {'mtime': mtime, 'jar': jar}
+    return _stored_cache['jar'] if len(_stored_cache['jar']) else None
+
+
+def set_stored_cookies(cookies_list):
+    """Store cookies for all later jobs (persisted across restarts). Returns the count kept."""
+    global _stored_cache
+    jar = jar_from_cookie_list(cookies_list)
+    path = get_stored_cookies_path()
+    with _lock:
+        temp_path = path + '.tmp'
+        jar.save(temp_path)
+        os.replace(temp_path, path)
+        _stored_cache = {'mtime': os.path.getmtime(path), 'jar': jar}
+    return len(jar)
+
+
+def clear_stored_cookies():
+    """Forget the stored cookies. Returns True if there were any."""
+    global _stored_cache
+    with _lock:
+        _stored_cache = None
+        try:
+            os.remove(get_stored_cookies_path())
+            return True
+        except OSError:
+            return False
+
+
+def has_stored_cookies():
+    with _lock:
+        return _get_stored_jar() is not None
+
+
+def select_cookie_source(cookies_list=None):
+    """Pick the cookie source for a job: extension cookies, stored cookies, then the browser.
+
+    Browser cookies are not extracted here, only when a with-cookies attempt
+    actually needs them.
+    """
+    if cookies_list:
+        key = use_extension_cookies(cookies_list)
+        if key:
+            return key
+        return STORED if has_stored_cookies() else None
+    if has_stored_cookies():
+        logging.info("Using stored YouTube cookies")
+        return STORED
+    return FROM_BROWSER
+
+
+def is_cookie_source(value):
+    return value in (FROM_BROWSER, STORED) or (isinstance(value, str) and value.startswith(EXTENSION_PREFIX))
+
+
+def get_jar(source):
+    """Return the shared cookie jar for a source key (None if unavailable)"""
+    if source == FROM_BROWSER:
+        cache = get_browser_cookies()
+        return cache['jar'] if cache else None
+    with _lock:
+        if source == STORED:
+            return _get_stored_jar()
+        return _extension_jars.get(source)
+
+
+def cookie_header(source, url):
+    """Cookie header value for url from a source (for FFmpeg HTTP inputs), or None"""
+    jar = get_jar(source) if source else None
+    if jar is None:
+        return None
+    request = urllib.request.Request(url)
+    jar.add_cookie_header(request)
+    return request.get_header('Cookie')
+
+
+def _shared_jar_ydl_class():
+    global _ydl_class
+    if _ydl_class is None:
+        import yt_dlp
+
+        class SharedJarYoutubeDL(yt_dlp.YoutubeDL):
+            """YoutubeDL that uses a given cookie jar instead of loading a cookie file"""
+            def __init__(self, params, cookiejar):
+                # cookiejar is a cached property; seed it before __init__ builds the request handlers
+                self.__dict__['cookiejar'] = cookiejar
+                super().__init__(params)
+
+        _ydl_class = SharedJarYoutubeDL
+    return _ydl_class
+
+
+def open_ydl(params):
+    """Create a YoutubeDL, injecting the shared jar when params['cookiefile'] is a source key.
+
+    The instance is attached to the calling thread's bandwidth job (its
+    ratelimit follows the job's share) and its transfers are timed.
+    """
+    ydl = _create_ydl(params)
+    bandwidth.attach_ydl(ydl)
+    job_metrics.attach_ydl(ydl)
+    return ydl
+
+
+def _create_ydl(params):
+    source = params.get('cookiefile')
+    if not is_cookie_source(source):
+        import yt_dlp
+        return yt_dlp.YoutubeDL(params)
+
+    params = dict(params)
+    params.pop('cookiefile')
+    jar = get_jar(source)
+    if jar is None:
+        import yt_dlp
+        return yt_dlp.YoutubeDL(params)
+    return _shared_jar_ydl_class()(params, jar)
@@ -0,0 +1,179 @@
+"""
+Finished download index (dedup of repeat downloads).
+
+Records where each finished full video lives, keyed by video ID, selected
+formats and post-processing options. When the same video is requested again
+the existing file is imported directly if it is already in the download
+folder, or hardlinked (copied if linking is not possible) into it, instead of
+downloading and merging it again.
+
+Entries are checked against the file's size and mtime before use. A file
+that was renamed or moved is looked for under the download roots (the folders
+downloads went to and their parent folders): by device and inode for a move
+on the same volume, by size and mtime for a move that copied it to another
+volume. Deleted or modified files drop their entry.
+"""
+import os
+import json
+import shutil
+import logging
+import threading
+import settings_store
+from name_allocator import allocate_filename
+
+INDEX_FILENAME = 'download_cache.json'
+# Moved-file search: folder levels below each root, and entries looked at per search
+SEARCH_DEPTH = 2
+MAX_SCANNED_ENTRIES = 20000
+
+_lock = threading.Lock()
+_entries = None
+
+
+def _index_path():
+    return os.path.join(settings_store.get_settings_dir(), INDEX_FILENAME)
+
+
+def _load():
+    global _entries
+    if _entries is None:
+        try:
+            with open(_index_path(), 'r', encoding='utf-8') as f:
+                _entries = json.load(f)
+        except FileNotFoundError:
+            _entries = {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"[DEDUP] Ignoring unreadable download index: {e}")
+            _entries = {}
+    return _entries
+
+
+def _save():
+    path = _index_path()
+    temp_path = path + '.tmp'
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(_entries, f, indent=2)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logging.warning(f"[DEDUP] Could not save download index: {e}")
+
+
+def make_key(video_id, format_spec, *options):
+    return '|'.join(str(part) for part in (video_id, format_spec) + options)
+
+
+def _is_same_file(entry, st):
+    if st.st_size != entry['size']:
+        return False
+    if entry.get('inode') and st.st_ino == entry['inode'] and st.st_dev == entry.get('device', st.st_dev):
+        return True
+    # Moved to another volume (copied, then deleted): new inode, same size and mtime
+    return st.st_mtime_ns == entry['mtime_ns']
+
+
+def _is_within(path, root):
+    try:
+        return os.path.commonpath([path, root]) == root
+    except ValueError:
+        # Different drives
+        return False
+
+
+def _search_roots(entries, entry):
+    """The folder of the entry, then the parent of every folder downloads went to (nested roots dropped)"""
+    folders = {os.path.dirname(other['path']) for other in entries.values()}
+    parents = sorted({os.path.dirname(folder) or folder for folder in folders}, key=len)
+    roots = [os.path.dirname(entry['path'])]
+    for parent in parents:
+        if not any(_is_within(parent, root) for root in roots[1:]):
+            roots.append(parent)
+    return roots
+
+
+def _find_moved(entries, entry):
+    """Look for the file under another name or in another folder of the download roots"""
+    roots = _search_roots(entries, entry)
+    scanned = 0
+    for index, root in enumerate(roots):
+        stack = [(root, SEARCH_DEPTH if index else 0)]
+        while stack:
+            directory, depth = stack.pop()
+            try:
+                with os.scandir(directory) as dir_entries:
+                    for dir_entry in dir_entries:
+                        scanned += 1
+                        if scanned > MAX_SCANNED_ENTRIES:
+                            return None, None
+                        if dir_entry.is_dir(follow_symlinks=False):
+                            if depth > 0:
+                                stack.append((dir_entry.path, depth - 1))
+                            continue
+                        if dir_entry.is_file() and _is_same_file(entry, dir_entry.stat()):
+                            return dir_entry.path, os.stat(dir_entry.path)
+            except OSError:
+                pass
+    return None, None
+
+
+def lookup(key):
+    """Return the path of a finished download for key if it is still intact, else None"""
+    with _lock:
+        entries = _load()
+        entry = entries.get(key)
+        if not entry:
+            return None
+        try:
+            st = os.stat(entry['path'])
+            path = entry['path']
+        except OSError:
+            path, st = _find_moved(entries, entry)
+            if path:
+                logging.info(f"[DEDUP] Cached file was moved to {path}")
+                entry.update(path=path, inode=st.st_ino, device=st.st_dev)
+                _save()
+
+        if not path or st.st_size != entry['size'] or st.st_mtime_ns != entry['mtime_ns']:
+            logging.info(f"[DEDUP] Cached file for {key[:60]} is gone or was modified, dropping entry")
+            del entries[key]
+            _save()
+            return None
+        return path
+
+
+def record(key, path):
+    """Remember a finished download"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return
+    with _lock:
+        _load()[key] = {
+            'path': os.path.abspath(path),
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'inode': st.st_ino,
+            'device': st.st_dev,
+        }
+        _save()
+
+
+def materialize(cached_path, download_path):
+    """Make a finished file available in download_path and return its path.
+
+    A file already in that folder is returned as-is; otherwise it is hardlinked
+    there, or copied when the folders are on different volumes.
+    """
+    if os.path.normcase(os.path.abspath(os.path.dirname(cached_path))) == \
+            os.path.normcase(os.path.abspath(download_path)):
+        return cached_path
+
+    stem, ext = os.path.splitext(os.path.basename(cached_path))
+    target = os.path.join(download_path, allocate_filename(download_path, stem, ext.lstrip('.')))
+    try:
+        os.link(cached_path, target)
+        logging.info(f"[DEDUP] Hardlinked {cached_path} -> {target}")
+    except OSError:
+        shutil.copy2(cached_path, target)
+        logging.info(f"[DEDUP] Copied {cached_path} -> {target}")
+    return target
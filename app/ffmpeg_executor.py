@@ -0,0 +1,181 @@
+"""
+Central FFmpeg executor.
+
+Every FFmpeg process the app starts itself goes through here. At most
+FFMPEG_MAX_CONCURRENT run at once; waiting work is started by priority
+(interactive clips first, then full videos, then audio) and in arrival order
+within a priority. Each process gets a share of the CPU cores (-threads),
+can be cancelled by its job, and is killed if its caller exits while it runs.
+"""
+import os
+import sys
+import time
+import heapq
+import logging
+import itertools
+import threading
+import subprocess
+from contextlib import contextmanager
+from config import FFMPEG_MAX_CONCURRENT
+
+PRIORITY_CLIP = 0
+PRIORITY_FULL = 1
+PRIORITY_AUDIO = 2
+
+_cond = threading.Condition()
+_waiting = []                 # heap of (priority, sequence)
+_sequence = itertools.count()
+_running = 0
+
+
+class FFmpegCancelled(Exception):
+    """Raised when the job owning an FFmpeg process was cancelled"""
+    def __init__(self):
+        super().__init__('FFmpeg cancelled by user')
+
+
+def thread_budget():
+    """Threads per FFmpeg process so that concurrent processes share the cores"""
+    return max(1, (os.cpu_count() or 2) // FFMPEG_MAX_CONCURRENT)
+
+
+def _is_cancelled(is_cancelled):
+    return bool(is_cancelled and is_cancelled[0])
+
+
+@contextmanager
+def _slot(priority, is_cancelled=None):
+    """Hold one of the FFMPEG_MAX_CONCURRENT slots, granted by priority"""
+    global _running
+    ticket = (priority, next(_sequence))
+    with _cond:
+        heapq.heappush(_waiting, ticket)
+        if _running >= FFMPEG_MAX_CONCURRENT:
+            logging.info(f"[FFMPEG-POOL] All {FFMPEG_MAX_CONCURRENT} slots busy, queued (priority {priority})")
+        try:
+            while _running >= FFMPEG_MAX_CONCURRENT or _waiting[0] != ticket:
+                if _is_cancelled(is_cancelled):
+                    raise FFmpegCancelled()
+                _cond.wait(0.5)
+        except BaseException:
+            _waiting.remove(ticket)
+            heapq.heapify(_waiting)
+            _cond.notify_all()
+            raise
+        heapq.heappop(_waiting)
+        _running += 1
+    try:
+        yield
+    finally:
+        with _cond:
+            _running -= 1
+            _cond.notify_all()
+
+
+def _hidden_window_kwargs():
+    if sys.platform != 'win32':
+        return {}
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    startupinfo.wShowWindow = subprocess.SW_HIDE
+    return {'creationflags': subprocess.CREATE_NO_WINDOW, 'startupinfo': startupinfo}
+
+
+def _with_thread_budget(cmd):
+    """Add -threads before the output file unless the command sets it"""
+    if '-threads' in cmd or len(cmd) < 3:
+        return cmd
+    return list(cmd[:-1]) + ['-threads', str(thread_budget()), cmd[-1]]
+
+
+def _spawn(cmd, **kwargs):
+    for key, value in _hidden_window_kwargs().items():
+        kwargs.setdefault(key, value)
+    return subprocess.Popen(cmd, **kwargs)
+
+
+def _kill(proc):
+    try:
+        proc.kill()
+    except OSError:
+        pass
+
+
+def _communicate(proc, input, timeout, is_cancelled):
+    """Like Popen.communicate, but also stops the process when its job is cancelled"""
+    if is_cancelled is None:
+        try:
+            return proc.communicate(input, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill(proc)
+            proc.communicate()
+            raise
+
+    deadline = time.time() + timeout if timeout else None
+    while True:
+        try:
+            return proc.communicate(input, timeout=0.5)
+        except subprocess.TimeoutExpired:
+            input = None
+        if _is_cancelled(is_cancelled):
+            _kill(proc)
+            proc.communicate()
+            raise FFmpegCancelled()
+        if deadline and time.time() > deadline:
+            _kill(proc)
+            proc.communicate()
+            raise subprocess.TimeoutExpired(proc.args, timeout)
+
+
+@contextmanager
+def _no_slot():
+    yield
+
+
+def run(cmd, priority=PRIORITY_FULL, timeout=None, check=False, is_cancelled=None,
+        use_slot=True, input=None, capture_output=False, **kwargs):
+    """Run an FFmpeg command, with the same return value and errors as subprocess.run.
+
+    Args:
+        priority: PRIORITY_CLIP, PRIORITY_FULL or PRIORITY_AUDIO
+        is_cancelled: the job's cancel flag ([bool]); the process is killed
+                      and FFmpegCancelled raised when it becomes True
+        use_slot: False for short probes that should not queue behind long jobs
+    """
+    if capture_output:
+        kwargs['stdout'] = subprocess.PIPE
+        kwargs['stderr'] = subprocess.PIPE
+    if input is not None:
+        kwargs['stdin'] = subprocess.PIPE
+
+    with _slot(priority, is_cancelled) if use_slot else _no_slot():
+        if use_slot:
+            cmd = _with_thread_budget(cmd)
+        proc = _spawn(cmd, **kwargs)
+        try:
+            stdout, stderr = _communicate(proc, input, timeout, is_cancelled)
+        finally:
+            if proc.poll() is None:
+                _kill(proc)
+                proc.wait()
+
+    if check and proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stdout, stderr)
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+
+@contextmanager
+def popen(cmd, priority=PRIORITY_FULL, is_cancelled=None, **kwargs):
+    """Start an FFmpeg process in a slot for callers that monitor it themselves.
+
+    The process is killed if it is still running when the block exits.
+    """
+    with _slot(priority, is_cancelled):
+        proc = _spawn(_with_thread_budget(cmd), **kwargs)
+        try:
+            yield proc
+        finally:
+            if proc.poll() is None:
+                _kill(proc)
+                proc.wait()
+
@@ -0,0 +1,167 @@
+"""
+Import coalescer for the Premiere Pro panel.
+
+Finished downloads are queued here instead of being sent one by one. Paths are
+collected over a short window (or until the batch is full) and then sent as a
+single 'import_videos' event per target bin, so the panel can call
+importFiles() once for the whole burst. A batch the panel does not answer
+within IMPORT_BATCH_TIMEOUT (panel closed, Premiere busy or restarted) is
+reported as failed, file by file, like a failed reply.
+"""
+import logging
+import threading
+import job_metrics
+from config import IMPORT_BATCH_WINDOW, IMPORT_BATCH_MAX_FILES, IMPORT_BATCH_TIMEOUT
+
+_emit_function = None
+_forward_function = None  # set in download worker processes (worker_pool)
+_result_function = None
+_pending = []          # [(path, bin)] in arrival order
+_pending_lock = threading.Lock()
+_flush_timer = None
+_next_batch_id = 1
+_inflight_batches = {}  # batch_id -> {'bin': str, 'paths': [str], 'timer': Timer}
+
+
+def set_emit_function(emit_function):
+    """Set the emit_to_client_type function used to reach the Premiere panel"""
+    global _emit_function
+    _emit_function = emit_function
+
+
+def set_result_function(result_function):
+    """Set the function given each file's result ({'success', 'path', 'error'}) of an expired batch"""
+    global _result_function
+    _result_function = result_function
+
+
+def set_forward_function(forward_function):
+    """Hand queued imports to forward_function(path, bin) instead of batching them here"""
+    global _forward_function
+    _forward_function = forward_function
+
+
+def queue_import(path, bin_path=''):
+    """Queue a finished file for import into Premiere Pro.
+
+    Duplicate (path, bin) pairs already waiting in the current window are ignored.
+    """
+    global _flush_timer
+    if not path:
+        logging.error("[IMPORT-BATCH] No path provided for import")
+        return
+
+    bin_path = bin_path or ''
+    if _forward_function:
+        _forward_function(path, bin_path)
+        return
+
+    job_metrics.import_queued(path)
+    flush_now = False
+    with _pending_lock:
+        if (path, bin_path) in _pending:
+            logging.info(f"[IMPORT-BATCH] Already queued, skipping duplicate: {path}")
+            return
+        _pending.append((path, bin_path))
+        same_bin = sum(1 for _, b in _pending if b == bin_path)
+        logging.info(f"[IMPORT-BATCH] Queued for import ({same_bin} pending for bin '{bin_path or '(root)'}'): {path}")
+
+        if same_bin >= IMPORT_BATCH_MAX_FILES:
+            flush_now = True
+        elif _flush_timer is None:
+            _flush_timer = threading.Timer(IMPORT_BATCH_WINDOW, flush_imports)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+
+    if flush_now:
+        flush_imports()
+
+
+def flush_imports():
+    """Send all queued paths to the panel, one 'import_videos' event per bin"""
+    global _flush_timer, _next_batch_id
+    with _pending_lock:
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+        queued = list(_pending)
+        _pending.clear()
+
+        # Group by bin, keeping the order in which files finished
+        batches = {}
+        for path, bin_path in queued:
+            batches.setdefault(bin_path, []).append(path)
+
+        payloads = []
+        for bin_path, paths in batches.items():
+            batch_id = _next_batch_id
+            _next_batch_id += 1
+            timer = threading.Timer(IMPORT_BATCH_TIMEOUT, _expire_batch,
+                                    (batch_id, 'No reply from Premiere Pro'))
+            timer.daemon = True
+            timer.start()
+            _inflight_batches[batch_id] = {'bin': bin_path, 'paths': paths, 'timer': timer}
+            payloads.append({'batch_id': batch_id, 'bin': bin_path, 'paths': paths})
+
+    for payload in payloads:
+        logging.info(f"[IMPORT-BATCH] Sending batch {payload['batch_id']} with {len(payload['paths'])} file(s) to bin '{payload['bin'] or '(root)'}'")
+        try:
+            if _emit_function:
+                _emit_function('import_videos', payload, 'premiere')
+            else:
+                logging.warning("[IMPORT-BATCH] No emit function set, import batch dropped")
+                _expire_batch(payload['batch_id'], 'Premiere Pro panel not reachable')
+        except Exception as e:
+            logging.error(f"[IMPORT-BATCH] Error sending import batch {payload['batch_id']}: {e}")
+            _expire_batch(payload['batch_id'], 'Could not send the import to Premiere Pro')
+
+
+def _expire_batch(batch_id, reason):
+    """Report every file of a batch the panel will not answer as failed"""
+    with _pending_lock:
+        batch = _inflight_batches.pop(batch_id, None)
+    if batch is None:
+        return
+    batch['timer'].cancel()
+    logging.warning(f"[IMPORT-BATCH] Batch {batch_id} expired ({reason}), {len(batch['paths'])} file(s) reported as failed")
+    for path in batch['paths']:
+        result = {'success': False, 'error': reason, 'path': path}
+        try:
+            if _result_function:
+                _result_function(result)
+            else:
+                job_metrics.import_finished(path, False)
+        except Exception as e:
+            logging.error(f"[IMPORT-BATCH] Error reporting expired import of {path}: {e}")
+
+
+def complete_batch(data):
+    """Match a panel reply to its batch and return one result per queued file.
+
+    The panel replies with results in the same order as the paths it was sent.
+    Files it did not report on are returned as failures so every queued file
+    gets exactly one reply.
+    """
+    batch_id = data.get('batch_id')
+    reported = data.get('results') or []
+
+    with _pending_lock:
+        batch = _inflight_batches.pop(batch_id, None)
+
+    if batch is None:
+        # Unknown, already completed or expired batch - trust the panel's ordering
+        logging.warning(f"[IMPORT-BATCH] Reply for unknown batch {batch_id}")
+        return [r for r in reported if isinstance(r, dict)]
+
+    batch['timer'].cancel()
+    results = []
+    for index, path in enumerate(batch['paths']):
+        result = reported[index] if index < len(reported) else None
+        if not isinstance(result, dict):
+            result = {'success': False, 'error': 'No import result from Premiere Pro'}
+        results.append(dict(result, path=path))
+
+    ok = sum(1 for r in results if r.get('success'))
+    logging.info(f"[IMPORT-BATCH] Batch {batch_id} finished: {ok}/{len(results)} imported")
+    return results
+
@@ -0,0 +1,78 @@
+"""
+In-flight download requests, coalesced by fingerprint.
+
+A double-click in the Chrome extension, or /send-url and /handle-video-url
+both firing for the same video, used to start two identical downloads that
+reset each other's current_download. Each request is now fingerprinted on
+(video ID, download type, clip window, resolution, audio language); a request
+whose fingerprint matches a queued or running job attaches to that job (same
+job id, same progress events, same result) instead of starting new work.
+"""
+import re
+import uuid
+import logging
+import threading
+from urllib.parse import urlparse, parse_qs
+
+_VIDEO_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+# Path prefixes that carry the video ID (youtube.com/shorts/<id>, /embed/<id>...)
+_ID_PATHS = ('shorts', 'embed', 'live', 'v')
+
+_lock = threading.Lock()
+_jobs = {}                    # fingerprint -> job
+
+
+def video_id(url):
+    """YouTube video ID of a watch/short/embed/youtu.be URL (the URL itself if none is found)"""
+    try:
+        parsed = urlparse(url.strip())
+    except (AttributeError, ValueError):
+        return url
+    parts = [part for part in parsed.path.split('/') if part]
+    candidate = None
+    if parsed.netloc.lower().endswith('youtu.be') and parts:
+        candidate = parts[0]
+    elif parse_qs(parsed.query).get('v'):
+        candidate = parse_qs(parsed.query)['v'][0]
+    elif len(parts) >= 2 and parts[0] in _ID_PATHS:
+        candidate = parts[1]
+    return candidate if candidate and _VIDEO_ID.match(candidate) else url
+
+
+def fingerprint(url, download_type, clip_window=None, resolution=None, audio_language=None):
+    # 'video' and 'full' are the same download
+    kind = download_type if download_type in ('clip', 'audio') else 'full'
+    window = tuple(round(t, 2) for t in clip_window) if clip_window else None
+    return (video_id(url), kind, window, str(resolution), audio_language)
+
+
+def begin(key, job_id=None):
+    """Return (job, created). created is False when an identical job is already in flight.
+
+    job_id is given for jobs resumed from the journal; new jobs get a fresh id,
+    unique across restarts.
+    """
+    with _lock:
+        job = _jobs.get(key)
+        if job is not None:
+            job['duplicates'] += 1
+            logging.info(f"[INFLIGHT] Duplicate request attached to {job['id']} ({key[0]}, {key[1]})")
+            return job, False
+        job = _jobs[key] = {
+            'id': job_id or f"job-{uuid.uuid4().hex[:12]}",
+            'key': key,
+            'duplicates': 0,
+            'result': None,
+        }
+        return job, True
+
+
+def finish(job, result):
+    """Publish the job's result and release its fingerprint"""
+    with _lock:
+        if _jobs.get(job['key']) is job:
+            del _jobs[job['key']]
+    job['result'] = result
+    if job['duplicates']:
+        logging.info(f"[INFLIGHT] {job['id']} finished, result shared with {job['duplicates']} duplicate request(s)")
+
@@ -0,0 +1,181 @@
+"""
+Append-only journal of download jobs (job_journal.jsonl in the settings dir).
+
+Every job appends a line when it is queued (with its spec), starts running,
+finishes (with its output path or error) and when its file is imported into
+Premiere. The server can die at any point (Premiere closing ends it with
+os._exit), so on the next start:
+- jobs the previous session left queued or running are handed back, oldest
+  first, to be run again (see routes.resume_journal_jobs). Their partial
+  files are reused through resume mode;
+- finished files that Premiere never confirmed importing are queued for
+  import again when a panel connects;
+- completions of resumed jobs are re-sent to the Chrome extension when it
+  reconnects.
+
+The file is compacted at startup, keeping only the latest state of recent
+jobs. Cookies are never written to it.
+"""
+import os
+import json
+import time
+import logging
+import threading
+import settings_store
+from config import JOB_JOURNAL_MAX_AGE, JOB_JOURNAL_MAX_ATTEMPTS
+
+JOURNAL_FILENAME = 'job_journal.jsonl'
+PENDING_STATES = ('queued', 'running')
+# Per-job settings overrides kept in the spec (the rest is reloaded on resume)
+SPEC_SETTINGS = ('segmentedDownloads', 'downloadPriority')
+
+_lock = threading.Lock()
+_jobs = None                  # job_id -> merged record, in order of first appearance
+
+
+def _journal_path():
+    return os.path.join(settings_store.get_settings_dir(), JOURNAL_FILENAME)
+
+
+def _replay():
+    jobs = {}
+    try:
+        with open(_journal_path(), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # Torn last line from a crash mid-write
+                    continue
+                job = jobs.setdefault(event['job'], {'job': event['job'], 'attempts': 0})
+                if event.get('state') == 'running':
+                    job['attempts'] += 1
+                job.update({k: v for k, v in event.items() if k != 'job'})
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logging.warning(f"[JOURNAL] Could not read job journal: {e}")
+    return jobs
+
+
+def _load():
+    global _jobs
+    if _jobs is None:
+        _jobs = _replay()
+    return _jobs
+
+
+def _append(event):
+    path = _journal_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event) + '\n')
+            f.flush()
+    except OSError as e:
+        logging.warning(f"[JOURNAL] Could not write job journal: {e}")
+
+
+def record(job_id, state=None, **fields):
+    """Append a state transition and/or fields for a job"""
+    event = {'job': job_id, 'time': time.time()}
+    if state:
+        event['state'] = state
+    event.update(fields)
+    with _lock:
+        job = _load().setdefault(job_id, {'job': job_id, 'attempts': 0})
+        if state == 'running':
+            job['attempts'] += 1
+        job.update({k: v for k, v in event.items() if k != 'job'})
+        _append(event)
+
+
+def record_queued(job_id, video_url, download_type, clip_window, user_agent, settings):
+    spec = {
+        'video_url': video_url,
+        'download_type': 'clip' if clip_window else download_type,
+        'clip_start': clip_window[0] if clip_window else None,
+        'clip_end': clip_window[1] if clip_window else None,
+        'user_agent': user_agent,
+        'settings': {key: settings[key] for key in SPEC_SETTINGS if key in settings},
+    }
+    record(job_id, 'queued', spec=spec, queued_at=time.time())
+
+
+def record_result(job_id, result):
+    result = result or {'error': 'No result'}
+    if result.get('success'):
+        record(job_id, 'done', path=result.get('path'))
+    elif 'cancel' in str(result.get('error', '')).lower():
+        record(job_id, 'cancelled')
+    else:
+        record(job_id, 'failed', error=str(result.get('error'))[:500])
+
+
+def take_pending():
+    """Jobs a previous session left queued or running, oldest first.
+
+    Jobs that already crashed the server JOB_JOURNAL_MAX_ATTEMPTS times are
+    marked failed instead.
+    """
+    with _lock:
+        pending = [dict(job) for job in _load().values()
+                   if job.get('state') in PENDING_STATES and job.get('spec')]
+    pending.sort(key=lambda job: job.get('queued_at', 0))
+    resumable = []
+    for job in pending:
+        if job['attempts'] >= JOB_JOURNAL_MAX_ATTEMPTS:
+            logging.warning(f"[JOURNAL] Giving up on {job['job']} after {job['attempts']} interrupted attempts")
+            record(job['job'], 'failed', error='Interrupted too many times')
+        else:
+            resumable.append(job)
+    return resumable
+
+
+def mark_imported(path):
+    """Record that Premiere imported the file of a finished job"""
+    with _lock:
+        job_ids = [job['job'] for job in _load().values()
+                   if job.get('state') == 'done' and job.get('path') == path]
+    for job_id in job_ids:
+        record(job_id, 'imported')
+
+
+def unimported(min_age=0):
+    """Finished jobs whose file still exists but was never confirmed imported"""
+    now = time.time()
+    with _lock:
+        jobs = [dict(job) for job in _load().values()
+                if job.get('state') == 'done' and now - job.get('time', now) >= min_age]
+    return [job for job in jobs if job.get('path') and os.path.exists(job['path'])]
+
+
+def take_notifications():
+    """Completed resumed jobs the Chrome extension was not told about yet"""
+    with _lock:
+        jobs = [dict(job) for job in _load().values()
+                if job.get('resumed') and job.get('state') in ('done', 'imported') and not job.get('notified')]
+    for job in jobs:
+        record(job['job'], notified=True)
+    return jobs
+
+
+def compact():
+    """Rewrite the journal with one line per job, dropping old finished jobs"""
+    now = time.time()
+    with _lock:
+        jobs = _load()
+        for job_id, job in list(jobs.items()):
+            finished = job.get('state') not in PENDING_STATES
+            if finished and now - job.get('time', 0) > JOB_JOURNAL_MAX_AGE:
+                del jobs[job_id]
+        path = _journal_path()
+        temp_path = path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for job in jobs.values():
+                    f.write(json.dumps(job) + '\n')
+            os.replace(temp_path, path)
+        except OSError as e:
+            logging.warning(f"[JOURNAL] Could not compact job journal: {e}")
+    return len(jobs)
@@ -0,0 +1,178 @@
+"""
+Per-job phase timing.
+
+Download code wraps its phases in span() (settings, license, diagnostics,
+cookies, each extraction attempt with its strategy, format selection,
+transfer, merge, metadata, Premiere import). Every span is added to the
+timeline of the job running on the current thread (last JOB_TIMELINE_MAX jobs,
+served as JSON on /jobs/<id>/timeline) and to in-memory histograms per phase,
+served in Prometheus text format on /metrics. Comparing those across yt-dlp
+or YouTube changes shows which phase regressed without reading the log.
+
+In a download worker process (worker_pool) spans are forwarded to the server,
+which files them under the job the worker is running.
+"""
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from config import JOB_TIMELINE_MAX
+
+# Histogram buckets in seconds (Prometheus 'le' bounds)
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+# Span fields exported as Prometheus labels (the others only go to the timeline)
+LABEL_FIELDS = ('strategy', 'source')
+
+_lock = threading.Lock()
+_local = threading.local()
+_timelines = OrderedDict()    # job_id -> {'job': id, 'spans': [...], 'status': ...}
+_histograms = {}              # (phase, status, labels) -> {'buckets': [...], 'sum': s, 'count': n}
+_bytes = {}                   # source -> bytes transferred
+_jobs_finished = {}           # status -> count
+_pending_imports = {}         # path -> (job_id, queued time)
+_forward_function = None
+
+
+def set_forward_function(forward_function):
+    """Hand spans to forward_function(phase, start, seconds, status, fields) instead of storing them"""
+    global _forward_function
+    _forward_function = forward_function
+
+
+def bind(job_id):
+    """Attribute spans recorded on the calling thread to job_id"""
+    _local.job_id = job_id
+
+
+def current_job():
+    return getattr(_local, 'job_id', None)
+
+
+def record(phase, seconds, job_id=None, status='ok', start=None, **fields):
+    """Record a finished phase"""
+    start = start if start is not None else time.time() - seconds
+    if _forward_function:
+        _forward_function(phase, start, seconds, status, fields)
+        return
+    job_id = job_id or current_job()
+    labels = tuple((key, str(fields[key])) for key in LABEL_FIELDS if fields.get(key) is not None)
+    with _lock:
+        histogram = _histograms.setdefault((phase, status, labels),
+                                           {'buckets': [0] * len(BUCKETS), 'sum': 0.0, 'count': 0})
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                histogram['buckets'][index] += 1
+        histogram['sum'] += seconds
+        histogram['count'] += 1
+        if fields.get('bytes'):
+            source = str(fields.get('source', 'yt-dlp'))
+            _bytes[source] = _bytes.get(source, 0) + fields['bytes']
+        if job_id:
+            timeline = _timeline(job_id)
+            timeline['spans'].append(dict(fields, phase=phase, start=round(start, 3),
+                                          seconds=round(seconds, 3), status=status))
+
+
+def _timeline(job_id):
+    """Timeline of job_id, created if needed (caller holds _lock)"""
+    timeline = _timelines.get(job_id)
+    if timeline is None:
+        timeline = _timelines[job_id] = {'job': job_id, 'status': 'running', 'spans': []}
+        while len(_timelines) > JOB_TIMELINE_MAX:
+            _timelines.popitem(last=False)
+    return timeline
+
+
+@contextmanager
+def span(phase, **fields):
+    """Time the enclosed block as one phase of the current job (status 'error' if it raises)"""
+    start = time.time()
+    status = 'ok'
+    try:
+        yield fields
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        record(phase, time.time() - start, status=status, start=start, **fields)
+
+
+def attach_ydl(ydl):
+    """Record each file a YoutubeDL finishes downloading as a 'transfer' span of the current job"""
+    job_id = current_job()
+
+    def _on_finished(d):
+        if d.get('status') != 'finished':
+            return
+        seconds = d.get('elapsed') or 0
+        size = d.get('total_bytes') or d.get('downloaded_bytes') or 0
+        record('transfer', seconds, job_id=job_id, source='yt-dlp', bytes=size,
+               throughput_mbps=round(size * 8 / seconds / 1000 / 1000, 2) if seconds else None)
+
+    ydl.add_progress_hook(_on_finished)
+
+
+def import_queued(path):
+    with _lock:
+        _pending_imports[path] = (current_job(), time.time())
+
+
+def import_finished(path, success):
+    """Close the Premiere import round-trip of path"""
+    with _lock:
+        pending = _pending_imports.pop(path, None)
+    if pending:
+        job_id, queued = pending
+        record('premiere_import', time.time() - queued, job_id=job_id, start=queued,
+               status='ok' if success else 'error')
+
+
+def finish_job(job_id, result):
+    status = 'done' if result and result.get('success') else 'failed'
+    with _lock:
+        _timeline(job_id)['status'] = status
+        _jobs_finished[status] = _jobs_finished.get(status, 0) + 1
+
+
+def get_timeline(job_id):
+    with _lock:
+        timeline = _timelines.get(job_id)
+        if timeline is None:
+            return None
+        spans = sorted(timeline['spans'], key=lambda s: s['start'])
+    origin = spans[0]['start'] if spans else 0
+    return {
+        'job': job_id,
+        'status': timeline['status'],
+        'total_seconds': round(max((s['start'] + s['seconds'] for s in spans), default=origin) - origin, 3),
+        'spans': [dict(s, offset=round(s['start'] - origin, 3)) for s in spans],
+    }
+
+
+def _label_text(labels):
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+def prometheus_text():
+    """All metrics in the Prometheus text exposition format"""
+    lines = ['# HELP ytpp_phase_seconds Duration of download job phases',
+             '# TYPE ytpp_phase_seconds histogram']
+    with _lock:
+        for (phase, status, labels), histogram in sorted(_histograms.items()):
+            base = (('phase', phase), ('status', status)) + labels
+            for bound, count in zip(BUCKETS, histogram['buckets']):
+                lines.append(f"ytpp_phase_seconds_bucket{_label_text(base + (('le', str(bound)),))} {count}")
+            lines.append(f"ytpp_phase_seconds_bucket{_label_text(base + (('le', '+Inf'),))} {histogram['count']}")
+            lines.append(f"ytpp_phase_seconds_sum{_label_text(base)} {histogram['sum']:.6f}")
+            lines.append(f"ytpp_phase_seconds_count{_label_text(base)} {histogram['count']}")
+
+        lines += ['# HELP ytpp_transfer_bytes_total Bytes downloaded by download jobs',
+                  '# TYPE ytpp_transfer_bytes_total counter']
+        for source, total in sorted(_bytes.items()):
+            lines.append(f"ytpp_transfer_bytes_total{_label_text((('source', source),))} {total}")
+
+        lines += ['# HELP ytpp_jobs_total Finished download jobs',
+                  '# TYPE ytpp_jobs_total counter']
+        for status, count in sorted(_jobs_finished.items()):
+            lines.append(f"ytpp_jobs_total{_label_text((('status', status),))} {count}")
+    return '\n'.join(lines) + '\n'
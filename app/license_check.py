@@ -0,0 +1,67 @@
+"""
+License key validation, shared by the HTTP routes and the download engine.
+
+Keys are checked through the secure API proxy (no API keys are stored here).
+Only definite answers are cached, for LICENSE_CACHE_DURATION: an HTTP 200
+whose body carries a 'success' field. A 5xx or an unexpected body from the
+license API is not cached, so a short backend outage only affects the
+requests made during it.
+"""
+import time
+import logging
+import threading
+from config import LICENSE_API_URL, API_TIMEOUT, LICENSE_CACHE_DURATION
+
+_lock = threading.Lock()
+license_cache = {'key': None, 'is_valid': False, 'timestamp': 0}
+
+
+def check_license_key(license_key):
+    """Validate a license key, using license_cache.
+
+    Returns (is_valid, served_from_cache). Network errors are raised and not cached.
+    """
+    import requests  # Deferred: requests is slow to import and not needed on a cache hit
+    now = time.time()
+    with _lock:
+        if license_cache['key'] == license_key and license_cache['timestamp'] + LICENSE_CACHE_DURATION > now:
+            logging.info(f"License validation served from cache (valid: {license_cache['is_valid']})")
+            return license_cache['is_valid'], True
+
+    logging.info("License validation cache miss - calling secure API")
+    response = requests.post(
+        LICENSE_API_URL,
+        json={'licenseKey': license_key},
+        timeout=API_TIMEOUT,
+        headers={'Content-Type': 'application/json'}
+    )
+
+    try:
+        result = response.json() if response.status_code == 200 else None
+    except ValueError:
+        result = None
+    if not isinstance(result, dict) or 'success' not in result:
+        logging.warning(f"License API gave no definite answer (HTTP {response.status_code}), not caching it")
+        return False, False
+
+    is_valid = bool(result['success'])
+    logging.info(f"License validation via {result.get('provider', 'unknown')}: {is_valid}")
+    with _lock:
+        license_cache.update({'key': license_key, 'is_valid': is_valid, 'timestamp': now})
+    return is_valid, False
+
+
+def validate_license(license_key):
+    """True if the key is valid; False when it is not, or when it could not be checked"""
+    if not license_key:
+        return False
+    import requests
+    try:
+        is_valid, _ = check_license_key(license_key)
+        return is_valid
+    except requests.Timeout:
+        logging.error("License validation timeout")
+        return False
+    except Exception as e:
+        logging.error(f"Error validating license: {e}")
+        return False
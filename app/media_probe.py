@@ -0,0 +1,218 @@
+"""
+Structured media probe for downloaded files.
+
+MP4/M4A/MOV files are probed in-process by walking their box headers
+(moov/mvhd for the duration, trak/hdlr/stsd for each stream's codec FourCC),
+which reads a few KB and never spawns FFmpeg. Other containers (webm, ogg,
+opus) and MP4 files that cannot be parsed fall back to ffprobe's JSON output,
+or to FFmpeg's stream listing when ffprobe is not installed.
+
+Every post-download check uses the same result: media.ok is True when the
+file has at least one audio or video stream.
+"""
+import os
+import re
+import json
+import struct
+import shutil
+import logging
+from typing import NamedTuple, Optional
+import ffmpeg_executor
+
+MP4_EXTENSIONS = ('.mp4', '.m4a', '.m4v', '.mov')
+# Container boxes walked on the way to the sample descriptions
+_CONTAINER_BOXES = (b'moov', b'trak', b'mdia', b'minf', b'stbl')
+# Do not read absurdly large moov boxes into memory (corrupt size field)
+_MAX_MOOV_SIZE = 64 * 1024 * 1024
+
+
+class MediaInfo(NamedTuple):
+    path: str
+    size: int
+    duration: Optional[float] = None    # seconds
+    video_codec: Optional[str] = None   # FourCC or FFmpeg codec name ('avc1', 'h264', 'vp9'...)
+    audio_codec: Optional[str] = None   # FourCC or FFmpeg codec name ('mp4a', 'aac', 'opus'...)
+    source: Optional[str] = None        # 'boxes', 'ffprobe', 'ffmpeg' or None if unreadable
+
+    @property
+    def has_video(self):
+        return self.video_codec is not None
+
+    @property
+    def has_audio(self):
+        return self.audio_codec is not None
+
+    @property
+    def ok(self):
+        return self.has_video or self.has_audio
+
+
+def _iter_boxes(data, start=0, end=None):
+    """Yield (type, payload_start, box_end) for the boxes in data[start:end]"""
+    end = len(data) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from('>I4s', data, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > end:
+                return
+            size = struct.unpack_from('>Q', data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            return
+        yield box_type, pos + header, pos + size
+        pos += size
+
+
+def _read_moov(f, file_size):
+    """Find the top-level moov box (start or end of file) and return its bytes"""
+    pos = 0
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        header = f.read(16)
+        if len(header) < 8:
+            return None
+        size, box_type = struct.unpack_from('>I4s', header)
+        header_size = 8
+        if size == 1:
+            if len(header) < 16:
+                return None
+            size = struct.unpack_from('>Q', header, 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = file_size - pos
+        if size < header_size:
+            return None
+        if box_type == b'moov':
+            if size > _MAX_MOOV_SIZE or pos + size > file_size:
+                return None
+            f.seek(pos)
+            return f.read(size)
+        # Skip mdat and friends without reading them
+        pos += size
+    return None
+
+
+def _parse_track(data, start, end):
+    """Return (handler, sample entry FourCC) of a trak box"""
+    handler = codec = None
+    for box_type, payload, box_end in _iter_boxes(data, start, end):
+        if box_type == b'hdlr' and payload + 12 <= box_end:
+            # version/flags (4) + pre_defined (4) + handler_type (4)
+            handler = data[payload + 8:payload + 12]
+        elif box_type == b'stsd' and payload + 16 <= box_end:
+            # version/flags (4) + entry_count (4) + first entry: size (4) + format (4)
+            codec = data[payload + 12:payload + 16].decode('latin-1').strip()
+        elif box_type in _CONTAINER_BOXES:
+            sub_handler, sub_codec = _parse_track(data, payload, box_end)
+            handler = handler or sub_handler
+            codec = codec or sub_codec
+    return handler, codec
+
+
+def _probe_boxes(path, file_size):
+    with open(path, 'rb') as f:
+        moov = _read_moov(f, file_size)
+    if not moov:
+        return None
+
+    duration = video_codec = audio_codec = None
+    moov_header = 16 if struct.unpack_from('>I', moov)[0] == 1 else 8
+    for box_type, payload, box_end in _iter_boxes(moov, moov_header):
+        if box_type == b'mvhd' and payload + 4 <= box_end:
+            version = moov[payload]
+            if version == 1 and payload + 32 <= box_end:
+                timescale, length = struct.unpack_from('>IQ', moov, payload + 20)
+            elif payload + 20 <= box_end:
+                timescale, length = struct.unpack_from('>II', moov, payload + 12)
+            else:
+                continue
+            if timescale and length:
+                duration = length / timescale
+        elif box_type == b'trak':
+            handler, codec = _parse_track(moov, payload, box_end)
+            if handler == b'vide' and video_codec is None:
+                video_codec = codec
+            elif handler == b'soun' and audio_codec is None:
+                audio_codec = codec
+
+    if video_codec is None and audio_codec is None:
+        return None
+    return MediaInfo(path, file_size, duration, video_codec, audio_codec, 'boxes')
+
+
+def _find_ffprobe(ffmpeg_path):
+    if ffmpeg_path and os.path.isabs(ffmpeg_path):
+        name = 'ffprobe.exe' if ffmpeg_path.lower().endswith('.exe') else 'ffprobe'
+        candidate = os.path.join(os.path.dirname(ffmpeg_path), name)
+        if os.path.exists(candidate):
+            return candidate
+    return shutil.which('ffprobe')
+
+
+def _probe_ffprobe(ffprobe_path, path, file_size):
+    result = ffmpeg_executor.run(
+        [ffprobe_path, '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path],
+        use_slot=False, capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=15)
+    if result.returncode != 0:
+        return None
+    data = json.loads(result.stdout or '{}')
+    video_codec = audio_codec = None
+    for stream in data.get('streams', []):
+        if stream.get('codec_type') == 'video' and video_codec is None:
+            video_codec = stream.get('codec_name')
+        elif stream.get('codec_type') == 'audio' and audio_codec is None:
+            audio_codec = stream.get('codec_name')
+    try:
+        duration = float(data.get('format', {}).get('duration'))
+    except (TypeError, ValueError):
+        duration = None
+    return MediaInfo(path, file_size, duration, video_codec, audio_codec, 'ffprobe')
+
+
+def _probe_ffmpeg(ffmpeg_path, path, file_size):
+    # FFmpeg prints stream info to stderr even when no output is specified
+    result = ffmpeg_executor.run([ffmpeg_path, '-hide_banner', '-i', path], use_slot=False,
+                                 capture_output=True, text=True, encoding='utf-8', errors='replace',
+                                 timeout=15)
+    stderr = result.stderr or ''
+    video = re.search(r'Video: (\w+)', stderr)
+    audio = re.search(r'Audio: (\w+)', stderr)
+    match = re.search(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', stderr)
+    duration = int(match.group(1)) * 3600 + int(match.group(2)) * 60 + float(match.group(3)) if match else None
+    return MediaInfo(path, file_size, duration,
+                     video.group(1) if video else None,
+                     audio.group(1) if audio else None, 'ffmpeg')
+
+
+def probe(path, ffmpeg_path=None):
+    """Probe a media file. Always returns a MediaInfo; check .ok, .has_video, .has_audio."""
+    try:
+        file_size = os.path.getsize(path)
+    except OSError:
+        return MediaInfo(path, 0)
+    if file_size == 0:
+        return MediaInfo(path, 0)
+
+    if path.lower().endswith(MP4_EXTENSIONS):
+        try:
+            media = _probe_boxes(path, file_size)
+            if media:
+                return media
+        except (OSError, struct.error) as e:
+            logging.debug(f"[PROBE] Box parse failed for {path}: {e}")
+
+    try:
+        ffprobe_path = _find_ffprobe(ffmpeg_path)
+        if ffprobe_path:
+            media = _probe_ffprobe(ffprobe_path, path, file_size)
+            if media:
+                return media
+        if ffmpeg_path:
+            return _probe_ffmpeg(ffmpeg_path, path, file_size)
+    except Exception as e:
+        logging.warning(f"[PROBE] Could not probe {path}: {e}")
+    return MediaInfo(path, file_size)
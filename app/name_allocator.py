@@ -0,0 +1,131 @@
+"""
+Output file name allocation.
+
+Picking "the next free name" by probing title_1, title_2... with os.path.exists
+costs one stat per existing file, and two jobs probing at the same time can
+settle on the same name. Instead each download directory is scanned once with
+os.scandir, the highest counter per name pattern is kept in memory, and names
+are handed out under a lock so concurrent jobs never get the same one.
+
+The lock only covers this process, and full downloads run in worker processes.
+Each allocated name is therefore also claimed with an O_CREAT | O_EXCL marker
+in the settings folder (not at the output path itself: yt-dlp treats an
+existing output file as already downloaded). Markers are dropped once older
+than NAME_RESERVATION_TTL; by then the output file exists or the job is gone.
+"""
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+import settings_store
+from config import NAME_RESERVATION_TTL
+
+_lock = threading.Lock()
+_directories = {}  # normcase(dir) -> {'names': set, 'counters': {(stem, separator, ext): highest}}
+_reservations_dir = None
+_reservations_pruned = False
+
+
+def _scan(directory):
+    names = set()
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                names.add(os.path.normcase(entry.name))
+    except OSError as e:
+        logging.debug(f"Could not scan {directory}: {e}")
+    return {'names': names, 'counters': {}}
+
+
+def _highest_counter(names, stem, separator, extension):
+    """Highest existing counter for stem{separator}N.ext (0 if only the bare name exists, -1 if none)"""
+    pattern = re.compile(re.escape(os.path.normcase(f"{stem}{separator}")) + r'(\d+)'
+                         + re.escape(os.path.normcase(f".{extension}")) + '$')
+    highest = 0 if os.path.normcase(f"{stem}.{extension}") in names else -1
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            highest = max(highest, int(match.group(1)))
+    return highest
+
+
+def _ensure_reservations_dir():
+    """Marker directory, created and pruned of stale markers on first use (call with _lock held)"""
+    global _reservations_dir, _reservations_pruned
+    if _reservations_dir is None:
+        _reservations_dir = os.path.join(settings_store.get_settings_dir(), 'reserved_names')
+        os.makedirs(_reservations_dir, exist_ok=True)
+    if not _reservations_pruned:
+        _reservations_pruned = True
+        cutoff = time.time() - NAME_RESERVATION_TTL
+        try:
+            with os.scandir(_reservations_dir) as entries:
+                for entry in entries:
+                    try:
+                        if entry.stat().st_mtime < cutoff:
+                            os.remove(entry.path)
+                    except OSError:
+                        pass
+        except OSError as e:
+            logging.debug(f"Could not prune name reservations: {e}")
+    return _reservations_dir
+
+
+def _reserve(path):
+    """Claim path for this process with an O_EXCL marker; False if another process holds it"""
+    try:
+        reservations_dir = _ensure_reservations_dir()
+    except OSError as e:
+        logging.warning(f"Name reservations unavailable, relying on the in-process index: {e}")
+        return True
+    digest = hashlib.sha1(os.path.normcase(os.path.abspath(path)).encode('utf-8')).hexdigest()
+    marker = os.path.join(reservations_dir, digest)
+    try:
+        os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        return True
+    except FileExistsError:
+        pass
+    # Left behind by a job that died long ago: take it over
+    try:
+        if os.path.getmtime(marker) < time.time() - NAME_RESERVATION_TTL:
+            os.utime(marker)
+            return True
+    except OSError:
+        pass
+    return False
+
+
+def allocate_filename(directory, stem, extension, separator='_', always_number=False):
+    """Reserve and return a file name in directory that no other job will get.
+
+    Names are stem.ext, then stem{separator}1.ext, stem{separator}2.ext...
+    With always_number the bare stem.ext is never used (numbering starts at 1).
+    """
+    key = os.path.normcase(os.path.abspath(directory))
+    with _lock:
+        index = _directories.get(key)
+        if index is None:
+            index = _directories[key] = _scan(directory)
+        names = index['names']
+        pattern_key = (os.path.normcase(stem), separator, extension)
+        counter = index['counters'].get(pattern_key)
+        if counter is None:
+            counter = _highest_counter(names, stem, separator, extension)
+
+        while True:
+            counter += 1
+            if counter == 0 and always_number:
+                continue
+            filename = f"{stem}.{extension}" if counter == 0 else f"{stem}{separator}{counter}.{extension}"
+            # One lstat per allocation catches files created outside the app since the scan
+            path = os.path.join(directory, filename)
+            if os.path.normcase(filename) not in names and not os.path.lexists(path) and _reserve(path):
+                break
+            names.add(os.path.normcase(filename))
+
+        names.add(os.path.normcase(filename))
+        index['counters'][pattern_key] = counter
+    return filename
+
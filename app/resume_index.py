@@ -0,0 +1,130 @@
+"""
+Partial download index (resume mode).
+
+With the 'resumeDownloads' setting on, full video downloads are recorded in a
+small index in the download folder (video ID, format, output path) before
+they start. Their .part/.f*.* files are then kept when a download is
+cancelled or the server stops, and a later request for the same video and
+format reuses the same output name so yt-dlp continues from the existing
+bytes (continuedl) instead of starting from zero. Stream URLs are
+re-resolved by the normal extraction, so expired URLs are not a problem.
+"""
+import os
+import glob
+import json
+import time
+import logging
+import threading
+
+INDEX_FILENAME = '.ytpp_partials.json'
+# Entries older than this are dropped together with their partial files
+MAX_ENTRY_AGE = 7 * 24 * 3600
+
+_lock = threading.Lock()
+
+
+def is_enabled(settings):
+    return bool(settings and settings.get('resumeDownloads'))
+
+
+def _index_path(download_path):
+    return os.path.join(download_path, INDEX_FILENAME)
+
+
+def _entry_key(video_id, format_key):
+    return f"{video_id}|{format_key}"
+
+
+def _read(download_path):
+    try:
+        with open(_index_path(download_path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logging.warning(f"[RESUME] Ignoring unreadable partial index: {e}")
+        return {}
+
+
+def _write(download_path, entries):
+    path = _index_path(download_path)
+    if not entries:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def partial_files(output_path):
+    """Partial files yt-dlp leaves for an output path (streams, .part, .ytdl)"""
+    base_name = glob.escape(os.path.splitext(output_path)[0])
+    patterns = [f"{base_name}.f*.*", f"{base_name}.part", f"{base_name}.*.part",
+                f"{base_name}.ytdl", f"{base_name}.*.ytdl"]
+    return sorted({f for pattern in patterns for f in glob.glob(pattern)})
+
+
+def find_partial(download_path, video_id, format_key):
+    """Return the output path of an interrupted download of this video/format, or None"""
+    with _lock:
+        entries = _read(download_path)
+        entry = entries.get(_entry_key(video_id, format_key))
+        if not entry:
+            return None
+        parts = partial_files(entry['output_path'])
+        if not parts:
+            # Nothing left to resume from
+            del entries[_entry_key(video_id, format_key)]
+            _write(download_path, entries)
+            return None
+    size = sum(os.path.getsize(p) for p in parts if os.path.exists(p))
+    logging.info(f"[RESUME] Resuming {video_id} ({format_key[:60]}) from {size / 1024 / 1024:.1f} MB "
+                 f"in {len(parts)} partial file(s)")
+    return entry['output_path']
+
+
+def record_partial(download_path, video_id, format_key, output_path):
+    """Record a download before it starts so it can be resumed if interrupted"""
+    with _lock:
+        entries = _read(download_path)
+        now = time.time()
+        for key, entry in list(entries.items()):
+            if now - entry.get('updated', 0) > MAX_ENTRY_AGE:
+                for part in partial_files(entry['output_path']):
+                    try:
+                        os.remove(part)
+                    except OSError:
+                        pass
+                del entries[key]
+        entries[_entry_key(video_id, format_key)] = {
+            'video_id': video_id,
+            'format': format_key,
+            'output_path': output_path,
+            'updated': now,
+        }
+        try:
+            _write(download_path, entries)
+        except OSError as e:
+            logging.warning(f"[RESUME] Could not write partial index: {e}")
+
+
+def forget_partial(download_path, video_id, format_key):
+    """Drop the entry of a download that completed"""
+    with _lock:
+        entries = _read(download_path)
+        if entries.pop(_entry_key(video_id, format_key), None) is not None:
+            try:
+                _write(download_path, entries)
+            except OSError as e:
+                logging.warning(f"[RESUME] Could not write partial index: {e}")
+
+
+def protected_files(download_path):
+    """Partial files of indexed downloads, which temp-file sweeps must leave alone"""
+    with _lock:
+        entries = _read(download_path)
+    return {os.path.normcase(part) for entry in entries.values() for part in partial_files(entry['output_path'])}
@@ -1,26 +1,49 @@
-from flask import request, jsonify, send_file
+from flask import request, jsonify, send_file, Response
 import logging
-import json
 import time
 import threading
-from video_processing import handle_video_url, get_audio_language_options, set_emit_function
-from utils import play_notification_sound, save_license_key, get_license_key, load_settings, save_settings, save_download_path, open_sounds_folder
-from config import LICENSE_API_URL, API_TIMEOUT, LICENSE_CACHE_DURATION, APP_VERSION
+from utils import save_license_key, get_license_key, load_settings, save_settings, save_download_path, open_sounds_folder, notify_project_path
+from sound_player import play_sound, list_sound_files
+import warmup
+import ytdlp_cache
+import cookie_store
+import bandwidth
+import inflight_jobs
+import worker_pool
+import job_journal
+import job_metrics
+import import_batcher
+from config import LICENSE_API_URL, API_TIMEOUT, APP_VERSION
 import os
 import sys
-import requests
 import socket
 import platform
 import re
-import tempfile
 import subprocess
 
 # Global variable to track current download for cancellation
 current_download = {'process': None, 'ydl': None, 'cancel_callback': None}
 current_download_lock = threading.Lock()
 
-# License validation cache to avoid repeated API calls
-license_cache = {'key': None, 'is_valid': False, 'timestamp': 0}
+# Download engine module and emit function, loaded on first use (importing yt-dlp is slow)
+_video_processing = None
+_emit_function = None
+_video_processing_lock = threading.Lock()
+
+def load_video_processing():
+    """Import video_processing (and yt-dlp) once, wiring in the emit function"""
+    global _video_processing
+    with _video_processing_lock:
+        if _video_processing is None:
+            import video_processing
+            video_processing.set_emit_function(_emit_function)
+            _video_processing = video_processing
+    return _video_processing
+
+def get_download_engine():
+    """Return video_processing, waiting for any download component still warming up"""
+    warmup.wait_until_ready('yt_dlp', 'ffmpeg', 'js_runtime', 'license')
+    return load_video_processing()
 
 def get_current_download():
     """Get the current download structure for cancellation purposes"""
@@ -41,8 +64,11 @@ def register_routes(app, socketio, settings, emit_fn=None):
     # re-executed all of YoutubetoPremiere's module-level code a second time.)
     emit_to_client_type = emit_fn
 
-    # Set the emit function for video_processing to use
-    set_emit_function(emit_to_client_type)
+    # Set the emit function for video_processing to use (applied when it is first loaded)
+    global _emit_function
+    _emit_function = emit_to_client_type
+    if _video_processing is not None:
+        _video_processing.set_emit_function(emit_to_client_type)
     
     def validate_youtube_url(url):
         """Validate that the URL is from a YouTube domain"""
@@ -76,6 +102,20 @@ def register_routes(app, socketio, settings, emit_fn=None):
         connected_clients.add(client_id)
         logging.info(f'Client connected to route handler')
         socketio.emit('connection_status', {'status': 'connected'}, room=client_id)
+        redeliver_finished_jobs(request.args.get('client_type'), client_id)
+
+    def redeliver_finished_jobs(client_type, client_id):
+        """Re-send what a panel missed while it (or the server) was away"""
+        if client_type == 'premiere':
+            bin_path = load_settings().get('premiereBin', '')
+            # Skip files finished moments ago, whose import may still be on its way
+            for entry in job_journal.unimported(min_age=30):
+                logging.info(f"[JOURNAL] Re-queuing unconfirmed import of {entry['path']}")
+                import_batcher.queue_import(entry['path'], bin_path)
+        elif client_type == 'chrome':
+            for entry in job_journal.take_notifications():
+                socketio.emit('download-complete', {'url': entry['spec']['video_url'], 'path': entry.get('path')},
+                              room=client_id)
 
     @socketio.on('disconnect')
     def handle_route_disconnect(sid=None):
@@ -88,9 +128,90 @@ def register_routes(app, socketio, settings, emit_fn=None):
     def root():
         return "Premiere is alive", 200
     
+    def get_clip_window(data, current_settings):
+        """(start, end) of the clip requested around data['currentTime'], or None"""
+        current_time = data.get('currentTime')
+        if current_time is None:
+            return None
+        current_time = float(current_time)
+        seconds_before = float(current_settings.get('secondsBefore', 15))
+        seconds_after = float(current_settings.get('secondsAfter', 15))
+        return max(0, current_time - seconds_before), current_time + seconds_after
+
+    def run_download(**job):
+        """Run a download (handle_video_url arguments) here, or in a worker process when enabled"""
+        if worker_pool.is_enabled(job['settings']):
+            return worker_pool.run(job, current_download, socketio, emit_to_client_type)
+        return get_download_engine().handle_video_url(current_download=current_download, socketio=socketio, **job)
+
+    def begin_job(video_url, download_type, clip_window, current_settings, job_id=None):
+        """Register the request, or attach it to an identical request already in flight"""
+        key = inflight_jobs.fingerprint(video_url, 'clip' if clip_window else download_type, clip_window,
+                                        current_settings.get('resolution'),
+                                        current_settings.get('preferredAudioLanguage'))
+        return inflight_jobs.begin(key, job_id)
+
+    def finish_job(job, result):
+        job_journal.record_result(job['id'], result)
+        job_metrics.finish_job(job['id'], result)
+        inflight_jobs.finish(job, result)
+
+    def resume_journal_jobs():
+        """Run again, in order, the jobs the previous session left queued or running"""
+        pending = job_journal.take_pending()
+        job_journal.compact()
+        for entry in pending:
+            spec = entry['spec']
+            current_settings = load_settings()
+            current_settings.update(spec.get('settings', {}))
+            # Continue from the partial files the interrupted run left behind
+            current_settings['resumeDownloads'] = True
+            clip_window = (spec['clip_start'], spec['clip_end']) if spec.get('clip_start') is not None else None
+            job, is_new = begin_job(spec['video_url'], spec['download_type'], clip_window, current_settings,
+                                    job_id=entry['job'])
+            if not is_new:
+                continue
+            logging.info(f"[JOURNAL] Resuming {job['id']} ({spec['download_type']}) {spec['video_url']}")
+            result = None
+            try:
+                job_journal.record(job['id'], 'running', resumed=True)
+                job_metrics.bind(job['id'])
+                reset_current_download()
+                socketio.emit('download_started', {'url': spec['video_url']})
+                result = run_download(
+                    video_url=spec['video_url'],
+                    download_type=spec['download_type'],
+                    clip_start=spec.get('clip_start'),
+                    clip_end=spec.get('clip_end'),
+                    settings=current_settings,
+                    cookies=[],
+                    user_agent=spec.get('user_agent', '')
+                )
+                if 'error' in result:
+                    socketio.emit('download-failed', {'message': result['error']})
+            except Exception as e:
+                logging.error(f"[JOURNAL] Resumed job {job['id']} failed: {e}", exc_info=True)
+                result = {'error': str(e)}
+            finally:
+                finish_job(job, result)
+
+    threading.Thread(target=resume_journal_jobs, daemon=True).start()
+
     @app.route('/health')
     def health_check():
-        return jsonify({'status': 'ok'}), 200
+        return jsonify({'status': 'ok', **warmup.get_status(), 'ytdlp_cache': ytdlp_cache.get_status(),
+                        'bandwidth': bandwidth.get_status()}), 200
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(job_metrics.prometheus_text(), mimetype='text/plain; version=0.0.4')
+
+    @app.route('/jobs/<job_id>/timeline')
+    def job_timeline(job_id):
+        timeline = job_metrics.get_timeline(job_id)
+        if timeline is None:
+            return jsonify({'error': 'Unknown job'}), 404
+        return jsonify(timeline), 200
 
     @app.route('/get-version', methods=['GET'])
     def get_version():
@@ -99,6 +220,7 @@ def register_routes(app, socketio, settings, emit_fn=None):
     @app.route('/check-updates', methods=['GET'])
     def check_updates():
         """Check for available updates from GitHub releases"""
+        import requests
         try:
             # Current version from config
             current_version = APP_VERSION
@@ -200,6 +322,7 @@ def register_routes(app, socketio, settings, emit_fn=None):
         """Download the latest installer and launch it (Windows: silent NSIS, Mac: open PKG)"""
         import tempfile
         import threading
+        import requests
 
         try:
             data = request.json or {}
@@ -281,8 +404,8 @@ def register_routes(app, socketio, settings, emit_fn=None):
         else:  # POST
             try:
                 new_settings = request.get_json()
-                settings.update(new_settings)
-                if save_settings(settings):
+                # Only write what the panel sent; the store keeps everything else current
+                if save_settings(new_settings):
                     return jsonify(success=True), 200
                 else:
                     return jsonify(success=False, error="Failed to save settings"), 500
@@ -317,37 +440,27 @@ def register_routes(app, socketio, settings, emit_fn=None):
                 return jsonify({'error': 'Invalid YouTube URL'}), 400
             
             # Load current settings
+            settings_started = time.time()
             current_settings = load_settings()
-            
-            # Reset current download structure before starting new download
-            reset_current_download()
-            logging.info(f"Reset current_download structure before starting {download_type} download (legacy route)")
-            
-            # Emit start event to all connected clients
-            socketio.emit('download_started', {'url': video_url})
-            
+            clip_window = get_clip_window(data, current_settings)
+            job, is_new = begin_job(video_url, download_type, clip_window, current_settings)
+            if not is_new:
+                return jsonify({'success': True, 'message': 'Download already in progress', 'jobId': job['id']}), 202
             # IMPORTANT: Return response immediately to avoid "write() before start_response" error
             # Process download asynchronously in background thread
             def process_legacy_download_async():
+                result = None
                 try:
+                    job_journal.record(job['id'], 'running')
+                    job_metrics.bind(job['id'])
                     # Check for clip parameters from old format
-                    current_time = data.get('currentTime')
-                    
-                    if current_time is not None:
+                    if clip_window is not None:
                         # Handle clip request with old format
-                        download_type_async = 'clip'
-                        current_time = float(current_time)
-                        seconds_before = float(current_settings.get('secondsBefore', 15))
-                        seconds_after = float(current_settings.get('secondsAfter', 15))
-                        
-                        clip_start = max(0, current_time - seconds_before)
-                        clip_end = current_time + seconds_after
+                        clip_start, clip_end = clip_window
                         
-                        result = handle_video_url(
+                        result = run_download(
                             video_url=video_url, 
                             download_type='clip',
-                            current_download=current_download, 
-                            socketio=socketio,
                             clip_start=clip_start,
                             clip_end=clip_end,
                             settings=current_settings,
@@ -356,11 +469,9 @@ def register_routes(app, socketio, settings, emit_fn=None):
                         )
                     else:
                         # Use the same logic as handle_video_url_route for consistency
-                        result = handle_video_url(
+                        result = run_download(
                             video_url=video_url, 
                             download_type=download_type,
-                            current_download=current_download, 
-                            socketio=socketio,
                             settings=current_settings,
                             cookies=cookies,  # Now using actual cookies from Chrome extension
                             user_agent=user_agent
@@ -378,25 +489,39 @@ def register_routes(app, socketio, settings, emit_fn=None):
                 except Exception as async_error:
                     error_message = f"Error in async legacy download processing: {str(async_error)}"
                     logging.error(error_message, exc_info=True)
+                    result = {'error': error_message}
                     # CRITICAL: Notify client of error so it doesn't stay stuck
                     try:
                         socketio.emit('download-failed', {'message': error_message})
                         socketio.emit('percentage', {'percentage': 'Erreur'})
                     except Exception:
                         logging.error("Could not emit error to client")
+                finally:
+                    finish_job(job, result)
             
-            # Start download in background thread
+            # Start download in background thread (any failure before it runs releases the job)
             try:
+                job_journal.record_queued(job['id'], video_url, download_type, clip_window, user_agent, current_settings)
+                job_metrics.record('settings', time.time() - settings_started, job_id=job['id'])
+
+                # Reset current download structure before starting new download
+                reset_current_download()
+                logging.info(f"Reset current_download structure before starting {download_type} download (legacy route)")
+
+                # Emit start event to all connected clients
+                socketio.emit('download_started', {'url': video_url})
+
                 download_thread = threading.Thread(target=process_legacy_download_async, daemon=True)
                 download_thread.start()
-            except RuntimeError as thread_err:
-                error_message = f"Could not start download thread: {str(thread_err)}"
+            except Exception as start_error:
+                error_message = f"Could not start download: {str(start_error)}"
                 logging.error(error_message)
+                finish_job(job, {'error': error_message})
                 socketio.emit('download-failed', {'message': error_message})
                 return jsonify({'error': error_message}), 500
 
             # Return immediately with 202 Accepted status
-            return jsonify({'success': True, 'message': 'Download started'}), 202
+            return jsonify({'success': True, 'message': 'Download started', 'jobId': job['id']}), 202
         except Exception as e:
             error_message = f"Error handling legacy send-url: {str(e)}"
             logging.error(error_message)
@@ -442,56 +567,36 @@ def register_routes(app, socketio, settings, emit_fn=None):
                 return jsonify({'error': 'Invalid YouTube URL'}), 400
             
             # Load current settings
+            settings_started = time.time()
             current_settings = load_settings()
-            
-            # Create sanitized version for logging (hide license key)
-            settings_for_logging = current_settings.copy()
-            if 'licenseKey' in settings_for_logging and settings_for_logging['licenseKey']:
-                license_key = settings_for_logging['licenseKey']
-                if len(license_key) > 8:
-                    settings_for_logging['licenseKey'] = f"{license_key[:4]}...{license_key[-4:]}"
-                else:
-                    settings_for_logging['licenseKey'] = "****"
-            
-            logging.info(f"Current settings for download: {settings_for_logging}")
-            
-            # Reset current download structure before starting new download
-            reset_current_download()
-            logging.info(f"Reset current_download structure before starting {download_type} download")
-            
-            # Emit start event to all connected clients
-            socketio.emit('download_started', {'url': video_url})
-            
+            # Per-job override of the segmented downloader (not saved)
+            if 'segmented' in data:
+                current_settings['segmentedDownloads'] = bool(data['segmented'])
+            # Per-job bandwidth class ('clip', 'full', 'audio'), defaults to the download type
+            if data.get('priority'):
+                current_settings['downloadPriority'] = data['priority']
+            clip_window = get_clip_window(data, current_settings)
+            job, is_new = begin_job(video_url, download_type, clip_window, current_settings)
+            if not is_new:
+                return jsonify({'success': True, 'message': 'Download already in progress', 'jobId': job['id']}), 202
             # IMPORTANT: Return response immediately to avoid "write() before start_response" error
             # Process download asynchronously in background thread
             def process_download_async():
+                result = None
                 try:
-                    # Check for clip parameters regardless of passed download_type
-                    current_time = data.get('currentTime')
-                    
+                    job_journal.record(job['id'], 'running')
+                    job_metrics.bind(job['id'])
                     # If currentTime is provided, treat as clip download
-                    if current_time is not None:
-                        # Ensure download_type is set to 'clip'
-                        download_type_async = 'clip'
-                        logging.info(f"Handling as clip download for time: {current_time}")
-                        
-                        # Convert to float and use settings for before/after times
-                        current_time = float(current_time)
-                        seconds_before = float(current_settings.get('secondsBefore', 15))
-                        seconds_after = float(current_settings.get('secondsAfter', 15))
-                        
-                        # Calculate clip start and end times
-                        clip_start = max(0, current_time - seconds_before)
-                        clip_end = current_time + seconds_after
+                    if clip_window is not None:
+                        logging.info(f"Handling as clip download for time: {data.get('currentTime')}")
+                        clip_start, clip_end = clip_window
                         
                         logging.info(f"Clip parameters: start={clip_start}, end={clip_end}, duration={clip_end-clip_start}")
                         
                         # Process the video with clip parameters
-                        result = handle_video_url(
+                        result = run_download(
                             video_url=video_url, 
                             download_type='clip',  # Explicit clip type
-                            current_download=current_download, 
-                            socketio=socketio,
                             clip_start=clip_start,
                             clip_end=clip_end,
                             settings=current_settings,
@@ -501,11 +606,9 @@ def register_routes(app, socketio, settings, emit_fn=None):
                     else:
                         # No clip parameters, process as regular video
                         logging.info(f"Handling as regular {download_type} download")
-                        result = handle_video_url(
+                        result = run_download(
                             video_url=video_url, 
                             download_type=download_type, 
-                            current_download=current_download, 
-                            socketio=socketio,
                             settings=current_settings,
                             cookies=cookies,
                             user_agent=user_agent
@@ -523,25 +626,50 @@ def register_routes(app, socketio, settings, emit_fn=None):
                 except Exception as async_error:
                     error_message = f"Error in async download processing: {str(async_error)}"
                     logging.error(error_message, exc_info=True)
+                    result = {'error': error_message}
                     # CRITICAL: Notify client of error so it doesn't stay stuck
                     try:
                         socketio.emit('download-failed', {'message': error_message})
                         socketio.emit('percentage', {'percentage': 'Erreur'})
                     except Exception:
                         logging.error("Could not emit error to client")
+                finally:
+                    finish_job(job, result)
             
-            # Start download in background thread
+            # Start download in background thread (any failure before it runs releases the job)
             try:
+                job_journal.record_queued(job['id'], video_url, download_type, clip_window, user_agent, current_settings)
+                job_metrics.record('settings', time.time() - settings_started, job_id=job['id'])
+
+                # Create sanitized version for logging (hide license key)
+                settings_for_logging = current_settings.copy()
+                if 'licenseKey' in settings_for_logging and settings_for_logging['licenseKey']:
+                    license_key = settings_for_logging['licenseKey']
+                    if len(license_key) > 8:
+                        settings_for_logging['licenseKey'] = f"{license_key[:4]}...{license_key[-4:]}"
+                    else:
+                        settings_for_logging['licenseKey'] = "****"
+
+                logging.info(f"Current settings for download: {settings_for_logging}")
+
+                # Reset current download structure before starting new download
+                reset_current_download()
+                logging.info(f"Reset current_download structure before starting {download_type} download")
+
+                # Emit start event to all connected clients
+                socketio.emit('download_started', {'url': video_url})
+
                 download_thread = threading.Thread(target=process_download_async, daemon=True)
                 download_thread.start()
-            except RuntimeError as thread_err:
-                error_message = f"Could not start download thread: {str(thread_err)}"
+            except Exception as start_error:
+                error_message = f"Could not start download: {str(start_error)}"
                 logging.error(error_message)
+                finish_job(job, {'error': error_message})
                 socketio.emit('download-failed', {'message': error_message})
                 return jsonify({'error': error_message}), 500
 
             # Return immediately with 202 Accepted status
-            return jsonify({'success': True, 'message': 'Download started'}), 202
+            return jsonify({'success': True, 'message': 'Download started', 'jobId': job['id']}), 202
 
         except Exception as e:
             error_message = f"Error handling video URL: {str(e)}"
@@ -555,19 +683,8 @@ def register_routes(app, socketio, settings, emit_fn=None):
             volume = data.get('volume', 30)
             sound_type = data.get('sound', 'default')
             
-            # Save to settings file
-            with open(settings['SETTINGS_FILE'], 'r') as f:
-                current_settings = json.load(f)
-            
-            current_settings['notificationVolume'] = volume
-            current_settings['notificationSound'] = sound_type
-            
-            with open(settings['SETTINGS_FILE'], 'w') as f:
-                json.dump(current_settings, f, indent=4)
-                
-            # Update in-memory settings
-            settings['notificationVolume'] = volume
-            settings['notificationSound'] = sound_type
+            # Save through the settings store (the sound service is a subscriber)
+            save_settings({'notificationVolume': volume, 'notificationSound': sound_type})
             
             return jsonify(success=True), 200
         except Exception as e:
@@ -581,7 +698,8 @@ def register_routes(app, socketio, settings, emit_fn=None):
             volume = data.get('volume', 30) / 100  # Convert to 0-1 range
             sound_type = data.get('sound', 'default')
             
-            play_notification_sound(volume=volume, sound_type=sound_type)
+            # Previews interrupt the current chime so switching sounds is immediate
+            play_sound(volume=volume, sound_type=sound_type, interrupt=True)
             return jsonify(success=True), 200
         except Exception as e:
             logging.error(f"Error playing test sound: {e}")
@@ -590,41 +708,12 @@ def register_routes(app, socketio, settings, emit_fn=None):
     @app.route('/available-sounds', methods=['GET'])
     def get_available_sounds():
         try:
-            # Use the same logic as play_notification_sound() to find sounds
-            if getattr(sys, 'frozen', False):
-                # For PyInstaller, use _MEIPASS for bundled resources and executable directory for external resources
-                bundle_path = getattr(sys, '_MEIPASS', os.path.dirname(sys.executable))
-                exec_path = os.path.dirname(sys.executable)
-            else:
-                bundle_path = os.path.dirname(os.path.abspath(__file__))
-                exec_path = bundle_path
-            
-            # Define possible sound directories (same as play_notification_sound)
-            user_docs = os.path.expanduser('~/Documents')
-            user_sounds_dir = os.path.join(user_docs, 'YoutubetoPremiere', 'sounds')
-            
-            sound_dirs = [
-                user_sounds_dir,                                      # user Documents directory (highest priority)
-                os.path.join(exec_path, '_internal', 'sounds'),       # PyInstaller _internal directory (macOS)
-                os.path.join(exec_path, 'sounds'),                    # next to executable
-                os.path.join(exec_path, 'exec', 'sounds'),            # in exec subdirectory  
-                os.path.join(bundle_path, 'sounds'),                  # bundled sounds (_MEIPASS)
-                os.path.join(bundle_path, '_internal', 'sounds'),     # bundled _internal sounds
-                os.path.join(os.path.dirname(exec_path), 'sounds'),   # parent directory
-                os.path.join(exec_path, 'app', 'sounds'),             # app subdirectory
-                os.path.join(os.path.dirname(exec_path), 'app', 'sounds')  # parent app directory
-            ]
-            
-            # Find first existing sounds directory and return its files
-            for dir_path in sound_dirs:
-                if os.path.exists(dir_path):
-                    sound_files = [os.path.splitext(f)[0] for f in os.listdir(dir_path) 
-                                 if f.lower().endswith(('.mp3', '.wav')) and f != '.gitkeep']
-                    if sound_files:  # Only return if we found actual sound files
-                        logging.info(f"Found {len(sound_files)} sound files in: {dir_path}")
-                        return jsonify(sounds=sound_files)
-            
-            logging.warning(f"No sound files found in any directory: {sound_dirs}")
+            sounds_dir, sound_files = list_sound_files()
+            if sound_files:
+                logging.info(f"Found {len(sound_files)} sound files in: {sounds_dir}")
+                return jsonify(sounds=[os.path.splitext(f)[0] for f in sound_files])
+
+            logging.warning("No sound files found in any sounds directory")
             return jsonify(sounds=[])
         except Exception as e:
             logging.error(f"Error getting available sounds: {e}")
@@ -632,6 +721,7 @@ def register_routes(app, socketio, settings, emit_fn=None):
 
     @app.route('/validate-license', methods=['POST'])
     def validate_license():
+        import requests
         try:
             data = request.get_json()
             license_key = data.get('licenseKey')
@@ -671,46 +761,20 @@ def register_routes(app, socketio, settings, emit_fn=None):
 
     @app.route('/check-license', methods=['GET'])
     def check_license():
+        import requests
+        from license_check import check_license_key
         try:
             license_key = get_license_key()
             if not license_key:
                 return jsonify({'isValid': False, 'message': 'No license key found'})
 
-            # Check cache first - avoid repeated API calls
-            now = time.time()
-            if (license_cache['key'] == license_key and 
-                license_cache['timestamp'] + LICENSE_CACHE_DURATION > now):
-                logging.info(f"License validation served from cache (valid: {license_cache['is_valid']})")
+            is_valid, cached = check_license_key(license_key)
+            if cached:
                 return jsonify({
-                    'isValid': license_cache['is_valid'],
-                    'message': 'License is valid (cached)' if license_cache['is_valid'] else 'Invalid license key (cached)'
+                    'isValid': is_valid,
+                    'message': 'License is valid (cached)' if is_valid else 'Invalid license key (cached)'
                 })
 
-            # Cache miss or expired - validate with secure API proxy
-            logging.info("License validation cache miss - calling secure API")
-            
-            response = requests.post(
-                LICENSE_API_URL,
-                json={'licenseKey': license_key},
-                timeout=API_TIMEOUT,
-                headers={'Content-Type': 'application/json'}
-            )
-
-            is_valid = False
-            if response.ok:
-                result = response.json()
-                is_valid = result.get('success', False)
-                logging.info(f"License validation via {result.get('provider', 'unknown')}: {is_valid}")
-
-            # Update cache
-            license_cache.update({
-                'key': license_key,
-                'is_valid': is_valid,
-                'timestamp': now
-            })
-            
-            logging.info(f"License validation completed and cached (valid: {is_valid})")
-            
             if is_valid:
                 return jsonify({'isValid': True, 'message': 'License is valid'})
             else:
@@ -796,7 +860,7 @@ def register_routes(app, socketio, settings, emit_fn=None):
                 return jsonify({'error': 'Invalid YouTube URL'}), 400
             
             # Get available audio languages for this video
-            languages = get_audio_language_options(video_url)
+            languages = load_video_processing().get_audio_language_options(video_url)
             return jsonify({'languages': languages}), 200
             
         except Exception as e:
@@ -833,15 +897,19 @@ def register_routes(app, socketio, settings, emit_fn=None):
                         logging.info(f"Custom download path set ({user_path}) — keeping it")
                         effective_path = user_path
 
+                    notify_project_path(effective_path)
                     socketio.emit('project_path_result', {'success': True, 'path': effective_path})
                 except Exception as e:
                     logging.error(f"Error creating download folder: {str(e)}")
+                    notify_project_path(None)
                     socketio.emit('project_path_result', {'error': f"Could not create download folder: {str(e)}"})
             else:
                 logging.warning("Received empty project path from Premiere")
+                notify_project_path(None)
                 socketio.emit('project_path_result', {'error': 'Empty project path received'})
         except Exception as e:
             logging.error(f"Error handling project path response: {str(e)}")
+            notify_project_path(None)
             socketio.emit('project_path_result', {'error': str(e)})
 
     @app.route('/open-logs-folder', methods=['POST'])
@@ -977,48 +1045,10 @@ def register_routes(app, socketio, settings, emit_fn=None):
                     'error': 'No cookies provided'
                 }), 400
             
-            # Store cookies in a temporary file for yt-dlp to use
-            cookies_dir = os.path.join(os.environ.get('TEMP', tempfile.gettempdir()), 'YoutubetoPremiere')
-            os.makedirs(cookies_dir, exist_ok=True)
-            cookies_file = os.path.join(cookies_dir, 'youtube_cookies.txt')
-            
-            # Convert Chrome cookies to Netscape format for yt-dlp
-            with open(cookies_file, 'w', encoding='utf-8') as f:
-                f.write("# Netscape HTTP Cookie File\n")
-                f.write("# This is a generated file! Do not edit.\n\n")
-                
-                for cookie in cookies:
-                    # Convert Chrome cookie format to Netscape format
-                    domain = cookie.get('domain', '')
-                    flag = 'TRUE' if domain.startswith('.') else 'FALSE'
-                    path = cookie.get('path', '/')
-                    secure = 'TRUE' if cookie.get('secure', False) else 'FALSE'
-                    expiration = str(int(cookie.get('expirationDate', 0)))
-                    name = cookie.get('name', '')
-                    value = cookie.get('value', '')
-                    
-                    # Skip problematic cookies that aren't needed for YouTube auth
-                    problematic_cookies = [
-                        'GMAIL_AT', 'COMPASS', '__utma', '__utmb', '__utmc', '__utmz', 'IDE', 'DV', 
-                        'WML', 'GX', 'SMSV', 'ACCOUNT_CHOOSER', 'UULE', '__Host-GMAIL_SCH_GMN',
-                        '__Host-GMAIL_SCH_GMS', '__Host-GMAIL_SCH_GML', '__Host-GMAIL_SCH',
-                        '__Host-GAPS', '__Host-1PLSID', '__Host-3PLSID', '__Secure-DIVERSION_ID',
-                        'LSOLH', '__Secure-ENID', 'OTZ', 'LSID', 'user_id', 'GEM'
-                    ]
-                    
-                    # Skip problematic cookies and __Host-* cookies
-                    if name.startswith('__Host-') or name in problematic_cookies:
-                        continue
-                    
-                    # Only keep cookies from core YouTube/Google domains
-                    allowed_domains = ['.youtube.com', 'www.youtube.com', 'youtube.com', 'm.youtube.com', '.google.com', 'accounts.google.com']
-                    if domain not in allowed_domains:
-                        continue
-                    
-                    # Write in Netscape format: domain flag path secure expiration name value
-                    f.write(f"{domain}\t{flag}\t{path}\t{secure}\t{expiration}\t{name}\t{value}\n")
-            
-            logging.info(f"Stored {len(cookies)} YouTube cookies to {cookies_file}")
+            # Parsed once into the shared jar and persisted for later jobs
+            kept = cookie_store.set_stored_cookies(cookies)
+            cookies_file = cookie_store.get_stored_cookies_path()
+            logging.info(f"Stored {kept} of {len(cookies)} YouTube cookies to {cookies_file}")
             
             # Update settings to mark cookies as connected
             current_settings = load_settings()
@@ -1043,11 +1073,7 @@ def register_routes(app, socketio, settings, emit_fn=None):
     def clear_youtube_cookies():
         """Clear stored YouTube cookies"""
         try:
-            cookies_dir = os.path.join(os.environ.get('TEMP', tempfile.gettempdir()), 'YoutubetoPremiere')
-            cookies_file = os.path.join(cookies_dir, 'youtube_cookies.txt')
-            
-            if os.path.exists(cookies_file):
-                os.remove(cookies_file)
+            if cookie_store.clear_stored_cookies():
                 logging.info("Cleared YouTube cookies file")
             
             # Update settings to mark cookies as not connected
@@ -1072,10 +1098,8 @@ def register_routes(app, socketio, settings, emit_fn=None):
     def get_youtube_cookies_status():
         """Get the current status of YouTube cookies"""
         try:
-            cookies_dir = os.path.join(os.environ.get('TEMP', tempfile.gettempdir()), 'YoutubetoPremiere')
-            cookies_file = os.path.join(cookies_dir, 'youtube_cookies.txt')
-            
-            has_cookies = os.path.exists(cookies_file) and os.path.getsize(cookies_file) > 0
+            cookies_file = cookie_store.get_stored_cookies_path()
+            has_cookies = cookie_store.has_stored_cookies()
             
             current_settings = load_settings()
             status = current_settings.get('youtubeCookiesStatus', 'not_connected')
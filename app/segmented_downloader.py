@@ -0,0 +1,233 @@
+"""
+Multi-connection segmented downloader for single-file (https DASH) streams.
+
+YouTube throttles a single long-lived connection, so a stream's byte range is
+split into chunks fetched by SEGMENTED_CONNECTIONS workers over a pooled
+requests session. Each worker sizes its next chunk from its own observed
+throughput (about CHUNK_TARGET_SECONDS of transfer per request) and writes at
+the chunk's offset in a preallocated temporary file, renamed once complete.
+Progress is reported through a yt-dlp style progress hook.
+
+The temporary file is hidden (.<name>.segmented) rather than yt-dlp's
+<name>.part: a full-size, partly zero-filled file under the .part name, left
+by an interrupted server, would be taken by resume_index and yt-dlp for a
+partial download to continue.
+"""
+import os
+import time
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+import bandwidth
+import job_metrics
+from config import SEGMENTED_CONNECTIONS, SEGMENTED_MIN_SIZE_MB
+
+MIN_CHUNK = 512 * 1024
+MAX_CHUNK = 16 * 1024 * 1024
+INITIAL_CHUNK = 2 * 1024 * 1024
+CHUNK_TARGET_SECONDS = 2.0
+CHUNK_RETRIES = 3
+READ_SIZE = 64 * 1024
+PROGRESS_INTERVAL = 0.5
+
+
+class SegmentedDownloadError(Exception):
+    pass
+
+
+def _session(connections):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=connections)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _content_length(session, url, headers):
+    """Total size from a one-byte range request (Content-Range: bytes 0-0/<total>)"""
+    response = session.get(url, headers=dict(headers, Range='bytes=0-0'), timeout=30)
+    response.close()
+    content_range = response.headers.get('Content-Range', '')
+    if response.status_code == 206 and '/' in content_range:
+        total = content_range.rsplit('/', 1)[1]
+        if total.isdigit():
+            return int(total)
+    raise SegmentedDownloadError(f"Server does not support range requests (HTTP {response.status_code})")
+
+
+def is_worthwhile(fmt):
+    """True for single-file https streams large enough to benefit from several connections"""
+    if fmt.get('protocol') != 'https' or not fmt.get('url'):
+        return False
+    size = fmt.get('filesize') or fmt.get('filesize_approx') or 0
+    return size >= SEGMENTED_MIN_SIZE_MB * 1024 * 1024
+
+
+class _Writer:
+    """Positional writes into the preallocated file (os.pwrite where available)"""
+
+    def __init__(self, path, total_size):
+        self._lock = threading.Lock()
+        self._file = open(path, 'wb')
+        self._file.truncate(total_size)
+        self._fd = self._file.fileno()
+
+    def write(self, offset, data):
+        if hasattr(os, 'pwrite'):
+            os.pwrite(self._fd, data, offset)
+        else:
+            with self._lock:
+                self._file.seek(offset)
+                self._file.write(data)
+
+    def close(self):
+        self._file.close()
+
+
+def temp_path(dest):
+    """Where a stream is assembled before being renamed to dest"""
+    directory, name = os.path.split(dest)
+    return os.path.join(directory, f'.{name}.segmented')
+
+
+def download(url, dest, headers=None, total_size=None, connections=SEGMENTED_CONNECTIONS,
+             progress_hook=None, is_cancelled=None, info_dict=None):
+    """Download url to dest over several connections.
+
+    Raises SegmentedDownloadError on failure (the temporary file is removed). An
+    exception raised by progress_hook (e.g. cancellation) is propagated.
+    Received bytes are drawn from the calling thread's bandwidth job.
+    """
+    job_id = bandwidth.current_job()
+    headers = dict(headers or {})
+    session = _session(connections)
+    part_path = temp_path(dest)
+    try:
+        total_size = _content_length(session, url, headers) if not total_size else total_size
+        writer = _Writer(part_path, total_size)
+    except (OSError, requests.RequestException) as e:
+        session.close()
+        raise SegmentedDownloadError(str(e))
+
+    state = {'next': 0, 'done': 0, 'error': None}
+    state_lock = threading.Lock()
+    stop = threading.Event()
+
+    def claim(chunk_size):
+        with state_lock:
+            start = state['next']
+            if start >= total_size or stop.is_set():
+                return None
+            end = min(start + chunk_size, total_size) - 1
+            state['next'] = end + 1
+            return start, end
+
+    def fetch(start, end, received):
+        response = session.get(url, headers=dict(headers, Range=f'bytes={start}-{end}'),
+                               stream=True, timeout=30)
+        try:
+            if response.status_code != 206:
+                raise SegmentedDownloadError(f"HTTP {response.status_code} for bytes {start}-{end}")
+            offset = start
+            for data in response.iter_content(READ_SIZE):
+                if stop.is_set():
+                    return
+                writer.write(offset, data)
+                bandwidth.consume(job_id, len(data))
+                offset += len(data)
+                received[0] += len(data)
+                with state_lock:
+                    state['done'] += len(data)
+            if offset != end + 1:
+                raise SegmentedDownloadError(f"Short read for bytes {start}-{end} ({offset - start} bytes)")
+        finally:
+            response.close()
+
+    def worker():
+        chunk_size = INITIAL_CHUNK
+        while not stop.is_set():
+            claimed = claim(chunk_size)
+            if claimed is None:
+                return
+            start, end = claimed
+            for attempt in range(CHUNK_RETRIES):
+                began = time.time()
+                received = [0]
+                try:
+                    fetch(start, end, received)
+                    break
+                except (SegmentedDownloadError, requests.RequestException, OSError) as e:
+                    with state_lock:
+                        # Bytes of the failed attempt are fetched again
+                        state['done'] -= received[0]
+                    if attempt == CHUNK_RETRIES - 1 or stop.is_set():
+                        state['error'] = e
+                        stop.set()
+                        return
+                    logging.debug(f"[SEGMENTED] Retrying bytes {start}-{end}: {e}")
+                    time.sleep(1 + attempt)
+            # Aim for CHUNK_TARGET_SECONDS per request at this connection's throughput
+            elapsed = max(time.time() - began, 0.05)
+            throughput = (end - start + 1) / elapsed
+            chunk_size = int(min(MAX_CHUNK, max(MIN_CHUNK, throughput * CHUNK_TARGET_SECONDS)))
+
+    started = time.time()
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, connections))]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while any(thread.is_alive() for thread in threads):
+            if is_cancelled and is_cancelled[0]:
+                stop.set()
+            if progress_hook:
+                _report(progress_hook, 'downloading', state['done'], total_size, started, dest, info_dict)
+            time.sleep(PROGRESS_INTERVAL)
+    except BaseException:
+        stop.set()
+        for thread in threads:
+            thread.join(5)
+        writer.close()
+        session.close()
+        _remove(part_path)
+        raise
+
+    writer.close()
+    session.close()
+    if state['error'] or state['done'] != total_size:
+        _remove(part_path)
+        raise SegmentedDownloadError(str(state['error'] or 'download stopped before completion'))
+
+    os.replace(part_path, dest)
+    elapsed = time.time() - started
+    job_metrics.record('transfer', elapsed, source='segmented', bytes=total_size,
+                       throughput_mbps=round(total_size * 8 / max(elapsed, 0.001) / 1000 / 1000, 2))
+    logging.info(f"[SEGMENTED] {os.path.basename(dest)}: {total_size / 1024 / 1024:.1f} MB in {elapsed:.1f}s "
+                 f"({total_size / 1024 / 1024 / max(elapsed, 0.001):.1f} MB/s, {len(threads)} connections)")
+    if progress_hook:
+        _report(progress_hook, 'finished', total_size, total_size, started, dest, info_dict)
+    return dest
+
+
+def _report(progress_hook, status, done, total, started, dest, info_dict):
+    elapsed = max(time.time() - started, 0.001)
+    speed = done / elapsed
+    progress_hook({
+        'status': status,
+        'downloaded_bytes': done,
+        'total_bytes': total,
+        'filename': dest,
+        'elapsed': elapsed,
+        'speed': speed,
+        'eta': (total - done) / speed if speed else None,
+        '_percent_str': f"{done * 100 / total:5.1f}%" if total else '0%',
+        'info_dict': info_dict or {},
+    })
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
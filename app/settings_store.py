@@ -0,0 +1,268 @@
+"""
+Settings store.
+
+Keeps the authoritative copy of settings.json in memory. Reads are served from
+memory; the file is only stat'ed (at most every SETTINGS_MTIME_CHECK_INTERVAL)
+to pick up external edits. Updates are written through atomically (temp file +
+rename) and subscribers are notified of the keys that changed.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import tempfile
+import threading
+from config import SETTINGS_MTIME_CHECK_INTERVAL, BANDWIDTH_LIMIT_MBPS
+
+DEFAULT_SETTINGS = {
+    'resolution': '1080',
+    'downloadPath': '',
+    'downloadMP3': False,
+    'secondsBefore': '15',
+    'secondsAfter': '15',
+    'notificationVolume': 30,
+    'notificationSound': 'notification_sound',
+    'licenseKey': None,
+    'preferredAudioLanguage': 'original',
+    'useYouTubeAuth': False,
+    'resumeDownloads': False,
+    'segmentedDownloads': True,
+    'bandwidthLimitMbps': BANDWIDTH_LIMIT_MBPS,
+    'processWorkers': False,
+    'clipStrategy': 'auto',
+    'youtubeCookiesStatus': 'not_connected'
+}
+
+# Runtime-only keys that are never written to settings.json
+INTERNAL_KEYS = ('SETTINGS_FILE', 'ffmpeg_path', 'ffmpeg_error')
+
+_settings = None
+_settings_path = None
+_file_mtime = None
+_last_check = 0
+_lock = threading.RLock()
+_subscribers = []  # [(callback, keys or None)]
+
+
+def get_settings_dir():
+    """Return the per-user settings directory"""
+    # Windows: Always use APPDATA (C:\Users\<user>\AppData\Roaming\YoutubetoPremiere)
+    # macOS: Use ~/Library/Application Support/YoutubetoPremiere
+    # Linux: Use ~/.config/YoutubetoPremiere
+    if sys.platform == 'win32':
+        # Force Windows to use APPDATA
+        base_path = os.environ.get('APPDATA')
+        if not base_path:
+            # Fallback if APPDATA is not set (very rare)
+            base_path = os.path.join(os.path.expanduser('~'), 'AppData', 'Roaming')
+        return os.path.join(base_path, 'YoutubetoPremiere')
+    elif sys.platform == 'darwin':
+        # macOS standard location
+        return os.path.join(os.path.expanduser('~/Library/Application Support'), 'YoutubetoPremiere')
+    # Linux/Unix
+    return os.path.join(os.path.expanduser('~/.config'), 'YoutubetoPremiere')
+
+
+def _migrate_old_settings(settings_path):
+    """Windows only: copy settings from the old ~/.config location if they hold a license"""
+    old_settings_path = os.path.join(os.path.expanduser('~/.config'), 'YoutubetoPremiere', 'settings.json')
+    if not os.path.exists(old_settings_path):
+        return
+
+    # Migrate if either:
+    # 1. New file doesn't exist yet, OR
+    # 2. New file exists but has no license key (empty migration)
+    should_migrate = False
+    if not os.path.exists(settings_path):
+        should_migrate = True
+    else:
+        try:
+            with open(settings_path, 'r') as f:
+                current_settings = json.load(f)
+            if not current_settings.get('licenseKey'):
+                with open(old_settings_path, 'r') as old_f:
+                    old_settings = json.load(old_f)
+                if old_settings.get('licenseKey'):
+                    should_migrate = True
+                    logging.info("Found license in old settings, will migrate")
+        except Exception as e:
+            logging.debug(f"Could not check settings for migration: {e}")
+
+    if should_migrate:
+        try:
+            import shutil
+            shutil.copy2(old_settings_path, settings_path)
+            logging.info(f"Migrated settings from {old_settings_path} to {settings_path}")
+        except Exception as e:
+            logging.warning(f"Could not migrate old settings: {e}")
+
+
+def _sanitize_for_logging(settings):
+    """Hide the license key except its first and last 4 characters"""
+    settings_for_logging = dict(settings)
+    license_key = settings_for_logging.get('licenseKey')
+    if license_key:
+        if len(license_key) > 8:
+            settings_for_logging['licenseKey'] = f"{license_key[:4]}...{license_key[-4:]}"
+        else:
+            settings_for_logging['licenseKey'] = "****"
+    return settings_for_logging
+
+
+def _write_file(settings):
+    """Atomically replace settings.json (temp file in the same directory + rename)"""
+    global _file_mtime
+    settings_dir = os.path.dirname(_settings_path)
+    fd, temp_path = tempfile.mkstemp(prefix='settings.', suffix='.tmp', dir=settings_dir)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(settings, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, _settings_path)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    _file_mtime = os.stat(_settings_path).st_mtime_ns
+
+
+def _read_file():
+    """Load settings.json, filling in missing defaults"""
+    global _file_mtime
+    try:
+        with open(_settings_path, 'r') as f:
+            settings = json.load(f)
+        _file_mtime = os.stat(_settings_path).st_mtime_ns
+    except FileNotFoundError:
+        settings = {}
+    except ValueError as e:
+        # Half-written by another program: keep what we have until it is valid again
+        if _settings is not None:
+            logging.warning(f"[SETTINGS] Ignoring unreadable settings file: {e}")
+            _file_mtime = os.stat(_settings_path).st_mtime_ns
+            return dict(_settings)
+        raise
+
+    for key, value in DEFAULT_SETTINGS.items():
+        settings.setdefault(key, value)
+    return settings
+
+
+def _load():
+    """First load: resolve the path, migrate, read or create the file"""
+    global _settings, _settings_path
+    settings_dir = get_settings_dir()
+    os.makedirs(settings_dir, exist_ok=True)
+    _settings_path = os.path.join(settings_dir, 'settings.json')
+
+    if sys.platform == 'win32':
+        _migrate_old_settings(_settings_path)
+
+    exists = os.path.exists(_settings_path)
+    _settings = _read_file()
+    if not exists:
+        _write_file(_settings)
+    logging.info(f'Loaded settings: {_sanitize_for_logging(_settings)}')
+
+
+def _notify(settings, changed_keys):
+    """Call subscribers interested in any of the changed keys"""
+    for callback, keys in list(_subscribers):
+        if keys is not None and not changed_keys.intersection(keys):
+            continue
+        try:
+            callback(dict(settings), changed_keys)
+        except Exception as e:
+            logging.error(f"[SETTINGS] Subscriber {getattr(callback, '__name__', callback)} failed: {e}")
+
+
+def _changed_keys(old, new):
+    return {key for key in set(old) | set(new) if old.get(key) != new.get(key)}
+
+
+def _check_external_change():
+    """Reload if settings.json was modified outside this process. Returns changed keys."""
+    global _settings, _last_check
+    now = time.time()
+    if now - _last_check < SETTINGS_MTIME_CHECK_INTERVAL:
+        return set()
+    _last_check = now
+    try:
+        mtime = os.stat(_settings_path).st_mtime_ns
+    except OSError:
+        return set()
+    if mtime == _file_mtime:
+        return set()
+
+    new_settings = _read_file()
+    changed = _changed_keys(_settings, new_settings)
+    _settings = new_settings
+    if changed:
+        logging.info(f"[SETTINGS] settings.json changed on disk: {sorted(changed)}")
+    return changed
+
+
+def get_settings_path():
+    """Return the path of settings.json"""
+    with _lock:
+        if _settings is None:
+            _load()
+        return _settings_path
+
+
+def get_settings():
+    """Return a copy of the current settings (served from memory)"""
+    with _lock:
+        if _settings is None:
+            _load()
+            changed = set()
+        else:
+            changed = _check_external_change()
+        settings = dict(_settings)
+    if changed:
+        _notify(settings, changed)
+    return settings
+
+
+def update_settings(changes):
+    """Merge changes into the settings, write them through and notify subscribers.
+
+    Returns the set of keys whose value changed.
+    """
+    global _settings
+    changes = {k: v for k, v in changes.items() if k not in INTERNAL_KEYS}
+    with _lock:
+        if _settings is None:
+            _load()
+        new_settings = dict(_settings)
+        new_settings.update(changes)
+        changed = _changed_keys(_settings, new_settings)
+        if not changed:
+            return changed
+        _write_file(new_settings)
+        _settings = new_settings
+        settings = dict(_settings)
+    logging.debug(f"[SETTINGS] Saved: {sorted(changed)}")
+    _notify(settings, changed)
+    return changed
+
+
+def subscribe(callback, keys=None):
+    """Call callback(settings, changed_keys) whenever settings change.
+
+    Args:
+        callback: Function receiving a copy of the settings and the set of changed keys
+        keys: Only notify when one of these keys changes (None for any change)
+    """
+    with _lock:
+        _subscribers.append((callback, set(keys) if keys is not None else None))
+
+
+def unsubscribe(callback):
+    """Remove a callback registered with subscribe()"""
+    with _lock:
+        _subscribers[:] = [(cb, keys) for cb, keys in _subscribers if cb is not callback]
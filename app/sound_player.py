@@ -0,0 +1,181 @@
+"""
+Background notification sound service.
+
+The pygame mixer is initialized once on a dedicated thread, sound files are
+decoded into memory on first use, and play requests are queued so callers
+(Socket.IO handlers, routes) never block on playback. Requests that arrive in
+a burst are coalesced into a single chime.
+"""
+import os
+import sys
+import time
+import queue
+import logging
+import threading
+from config import SOUND_COALESCE_WINDOW
+
+SOUND_EXTENSIONS = ('.mp3', '.wav')
+
+_play_queue = queue.Queue()
+_worker_thread = None
+_worker_lock = threading.Lock()
+_sound_cache = {}  # path -> pygame.mixer.Sound
+_resolved_paths = {}  # sound_type -> path
+_channel = None
+_configured = {'volume': 0.3, 'sound_type': 'notification_sound'}  # from settings
+
+
+def get_sound_dirs():
+    """Return the candidate sounds directories, user sounds first"""
+    # Get the correct base path whether running as exe or script
+    if getattr(sys, 'frozen', False):
+        # For PyInstaller, use _MEIPASS for bundled resources and executable directory for external resources
+        bundle_path = getattr(sys, '_MEIPASS', os.path.dirname(sys.executable))
+        exec_path = os.path.dirname(sys.executable)
+    else:
+        bundle_path = os.path.dirname(os.path.abspath(__file__))
+        exec_path = bundle_path
+
+    user_docs = os.path.expanduser('~/Documents')
+    user_sounds_dir = os.path.join(user_docs, 'YoutubetoPremiere', 'sounds')
+
+    return [
+        user_sounds_dir,                                      # user Documents directory (highest priority)
+        os.path.join(exec_path, '_internal', 'sounds'),       # PyInstaller _internal directory (macOS)
+        os.path.join(exec_path, 'sounds'),                    # next to executable
+        os.path.join(exec_path, 'exec', 'sounds'),            # in exec subdirectory
+        os.path.join(bundle_path, 'sounds'),                  # bundled sounds (_MEIPASS)
+        os.path.join(bundle_path, '_internal', 'sounds'),     # bundled _internal sounds
+        os.path.join(os.path.dirname(exec_path), 'sounds'),   # parent directory
+        os.path.join(exec_path, 'app', 'sounds'),             # app subdirectory
+        os.path.join(os.path.dirname(exec_path), 'app', 'sounds')  # parent app directory
+    ]
+
+
+def list_sound_files():
+    """Return (sounds_dir, [file names]) for the first directory containing sounds"""
+    for dir_path in get_sound_dirs():
+        if os.path.isdir(dir_path):
+            sound_files = [f for f in os.listdir(dir_path)
+                           if f.lower().endswith(SOUND_EXTENSIONS)]
+            if sound_files:
+                return dir_path, sound_files
+    return None, []
+
+
+def resolve_sound_path(sound_type='notification_sound'):
+    """Find the file for sound_type, falling back to notification_sound or any sound"""
+    sounds_dir, sound_files = list_sound_files()
+    if not sounds_dir:
+        logging.error(f"No sound files found. Searched in: {get_sound_dirs()}")
+        return None
+
+    for name in (sound_type, 'notification_sound'):
+        for ext in SOUND_EXTENSIONS:
+            if f'{name}{ext}' in sound_files:
+                return os.path.join(sounds_dir, f'{name}{ext}')
+
+    logging.info(f"Using fallback sound: {sound_files[0]}")
+    return os.path.join(sounds_dir, sound_files[0])
+
+
+def _load_sound(pygame, path):
+    """Decode a sound file once and keep it in memory"""
+    sound = _sound_cache.get(path)
+    if sound is None:
+        sound = pygame.mixer.Sound(path)
+        _sound_cache[path] = sound
+    return sound
+
+
+def _preload_sounds(pygame):
+    """Decode every available sound so the first chime plays without delay"""
+    sounds_dir, sound_files = list_sound_files()
+    for file_name in sound_files:
+        try:
+            _load_sound(pygame, os.path.join(sounds_dir, file_name))
+        except Exception as e:
+            logging.warning(f"[SOUND] Could not preload {file_name}: {e}")
+    if sound_files:
+        logging.info(f"[SOUND] Preloaded {len(_sound_cache)} sound(s) from {sounds_dir}")
+
+
+def _sound_worker():
+    """Own the mixer and play queued requests, one chime per burst"""
+    global _channel
+    try:
+        import pygame
+        pygame.mixer.init()
+        _preload_sounds(pygame)
+    except Exception as e:
+        logging.error(f"[SOUND] Audio mixer unavailable, notification sounds disabled: {e}")
+        # Keep draining the queue so callers never pile up requests
+        while True:
+            _play_queue.get()
+
+    while True:
+        volume, sound_type, interrupt = _play_queue.get()
+
+        # Coalesce: keep only the latest request received during the window
+        deadline = time.time() + SOUND_COALESCE_WINDOW
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                volume, sound_type, late_interrupt = _play_queue.get(timeout=remaining)
+                interrupt = interrupt or late_interrupt
+            except queue.Empty:
+                break
+
+        try:
+            if _channel is not None and _channel.get_busy():
+                if not interrupt:
+                    logging.debug("[SOUND] Chime already playing, skipping")
+                    continue
+                _channel.stop()
+
+            path = _resolved_paths.get(sound_type)
+            if not path or not os.path.exists(path):
+                path = resolve_sound_path(sound_type)
+                if not path:
+                    continue
+                # Only remember exact matches so newly added sounds are picked up
+                if os.path.splitext(os.path.basename(path))[0] == sound_type:
+                    _resolved_paths[sound_type] = path
+            sound = _load_sound(pygame, path)
+            sound.set_volume(volume)
+            _channel = sound.play()
+        except Exception as e:
+            logging.error(f"Error playing notification sound: {e}")
+
+
+def start_sound_service():
+    """Start the sound thread (idempotent). Mixer init and preloading happen there."""
+    global _worker_thread
+    with _worker_lock:
+        if _worker_thread is None or not _worker_thread.is_alive():
+            _worker_thread = threading.Thread(target=_sound_worker, daemon=True)
+            _worker_thread.start()
+
+
+def apply_sound_settings(settings, changed_keys=None):
+    """Settings store subscriber: remember the configured volume and sound"""
+    _configured['volume'] = settings.get('notificationVolume', 30) / 100
+    _configured['sound_type'] = settings.get('notificationSound') or 'notification_sound'
+
+
+def play_sound(volume=None, sound_type=None, interrupt=False):
+    """Queue a notification sound and return immediately.
+
+    Args:
+        volume: Playback volume between 0 and 1 (default: from settings)
+        sound_type: Sound file name without extension (default: from settings)
+        interrupt: Stop a chime that is still playing instead of skipping (used for previews)
+    """
+    start_sound_service()
+    if volume is None:
+        volume = _configured['volume']
+    if sound_type is None:
+        sound_type = _configured['sound_type']
+    _play_queue.put((volume, sound_type, interrupt))
@@ -0,0 +1,99 @@
+"""
+Startup profiler for the server executable.
+
+Milestones (e.g. "port bound") are always recorded. Per-module import timing,
+in the same spirit as `python -X importtime` (which cannot be passed to the
+frozen executable), is only recorded when started with --profile-startup or
+with YTPP_PROFILE_STARTUP=1.
+"""
+import os
+import sys
+import time
+import logging
+import builtins
+import threading
+
+
+
+def _process_age():
+    """Seconds since this process started (0 when it cannot be read)"""
+    try:
+        if sys.platform.startswith('linux'):
+            # psutil derives create_time from a boot time rounded to the second
+            with open('/proc/self/stat') as f:
+                start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+            with open('/proc/uptime') as f:
+                uptime = float(f.read().split()[0])
+            return max(0.0, uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+        import psutil
+        return max(0.0, time.time() - psutil.Process().create_time())
+    except Exception:
+        return 0.0
+
+
+# Milestones count from process start, so interpreter (and frozen bootloader) startup is included
+_t0 = time.perf_counter() - _process_age()
+_enabled = False
+_original_import = None
+_local = threading.local()
+_records = []      # (depth, module, self_seconds, cumulative_seconds)
+_milestones = []   # (label, seconds since start)
+
+
+def is_requested():
+    """True when the startup profile debug flag is set"""
+    return '--profile-startup' in sys.argv or os.environ.get('YTPP_PROFILE_STARTUP') == '1'
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Already imported: nothing to measure
+    if level == 0 and name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+
+    start = time.perf_counter()
+    stack.append(0.0)
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        _records.append((len(stack), name, elapsed - nested, elapsed))
+
+
+def enable_if_requested():
+    """Start timing imports if the debug flag is set. Call before other imports."""
+    global _enabled, _original_import
+    if _enabled or not is_requested():
+        return
+    _original_import = builtins.__import__
+    builtins.__import__ = _timed_import
+    _enabled = True
+
+
+def mark(label):
+    """Record a startup milestone and return milliseconds since process start"""
+    elapsed = time.perf_counter() - _t0
+    _milestones.append((label, elapsed))
+    return elapsed * 1000
+
+
+def report(limit=40):
+    """Log milestones and, if enabled, the slowest imports (importtime format)"""
+    for label, elapsed in _milestones:
+        logging.info(f"[STARTUP] {label}: {elapsed * 1000:.0f} ms")
+
+    if not _enabled:
+        return
+
+    builtins.__import__ = _original_import
+    slowest = sorted(_records, key=lambda r: r[3], reverse=True)[:limit]
+    logging.info(f"[STARTUP-PROFILE] {len(_records)} imports timed, slowest {len(slowest)}:")
+    logging.info("[STARTUP-PROFILE] import time: self [us] | cumulative | imported package")
+    for depth, name, self_time, cumulative in slowest:
+        logging.info(f"[STARTUP-PROFILE] import time: {self_time * 1e6:9.0f} | {cumulative * 1e6:10.0f} | {'  ' * depth}{name}")
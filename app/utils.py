@@ -1,197 +1,68 @@
 import os
-import json
-import psutil
 import sys
 import platform
 import logging
 import string
-import pygame
 import subprocess
-import zipfile
-import tarfile
 import shutil
-from tqdm import tqdm
-import requests
 import threading
 
 import time
-
-# Settings cache to avoid repeated file reads
-_settings_cache = None
-_settings_cache_time = 0
+import settings_store
+from name_allocator import allocate_filename
 
 # FFmpeg path cache — resolved once per process lifetime (never changes at runtime)
 _ffmpeg_path_cache = None
 
-def load_settings():
-    global _settings_cache, _settings_cache_time
-    
-    # Check cache first - avoid repeated file reads
-    now = time.time()
-    if _settings_cache and (now - _settings_cache_time) < 5:  # 5 second cache
-        logging.debug("Settings served from cache")
-        return _settings_cache.copy()
-    
-    # Cache miss - load from disk
-    logging.debug("Settings cache miss - loading from disk")
-    
-    default_settings = {
-        'resolution': '1080',
-        'downloadPath': '',
-        'downloadMP3': False,
-        'secondsBefore': '15',
-        'secondsAfter': '15',
-        'notificationVolume': 30,
-        'notificationSound': 'notification_sound',
-        'licenseKey': None,
-        'preferredAudioLanguage': 'original',
-        'useYouTubeAuth': False,
-        'youtubeCookiesStatus': 'not_connected'
-    }
-
-    script_dir = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.path.dirname(os.path.abspath(__file__))
-    
-    # Determine settings path based on platform
-    # Windows: Always use APPDATA (C:\Users\<user>\AppData\Roaming\YoutubetoPremiere)
-    # macOS: Use ~/Library/Application Support/YoutubetoPremiere
-    # Linux: Use ~/.config/YoutubetoPremiere
-    if sys.platform == 'win32':
-        # Force Windows to use APPDATA
-        base_path = os.environ.get('APPDATA')
-        if not base_path:
-            # Fallback if APPDATA is not set (very rare)
-            base_path = os.path.join(os.path.expanduser('~'), 'AppData', 'Roaming')
-        settings_dir = os.path.join(base_path, 'YoutubetoPremiere')
-    elif sys.platform == 'darwin':
-        # macOS standard location
-        settings_dir = os.path.join(os.path.expanduser('~/Library/Application Support'), 'YoutubetoPremiere')
-    else:
-        # Linux/Unix
-        settings_dir = os.path.join(os.path.expanduser('~/.config'), 'YoutubetoPremiere')
-    
-    settings_path = os.path.join(settings_dir, 'settings.json')
-    
-    # Create directory if it doesn't exist
-    if not os.path.exists(settings_dir):
-        os.makedirs(settings_dir)
-    
-    # Migration: Check for old settings file in wrong location (Windows only)
-    if sys.platform == 'win32':
-        old_settings_path = os.path.join(os.path.expanduser('~/.config'), 'YoutubetoPremiere', 'settings.json')
-        should_migrate = False
-        
-        # Migrate if old file exists and either:
-        # 1. New file doesn't exist yet, OR
-        # 2. New file exists but has no license key (empty migration)
-        if os.path.exists(old_settings_path):
-            if not os.path.exists(settings_path):
-                should_migrate = True
-            else:
-                # Check if current settings has no license
-                try:
-                    with open(settings_path, 'r') as f:
-                        current_settings = json.load(f)
-                        if not current_settings.get('licenseKey'):
-                            # Check if old settings has a license
-                            with open(old_settings_path, 'r') as old_f:
-                                old_settings = json.load(old_f)
-                                if old_settings.get('licenseKey'):
-                                    should_migrate = True
-                                    logging.info("Found license in old settings, will migrate")
-                except Exception as e:
-                    logging.debug(f"Could not check settings for migration: {e}")
-            
-            if should_migrate:
-                try:
-                    import shutil
-                    shutil.copy2(old_settings_path, settings_path)
-                    logging.info(f"Migrated settings from {old_settings_path} to {settings_path}")
-                except Exception as e:
-                    logging.warning(f"Could not migrate old settings: {e}")
-
-    if os.path.exists(settings_path):
-        with open(settings_path, 'r') as f:
-            settings = json.load(f)
-            # Ensure all default settings exist
-            for key, value in default_settings.items():
-                if key not in settings:
-                    settings[key] = value
-    else:
-        settings = default_settings
-        with open(settings_path, 'w') as f:
-            json.dump(settings, f, indent=4)
+# get_default_download_path calls waiting for the panel's project_path_response
+_project_path_waiters = []  # [(threading.Event, {'path': str or None})]
+_project_path_lock = threading.Lock()
+
+def load_settings(resolve_ffmpeg=True):
+    """Return a copy of the settings, served from the in-memory settings store"""
+    settings = settings_store.get_settings()
+    settings['SETTINGS_FILE'] = settings_store.get_settings_path()
 
-    settings['SETTINGS_FILE'] = settings_path
-    
-    # Update cache
-    _settings_cache = settings.copy()
-    _settings_cache_time = now
-    
     # Set up FFmpeg — resolve path only once per process (expensive PATH scan)
-    global _ffmpeg_path_cache
-    try:
-        if _ffmpeg_path_cache is None:
+    if _ffmpeg_path_cache is None:
+        if not resolve_ffmpeg:
+            # Startup path: FFmpeg is resolved later by the background startup
+            settings['ffmpeg_path'] = None
+            return settings
+        try:
             from app_init import find_ffmpeg as init_find_ffmpeg
-            _ffmpeg_path_cache = init_find_ffmpeg()
-        settings['ffmpeg_path'] = _ffmpeg_path_cache
-        if settings['ffmpeg_path']:
-            # Add ffmpeg directory to PATH - only if not already present
-            ffmpeg_dir = os.path.dirname(settings['ffmpeg_path'])
-            current_path = os.environ.get("PATH", "")
-            if ffmpeg_dir not in current_path.split(os.pathsep):
-                os.environ["PATH"] = ffmpeg_dir + os.pathsep + current_path
-                logging.info(f"Added ffmpeg directory to PATH: {ffmpeg_dir}")
-            logging.info(f"Using ffmpeg from: {settings['ffmpeg_path']}")
-        else:
-            raise Exception("FFmpeg not found in any of the expected locations")
-    except Exception as e:
-        error_msg = f"Error setting up ffmpeg: {e}"
-        logging.error(error_msg)
-        settings['ffmpeg_path'] = None
-        settings['ffmpeg_error'] = error_msg
-
-    # Create a sanitized version of settings for logging (hide sensitive data)
-    settings_for_logging = settings.copy()
-    if 'licenseKey' in settings_for_logging and settings_for_logging['licenseKey']:
-        # Show only first 4 and last 4 characters of license key
-        license_key = settings_for_logging['licenseKey']
-        if len(license_key) > 8:
-            settings_for_logging['licenseKey'] = f"{license_key[:4]}...{license_key[-4:]}"
-        else:
-            settings_for_logging['licenseKey'] = "****"
-
-    logging.info(f'Loaded settings: {settings_for_logging}')
+            ffmpeg_path = init_find_ffmpeg()
+            if not ffmpeg_path:
+                raise Exception("FFmpeg not found in any of the expected locations")
+            remember_ffmpeg_path(ffmpeg_path)
+        except Exception as e:
+            error_msg = f"Error setting up ffmpeg: {e}"
+            logging.error(error_msg)
+            settings['ffmpeg_path'] = None
+            settings['ffmpeg_error'] = error_msg
+            return settings
+
+    settings['ffmpeg_path'] = _ffmpeg_path_cache
     return settings
 
+def remember_ffmpeg_path(ffmpeg_path):
+    """Seed the FFmpeg path cache with a path resolved elsewhere (startup warm-up)"""
+    global _ffmpeg_path_cache
+    if not ffmpeg_path:
+        return
+    _ffmpeg_path_cache = ffmpeg_path
+    # Add ffmpeg directory to PATH - only if not already present
+    ffmpeg_dir = os.path.dirname(ffmpeg_path)
+    current_path = os.environ.get("PATH", "")
+    if ffmpeg_dir not in current_path.split(os.pathsep):
+        os.environ["PATH"] = ffmpeg_dir + os.pathsep + current_path
+        logging.info(f"Added ffmpeg directory to PATH: {ffmpeg_dir}")
+    logging.info(f"Using ffmpeg from: {ffmpeg_path}")
+
 def save_settings(settings):
-    global _settings_cache, _settings_cache_time
-    settings_path = settings.get('SETTINGS_FILE')
-    if settings_path:
-        # Load existing settings first
-        existing_settings = {}
-        if os.path.exists(settings_path):
-            try:
-                with open(settings_path, 'r') as f:
-                    existing_settings = json.load(f)
-            except Exception:
-                pass
-
-        # Create a copy of settings without the internal fields
-        settings_to_save = settings.copy()
-        settings_to_save.pop('SETTINGS_FILE', None)
-        settings_to_save.pop('ffmpeg_path', None)
-
-        # Update existing settings with new values
-        existing_settings.update(settings_to_save)
-
-        with open(settings_path, 'w') as f:
-            json.dump(existing_settings, f, indent=4)
-
-        # Invalidate cache so the next load_settings() picks up the new values immediately
-        _settings_cache = None
-        _settings_cache_time = 0
-        return True
-    return False
+    """Write settings through the settings store (internal fields are dropped)"""
+    settings_store.update_settings(settings)
+    return True
 
 def save_license_key(license_key):
     settings = load_settings()
@@ -204,6 +75,7 @@ def get_license_key():
 
 def monitor_premiere_and_shutdown():
     global should_shutdown
+    import psutil
 
     # Find the process ID of Premiere Pro
     premiere_pro_process = None
@@ -220,6 +92,14 @@ def monitor_premiere_and_shutdown():
     else:
         logging.info("Adobe Premiere Pro is not running.")
 
+def notify_project_path(download_path):
+    """Wake the callers waiting on a project_path_response (download_path is None on failure)"""
+    with _project_path_lock:
+        waiters = list(_project_path_waiters)
+    for response_event, project_path_response in waiters:
+        project_path_response['path'] = download_path
+        response_event.set()
+
 def get_default_download_path(socketio=None):
     try:
         # Check if the Premiere panel already pushed a project path on connect.
@@ -232,31 +112,28 @@ def get_default_download_path(socketio=None):
             os.makedirs(cached_dl_path, exist_ok=True)
             return cached_dl_path
 
-        # Fallback: ask Premiere panel via socket round-trip (5s timeout)
+        # Fallback: ask Premiere panel via socket round-trip (5s timeout).
+        # The project_path_response handler in routes.py calls notify_project_path
+        # with the folder it settled on, even when downloadPath did not change.
         if socketio:
-            # Create an event to wait for the response
-            response_event = threading.Event()
-            project_path_response = {'path': None}
-
-            def on_project_path_response(data):
-                project_path_response['path'] = data.get('path')
-                response_event.set()
-
-            # Register temporary handler
-            socketio.on_event('project_path_response', on_project_path_response)
-
-            # Request the path
-            socketio.emit('request_project_path')
-
-            # Wait for response with timeout
-            if response_event.wait(timeout=5):
-                project_path = project_path_response['path']
-                if project_path:
-                    # Create YoutubeToPremiere_download folder next to the project
-                    download_path = os.path.join(os.path.dirname(project_path), 'YoutubeToPremiere_download')
-                    os.makedirs(download_path, exist_ok=True)
-                    logging.info(f"Using project-related download path: {download_path}")
-                    return download_path
+            waiter = (threading.Event(), {'path': None})
+            response_event, project_path_response = waiter
+            with _project_path_lock:
+                _project_path_waiters.append(waiter)
+            try:
+                # Request the path
+                socketio.emit('request_project_path')
+
+                # Wait for response with timeout
+                if response_event.wait(timeout=5):
+                    download_path = project_path_response['path']
+                    if download_path:
+                        os.makedirs(download_path, exist_ok=True)
+                        logging.info(f"Using project-related download path: {download_path}")
+                        return download_path
+            finally:
+                with _project_path_lock:
+                    _project_path_waiters.remove(waiter)
         
         # If we couldn't get a path from the Premiere project, use fallback paths
         download_folder_name = 'YoutubeToPremiere_download'
@@ -435,96 +312,15 @@ def sanitize_title(title):
     return sanitized_title
 
 def generate_new_filename(base_path, original_name, extension, suffix=""):
-    base_filename = f"{original_name}{suffix}.{extension}"
-    if not os.path.exists(os.path.join(base_path, base_filename)):
-        return base_filename
-    
-    counter = 1
-    new_name = f"{original_name}{suffix}_{counter}.{extension}"
-    while os.path.exists(os.path.join(base_path, new_name)):
-        counter += 1
-        new_name = f"{original_name}{suffix}_{counter}.{extension}"
-    return new_name
-
-def play_notification_sound(volume=0.3, sound_type='notification_sound'): 
-    pygame.mixer.init()
+    return allocate_filename(base_path, f"{original_name}{suffix}", extension)
 
-    # Get the correct base path whether running as exe or script
-    if getattr(sys, 'frozen', False):
-        # For PyInstaller, use _MEIPASS for bundled resources and executable directory for external resources
-        bundle_path = getattr(sys, '_MEIPASS', os.path.dirname(sys.executable))
-        exec_path = os.path.dirname(sys.executable)
-    else:
-        bundle_path = os.path.dirname(os.path.abspath(__file__))
-        exec_path = bundle_path
-    
-    # Define possible sound directories (prioritize user sounds over bundled ones)
-    user_docs = os.path.expanduser('~/Documents')
-    user_sounds_dir = os.path.join(user_docs, 'YoutubetoPremiere', 'sounds')
-    
-    sound_dirs = [
-        user_sounds_dir,                                      # user Documents directory (highest priority)
-        os.path.join(exec_path, '_internal', 'sounds'),       # PyInstaller _internal directory (macOS)
-        os.path.join(exec_path, 'sounds'),                    # next to executable
-        os.path.join(exec_path, 'exec', 'sounds'),            # in exec subdirectory  
-        os.path.join(bundle_path, 'sounds'),                  # bundled sounds
-        os.path.join(bundle_path, '_internal', 'sounds'),     # bundled _internal sounds
-        os.path.join(os.path.dirname(exec_path), 'sounds'),   # parent directory
-        os.path.join(exec_path, 'app', 'sounds'),             # app subdirectory
-        os.path.join(os.path.dirname(exec_path), 'app', 'sounds')  # parent app directory
-    ]
-    
-    # Find first existing sounds directory
-    sounds_dir = None
-    for dir_path in sound_dirs:
-        if os.path.exists(dir_path):
-            sounds_dir = dir_path
-            break
-    
-    if not sounds_dir:
-        logging.error(f"No sounds directory found. Searched in: {sound_dirs}")
-        return
-
-    # Get all sound files in the sounds directory
-    sound_files = [f for f in os.listdir(sounds_dir) 
-                  if f.endswith(('.mp3', '.wav'))]
-    
-    if not sound_files:
-        logging.error(f"No sound files found in {sounds_dir}")
-        return
-
-    # Try to find the requested sound with either extension
-    sound_filename = None
-    for ext in ['.mp3', '.wav']:
-        if f'{sound_type}{ext}' in sound_files:
-            sound_filename = f'{sound_type}{ext}'
-            break
-    
-    # If requested sound doesn't exist, use notification_sound or first available sound
-    if not sound_filename:
-        # First try notification_sound
-        for ext in ['.mp3', '.wav']:
-            if f'notification_sound{ext}' in sound_files:
-                sound_filename = f'notification_sound{ext}'
-                logging.info(f"Using default notification sound: {sound_filename}")
-                break
-        # If notification_sound not found, use first available sound
-        if not sound_filename:
-            sound_filename = sound_files[0]
-            logging.info(f"Using fallback sound: {sound_filename}")
-
-    notification_sound_path = os.path.join(sounds_dir, sound_filename)
-            
-    try:
-        pygame.mixer.music.load(notification_sound_path)
-        pygame.mixer.music.set_volume(volume)
-        pygame.mixer.music.play()
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
-    except Exception as e:
-        logging.error(f"Error playing notification sound: {e}")
+def play_notification_sound(volume=0.3, sound_type='notification_sound'):
+    """Queue a notification sound on the background sound service (non-blocking)"""
+    from sound_player import play_sound
+    play_sound(volume=volume, sound_type=sound_type)
 
 def is_premiere_running():
+    import psutil
     for process in psutil.process_iter(['pid', 'name']):
         if process.info['name'] and 'Adobe Premiere Pro' in process.info['name']:
             return True
@@ -1,14 +1,12 @@
 import os
 import subprocess
 import logging
-import yt_dlp  # Import yt_dlp directly
 import re
 from flask import jsonify
 import sys
 import platform
 import time
-import requests
-import hashlib
+import threading
 
 def normalize_path_components(p):
     """Strip trailing spaces from each path component.
@@ -25,6 +23,10 @@ def normalize_path_components(p):
 # FFmpeg verification cache
 _ffmpeg_verified = False
 _ffmpeg_path_cached = None
+
+# JS runtime (Deno) probe result - checked once instead of on every yt-dlp options build
+_js_runtime_cache = None
+_js_runtime_lock = threading.Lock()
 _ffmpeg_cache_time = 0
 _ffmpeg_cache_ttl = 300  # Cache for 5 minutes
 
@@ -59,14 +61,30 @@ from utils import (
     get_license_key
 )
 import traceback
+import copy
 import glob
 import json
-import tempfile
 import shutil
 # Removed incorrect import of download_range_func
 import urllib.parse as urlparse
-
-# Import psutil only on Windows for process management (optional dependency)
+from import_batcher import queue_import
+from config import CLIP_PARALLEL_STREAMS
+from name_allocator import allocate_filename
+import resume_index
+import download_cache
+import ffmpeg_executor
+import media_probe
+import ytdlp_cache
+import segmented_downloader
+import bandwidth
+import job_metrics
+from license_check import validate_license
+from ffmpeg_executor import PRIORITY_CLIP, PRIORITY_FULL, PRIORITY_AUDIO
+from cookie_store import FROM_BROWSER, select_cookie_source, is_cookie_source, get_jar, cookie_header, open_ydl, report_auth_failure, is_auth_rejection
+from cookie_store import hold_extension_cookies, release_extension_cookies
+from audio_pipeline import normalize_audio_codec, probe_audio_codec, audio_codec_args, needs_transcode, encoder_slot
+
+# Import psutil only on Windows for system and process diagnostics (optional dependency)
 try:
     if sys.platform == 'win32':
         import psutil
@@ -75,7 +93,7 @@ try:
         PSUTIL_AVAILABLE = False
 except ImportError:
     PSUTIL_AVAILABLE = False
-    logging.warning("psutil not available - ffmpeg process cleanup disabled")
+    logging.warning("psutil not available - system and process diagnostics disabled")
 
 # Global variable to store emit_to_client_type function
 _emit_to_client_type = None
@@ -261,6 +279,9 @@ def run_pre_download_diagnostics(download_path, ffmpeg_path, socketio=None):
             temp_files = glob.glob(os.path.join(download_path, '*.part')) + \
                         glob.glob(os.path.join(download_path, '*.ytdl')) + \
                         glob.glob(os.path.join(download_path, '*.temp'))
+            # Partial files of resumable downloads are not stale
+            protected = resume_index.protected_files(download_path)
+            temp_files = [f for f in temp_files if os.path.normcase(f) not in protected]
             
             if temp_files:
                 locked_files = []
@@ -338,7 +359,6 @@ def log_system_info():
     # 2. RAM Information
     try:
         if PSUTIL_AVAILABLE:
-            import psutil
             mem = psutil.virtual_memory()
             total_gb = mem.total / (1024 ** 3)
             available_gb = mem.available / (1024 ** 3)
@@ -363,7 +383,6 @@ def log_system_info():
             
             # Method 1: Check running processes for known AV
             if PSUTIL_AVAILABLE:
-                import psutil
                 av_processes = {
                     'MsMpEng.exe': 'Windows Defender',
                     'avastui.exe': 'Avast',
@@ -466,7 +485,6 @@ def log_system_info():
             
             # Check for common macOS security software
             if PSUTIL_AVAILABLE:
-                import psutil
                 mac_security_processes = {
                     'eset_daemon': 'ESET',
                     'SophosServiceManager': 'Sophos',
@@ -719,7 +737,6 @@ def monitor_ffmpeg_process(process, operation_name="FFmpeg", socketio=None, time
                 # Get process info if psutil available
                 if PSUTIL_AVAILABLE:
                     try:
-                        import psutil
                         proc = psutil.Process(pid)
                         cpu_percent = proc.cpu_percent(interval=0.1)
                         mem_info = proc.memory_info()
@@ -762,22 +779,16 @@ def monitor_ffmpeg_process(process, operation_name="FFmpeg", socketio=None, time
         return False
 
 
-def run_hidden_subprocess(cmd, timeout=300, **kwargs):
-    """Run subprocess with hidden console window on Windows
+def run_hidden_subprocess(cmd, timeout=300, priority=PRIORITY_FULL, is_cancelled=None, **kwargs):
+    """Run an FFmpeg command through the shared executor (hidden console window on Windows)
     
     Args:
         cmd: Command to run
         timeout: Maximum time to wait in seconds (default: 300s = 5 minutes)
+        priority: ffmpeg_executor priority (clip > full video > audio)
+        is_cancelled: Job cancel flag; the process is killed when it is set
         **kwargs: Additional arguments passed to subprocess.run
     """
-    if sys.platform == 'win32':
-        # Add Windows-specific flags to hide console window
-        creation_flags = get_subprocess_creation_flags()
-        kwargs['creationflags'] = creation_flags
-        kwargs['startupinfo'] = subprocess.STARTUPINFO()
-        kwargs['startupinfo'].dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        kwargs['startupinfo'].wShowWindow = subprocess.SW_HIDE
-    
     # Add timeout if not already specified
     if 'timeout' not in kwargs:
         kwargs['timeout'] = timeout
@@ -786,7 +797,7 @@ def run_hidden_subprocess(cmd, timeout=300, **kwargs):
     logging.info(f"[SUBPROCESS] Starting {cmd_name} with timeout={kwargs.get('timeout')}s")
     
     try:
-        result = subprocess.run(cmd, **kwargs)
+        result = ffmpeg_executor.run(cmd, priority=priority, is_cancelled=is_cancelled, **kwargs)
         logging.info(f"[SUBPROCESS] {cmd_name} completed successfully")
         return result
     except subprocess.TimeoutExpired as e:
@@ -796,90 +807,6 @@ def run_hidden_subprocess(cmd, timeout=300, **kwargs):
         logging.error(f"[SUBPROCESS] {cmd_name} error: {e}")
         raise
 
-def cleanup_ffmpeg_processes():
-    """Clean up zombie or stuck ffmpeg processes to prevent resource exhaustion (Windows only)"""
-    # Only run on Windows where the issue occurs
-    if sys.platform != 'win32' or not PSUTIL_AVAILABLE:
-        return 0
-    
-    try:
-        killed_count = 0
-        ffmpeg_exe_name = 'ffmpeg.exe'
-        
-        # OPTIMIZATION: Use process name filter to avoid iterating all processes
-        # This is MUCH faster than iterating all processes
-        try:
-            # Get all processes with name matching ffmpeg (much faster)
-            processes = [p for p in psutil.process_iter(['pid', 'name', 'create_time']) 
-                        if p.info['name'] and ffmpeg_exe_name.lower() in p.info['name'].lower()]
-            
-            for proc_info in processes:
-                try:
-                    proc = psutil.Process(proc_info['pid'])
-                    # Kill processes running for more than 10 minutes (likely stuck)
-                    process_age = time.time() - proc_info['create_time']
-                    if process_age > 600:  # 10 minutes
-                        logging.warning(f"[Windows] Killing stuck ffmpeg process (PID {proc_info['pid']}, age: {process_age:.0f}s)")
-                        proc.kill()
-                        killed_count += 1
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    continue
-        except Exception as filter_error:
-            # Fallback to old method if filtering fails
-            logging.debug(f"Process filtering failed, using fallback: {filter_error}")
-            for proc in psutil.process_iter(['pid', 'name', 'create_time']):
-                try:
-                    if proc.info['name'] and ffmpeg_exe_name.lower() in proc.info['name'].lower():
-                        process_age = time.time() - proc.info['create_time']
-                        if process_age > 600:
-                            proc.kill()
-                            killed_count += 1
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    continue
-        
-        if killed_count > 0:
-            logging.info(f"[Windows] Cleaned up {killed_count} stuck ffmpeg process(es)")
-        
-        return killed_count
-    except Exception as e:
-        logging.warning(f"[Windows] Error cleaning up ffmpeg processes: {e}")
-        return 0
-
-def cleanup_temporary_cookies():
-    """Clean up old temporary cookies files to prevent accumulation (Windows only)"""
-    # Only run on Windows where the issue occurs
-    if sys.platform != 'win32':
-        return 0
-    
-    try:
-        cookies_dir = os.path.join(os.environ.get('TEMP', tempfile.gettempdir()), 'YoutubetoPremiere')
-        if not os.path.exists(cookies_dir):
-            return 0
-        
-        cleaned_count = 0
-        current_time = time.time()
-        
-        # Remove cookies files older than 1 hour
-        for filename in os.listdir(cookies_dir):
-            if filename.startswith('youtube_cookies_') and filename.endswith('.txt'):
-                filepath = os.path.join(cookies_dir, filename)
-                try:
-                    # Check file age
-                    file_age = current_time - os.path.getmtime(filepath)
-                    if file_age > 3600:  # 1 hour
-                        os.remove(filepath)
-                        cleaned_count += 1
-                except Exception as e:
-                    logging.debug(f"Could not remove old cookies file {filename}: {e}")
-        
-        if cleaned_count > 0:
-            logging.info(f"[Windows] Cleaned up {cleaned_count} old temporary cookies file(s)")
-        
-        return cleaned_count
-    except Exception as e:
-        logging.warning(f"[Windows] Error cleaning up temporary cookies: {e}")
-        return 0
-
 def get_ffmpeg_postprocessor_args():
     """Get FFmpeg arguments that help hide console windows"""
     args = ['-y']  # Overwrite output files
@@ -929,322 +856,6 @@ class YtdlpLogger:
     def error(self, msg):
         logging.error(f'[yt-dlp] {msg}')
 
-def verify_authentication_cookies(cookies_list):
-    """Verify if the cookies contain necessary authentication data for YouTube"""
-    if not cookies_list:
-        return False, "No cookies provided"
-    
-    # Check for essential authentication cookies
-    auth_cookies = {
-        'LOGIN_INFO': False,
-        'SAPISID': False,
-        'APISID': False,
-        '__Secure-3PAPISID': False,
-        'SID': False
-    }
-    
-    for cookie in cookies_list:
-        name = cookie.get('name', '')
-        if name in auth_cookies:
-            auth_cookies[name] = True
-    
-    # Check authentication level
-    has_login_info = auth_cookies['LOGIN_INFO']
-    has_sapisid = auth_cookies['SAPISID'] or auth_cookies['__Secure-3PAPISID']
-    has_sid = auth_cookies['SID']
-    
-    if has_login_info and has_sapisid:
-        return True, "Full authentication detected"
-    elif has_sapisid or has_sid:
-        return True, "Partial authentication detected"
-    else:
-        return False, "No authentication cookies found"
-
-# Cookies file cache to avoid repeated file creation
-_cookies_cache_file = None
-_cookies_cache_hash = None
-
-def create_cookies_file(cookies_list):
-    """Create a temporary cookies file from cookies list"""
-    global _cookies_cache_file, _cookies_cache_hash
-    
-    if not cookies_list:
-        logging.warning("No cookies provided to create_cookies_file")
-        return None
-    
-    # Calculate hash of cookies to check if we can reuse existing file
-    cookies_str = str(sorted((c.get('name', ''), c.get('value', '')) for c in cookies_list))
-    current_hash = hashlib.md5(cookies_str.encode()).hexdigest()
-    
-    # Check cache first - reuse file if cookies haven't changed
-    if (_cookies_cache_file and _cookies_cache_hash == current_hash and 
-        os.path.exists(_cookies_cache_file)):
-        logging.debug(f"Reusing cached cookies file: {_cookies_cache_file}")
-        return _cookies_cache_file
-    
-    # Cache miss - create new file
-    logging.debug("Cookies cache miss - creating new cookies file")
-        
-    # Verify authentication before creating file
-    is_authenticated, auth_status = verify_authentication_cookies(cookies_list)
-    logging.info(f"Cookie authentication status: {auth_status}")
-    
-    if not is_authenticated:
-        logging.warning("Warning: No valid authentication cookies found. Downloads may fail for age-restricted content.")
-    
-    try:
-        # Create temp directory
-        cookies_dir = os.path.join(os.environ.get('TEMP', tempfile.gettempdir()), 'YoutubetoPremiere')
-        os.makedirs(cookies_dir, exist_ok=True)
-        
-        # Create cookies file with timestamp to avoid conflicts
-        import time
-        timestamp = int(time.time())
-        cookies_file = os.path.join(cookies_dir, f'youtube_cookies_{timestamp}.txt')
-        
-        logging.info(f"Creating cookies file at: {cookies_file}")
-        
-        with open(cookies_file, 'w', encoding='utf-8') as f:
-            f.write("# Netscape HTTP Cookie File\n")
-            f.write("# Generated by YoutubetoPremiere Extension\n")
-            f.write(f"# Created: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            
-            written_cookies = 0
-            auth_cookies_written = 0
-            
-            # Prioritize authentication cookies first
-            auth_cookie_names = [
-                'LOGIN_INFO', '__Secure-3PAPISID', '__Secure-3PSID', 
-                'SAPISID', 'APISID', 'SID', 'HSID', 'SSID', 'SIDCC'
-            ]
-            
-            # Write authentication cookies first
-            for cookie in cookies_list:
-                name = cookie.get('name', '')
-                if name in auth_cookie_names:
-                    if write_cookie_to_file(f, cookie, written_cookies):
-                        written_cookies += 1
-                        auth_cookies_written += 1
-            
-            # Then write other cookies
-            for cookie in cookies_list:
-                name = cookie.get('name', '')
-                if name not in auth_cookie_names:
-                    if write_cookie_to_file(f, cookie, written_cookies):
-                        written_cookies += 1
-        
-        logging.info(f"Created cookies file with {written_cookies} total cookies ({auth_cookies_written} authentication cookies): {cookies_file}")
-        
-        # Log file size to verify it was created properly
-        file_size = os.path.getsize(cookies_file)
-        logging.info(f"Cookies file size: {file_size} bytes")
-        
-        # Validate the file was created properly
-        if validate_cookies_file(cookies_file):
-            # Update cache
-            _cookies_cache_file = cookies_file
-            _cookies_cache_hash = current_hash
-            logging.debug(f"Updated cookies cache: {cookies_file}")
-            return cookies_file
-        else:
-            return None
-        
-    except Exception as e:
-        logging.error(f"Error creating cookies file: {e}")
-        return None
-
-def write_cookie_to_file(file_handle, cookie, index):
-    """Write a single cookie to the file in Netscape format"""
-    try:
-        domain = cookie.get('domain', '.youtube.com')
-        name = cookie.get('name', '')
-        value = cookie.get('value', '')
-        path = cookie.get('path', '/')
-        expires = str(cookie.get('expirationDate', '0'))
-        secure = 'TRUE' if cookie.get('secure', False) else 'FALSE'
-        
-        # Skip invalid cookies
-        if not name or not value:
-            logging.debug(f"Skipping invalid cookie {index}: name='{name}', value='{value}'")
-            return False
-        
-        # Clean and validate cookie data for Netscape format
-        name = str(name).replace('\t', '').replace('\n', '').replace('\r', '').strip()
-        value = str(value).replace('\t', '').replace('\n', '').replace('\r', '').strip()
-        domain = str(domain).replace('\t', '').replace('\n', '').replace('\r', '').strip()
-        path = str(path).replace('\t', '').replace('\n', '').replace('\r', '').strip()
-        
-        # Skip cookies with problematic values or overly long values that might cause parsing issues
-        if not name or not value or len(value) > 8192:
-            logging.debug(f"Skipping cookie with problematic format {index}: name='{name[:20]}...', value='{value[:20]}...'")
-            return False
-            
-        # Additional validation: ensure no tab characters remain and handle special characters
-        if '\t' in name or '\t' in value or '\t' in domain or '\t' in path:
-            logging.debug(f"Skipping cookie with tab characters: {name}")
-            return False
-            
-        # Validate domain format
-        if not domain or domain.count('.') < 1:
-            logging.debug(f"Skipping cookie with invalid domain: {domain}")
-            return False
-        
-        # Skip cookies with purely numeric values that are excessively long (likely session identifiers)
-        if name in ['user_id', 'session_id', 'gid'] and value.isdigit() and len(value) > 20:
-            logging.debug(f"Skipping potentially problematic numeric cookie: {name} with length {len(value)}")
-            return False
-        
-        # Filter out known problematic cookies that aren't needed for YouTube auth
-        problematic_cookies = [
-            'GMAIL_AT', 'COMPASS', '__utma', '__utmb', '__utmc', '__utmz', 'IDE', 'DV', 
-            'WML', 'GX', 'SMSV', 'ACCOUNT_CHOOSER', 'UULE', '__Host-GMAIL_SCH_GMN',
-            '__Host-GMAIL_SCH_GMS', '__Host-GMAIL_SCH_GML', '__Host-GMAIL_SCH',
-            '__Host-GAPS', '__Host-1PLSID', '__Host-3PLSID', '__Secure-DIVERSION_ID',
-            'LSOLH', '__Secure-ENID', 'OTZ', 'LSID', 'user_id', 'GEM'
-        ]
-        
-        # Filter out __Host-* cookies as they often have problematic formats
-        if name.startswith('__Host-') or name in problematic_cookies:
-            logging.debug(f"Skipping problematic cookie: {name}")
-            return False
-        
-        # Only keep cookies from core YouTube/Google domains
-        allowed_domains = ['.youtube.com', 'www.youtube.com', 'youtube.com', 'm.youtube.com', '.google.com', 'accounts.google.com']
-        if domain not in allowed_domains:
-            logging.debug(f"Skipping cookie from non-essential domain: {name} from {domain}")
-            return False
-        
-        # Ensure expirationDate is properly formatted
-        try:
-            expires_float = float(expires) if expires and expires != '0' else 0
-            expires = str(int(expires_float)) if expires_float > 0 else '0'
-        except (ValueError, TypeError):
-            expires = '0'
-        
-        # Write in Netscape format: domain flag path secure expiration name value
-        # The domain flag should be TRUE only if domain starts with '.' (subdomain inclusion)
-        domain_flag = 'TRUE' if domain.startswith('.') else 'FALSE'
-        cookie_line = f"{domain}\t{domain_flag}\t{path}\t{secure}\t{expires}\t{name}\t{value}\n"
-        file_handle.write(cookie_line)
-        
-        # Log important authentication cookies
-        if name in ['SAPISID', 'APISID', 'HSID', 'SSID', 'LOGIN_INFO', '__Secure-3PAPISID', '__Secure-3PSID']:
-            logging.info(f"Authentication cookie: {name} for domain {domain}")
-        
-        return True
-        
-    except Exception as e:
-        logging.error(f"Error writing cookie {index}: {e}")
-        return False
-
-def validate_cookies_file(cookies_file):
-    """Validate that the cookies file was created properly"""
-    try:
-        with open(cookies_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            
-        valid_lines = 0
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-            
-            # Check if line has correct number of tab-separated fields
-            parts = line.split('\t')
-            if len(parts) == 7:
-                valid_lines += 1
-            else:
-                logging.warning(f"Invalid Netscape format on line {i+1}: {len(parts)} fields instead of 7")
-        
-        if valid_lines == 0:
-            logging.error("No valid cookies found in generated file")
-            return False
-        
-        logging.info(f"Validated {valid_lines} cookie lines in Netscape format")
-        return True
-        
-    except Exception as e:
-        logging.error(f"Error validating cookies file: {e}")
-        return False
-
-def get_youtube_cookies_file():
-    """Get the path to the YouTube cookies file if it exists.
-    Looks for both the canonical 'youtube_cookies.txt' and timestamped
-    'youtube_cookies_<ts>.txt' files created by create_cookies_file().
-    Returns the most recently modified valid file."""
-    try:
-        cookies_dir = os.path.join(os.environ.get('TEMP', tempfile.gettempdir()), 'YoutubetoPremiere')
-
-        # 1. Check for the canonical (non-timestamped) file first
-        cookies_file = os.path.join(cookies_dir, 'youtube_cookies.txt')
-        if os.path.exists(cookies_file) and os.path.getsize(cookies_file) > 0:
-            logging.info(f"Found YouTube cookies file: {cookies_file}")
-            return cookies_file
-
-        # 2. Check for timestamped files created by create_cookies_file()
-        if os.path.isdir(cookies_dir):
-            timestamped = [
-                os.path.join(cookies_dir, f)
-                for f in os.listdir(cookies_dir)
-                if f.startswith('youtube_cookies_') and f.endswith('.txt')
-            ]
-            valid = [p for p in timestamped if os.path.getsize(p) > 0]
-            if valid:
-                latest = max(valid, key=os.path.getmtime)
-                logging.info(f"Found timestamped YouTube cookies file: {latest}")
-                return latest
-
-        logging.info("No YouTube cookies file found")
-        return None
-    except Exception as e:
-        logging.error(f"Error checking for YouTube cookies file: {e}")
-        return None
-
-def try_extract_cookies_from_browser():
-    """Try to extract cookies from browser using yt-dlp's built-in functionality"""
-    try:
-        cookies_dir = os.path.join(os.environ.get('TEMP', tempfile.gettempdir()), 'YoutubetoPremiere')
-        os.makedirs(cookies_dir, exist_ok=True)
-        
-        browser_cookies_file = os.path.join(cookies_dir, 'youtube_browser_cookies.txt')
-        
-        # Try to extract cookies from Chrome first, then Edge, then Firefox
-        browsers = ['chrome', 'edge', 'firefox']
-        
-        for browser in browsers:
-            try:
-                logging.info(f"Attempting to extract YouTube cookies from {browser}")
-                
-                # Use yt-dlp to extract cookies from browser
-                ydl_opts = {
-                    'cookiesfrombrowser': (browser, None, None, None),
-                    'extract_flat': True,
-                    'quiet': True,
-                    'writesubtitles': False,
-                    'writeautomaticsub': False,
-                    'writedescription': False,
-                    'writeinfojson': False,
-                    'writethumbnail': False,
-                }
-                
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    # Test with a simple YouTube URL
-                    info = ydl.extract_info('https://www.youtube.com/', download=False)
-                    if info:
-                        logging.info(f"Successfully extracted cookies from {browser}")
-                        return (browser, None, None, None)
-                        
-            except Exception as e:
-                logging.debug(f"Failed to extract cookies from {browser}: {e}")
-                continue
-        
-        logging.warning("Could not extract cookies from any browser")
-        return None
-        
-    except Exception as e:
-        logging.error(f"Error in try_extract_cookies_from_browser: {e}")
-        return None
-
 def get_ffmpeg_path():
     """Get the path to ffmpeg executable"""
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -1534,41 +1145,6 @@ def check_ffmpeg(settings, socketio):
                 return {'success': True, 'path': ffmpeg_path}
         return {'success': False, 'message': error_msg}
 
-def validate_license(license_key):
-    """
-    Validate license via secure API proxy
-    No API keys are stored in this code - they're on the backend
-    """
-    if not license_key:
-        return False
-
-    try:
-        from config import LICENSE_API_URL, API_TIMEOUT
-        
-        response = requests.post(
-            LICENSE_API_URL,
-            json={'licenseKey': license_key},
-            timeout=API_TIMEOUT,
-            headers={'Content-Type': 'application/json'}
-        )
-
-        if response.ok:
-            result = response.json()
-            is_valid = result.get('success', False)
-            if is_valid:
-                logging.info(f"License validated via {result.get('provider', 'unknown')}")
-            return is_valid
-        else:
-            logging.warning(f"License validation failed with status {response.status_code}")
-            return False
-
-    except requests.Timeout:
-        logging.error("License validation timeout")
-        return False
-    except Exception as e:
-        logging.error(f"Error validating license: {e}")
-        return False
-
 def handle_video_url(video_url, download_type, current_download, socketio, settings, clip_start=None, clip_end=None, cookies=None, user_agent=None):
     """
     Handle video URL processing based on the download type.
@@ -1576,6 +1152,9 @@ def handle_video_url(video_url, download_type, current_download, socketio, setti
     logging.info(f"[HANDLE_VIDEO_URL] Starting processing for URL: {video_url}")
     logging.info(f"[HANDLE_VIDEO_URL] Download type: {download_type}, Clip: {clip_start}-{clip_end}")
     
+    bandwidth_job = bandwidth.start_job(settings.get('downloadPriority') or download_type, video_url, settings)
+    # The job's extension cookies stay parsed until it ends, however many other jobs come in
+    cookie_key = hold_extension_cookies(cookies)
     try:
         # Validate and prepare environment
         logging.info("[HANDLE_VIDEO_URL] Checking FFmpeg...")
@@ -1596,7 +1175,8 @@ def handle_video_url(video_url, download_type, current_download, socketio, setti
         # Validate license if required (for video and full downloads)
         # Note: 'full' is the actual type sent by the extension for video downloads
         if download_type in ('video', 'full'):
-            license_valid = validate_license(settings.get('licenseKey'))
+            with job_metrics.span('license'):
+                license_valid = validate_license(settings.get('licenseKey'))
             if not license_valid:
                 logging.warning(f"License validation failed for download type: {download_type}")
                 return {"error": "Licence invalide. Veuillez acheter une licence pour télécharger des vidéos."}
@@ -1624,7 +1204,7 @@ def handle_video_url(video_url, download_type, current_download, socketio, setti
             )
             
             if result and os.path.exists(result):
-                socketio.emit('import_video', {'path': result, 'bin': settings.get('premiereBin', '')})
+                queue_import(result, settings.get('premiereBin', ''))
                 logging.info("Import signal sent to Premiere Pro extension via SocketIO")
                 return {"success": True, "path": result}
             else:
@@ -1656,7 +1236,7 @@ def handle_video_url(video_url, download_type, current_download, socketio, setti
             
             if result and result.get("success") and result.get("path") and os.path.exists(result["path"]):
                 # Emit SocketIO event for Premiere extension
-                socketio.emit('import_video', {'path': result["path"], 'bin': settings.get('premiereBin', '')})
+                queue_import(result["path"], settings.get('premiereBin', ''))
                 logging.info("Import signal sent to Premiere Pro extension via SocketIO")
                 return {"success": True, "path": result["path"]}
             else:
@@ -1696,6 +1276,9 @@ def handle_video_url(video_url, download_type, current_download, socketio, setti
         write_error_log(error_message, context)
         logging.error(error_message)
         return {"error": error_message}
+    finally:
+        release_extension_cookies(cookie_key)
+        bandwidth.end_job(bandwidth_job)
 
 def sanitize_resolution(resolution):
     """Convert resolution string to a clean integer value"""
@@ -1713,8 +1296,101 @@ def sanitize_resolution(resolution):
         # Default to 1080 if conversion fails
         return 1080
 
+def info_urls_expire_at(info):
+    """Earliest 'expire' timestamp among the stream URLs of an info dict (None if unknown)"""
+    expiries = []
+    for f in info.get('formats') or []:
+        match = re.search(r'[?&/]expire[=/](\d+)', f.get('url') or '')
+        if match:
+            expiries.append(int(match.group(1)))
+    return min(expiries) if expiries else None
+
+def info_urls_expired(info, margin=60):
+    """True if the stream URLs of an info dict expire within `margin` seconds"""
+    expire_at = info_urls_expire_at(info)
+    return expire_at is not None and expire_at - time.time() < margin
+
+def timed_extract(ydl, video_url, strategy):
+    """extract_info without downloading, timed as an extraction attempt of the current job"""
+    with job_metrics.span('extract', strategy=strategy):
+        return ydl.extract_info(video_url, download=False)
+
+def download_from_info(ydl, info, video_url):
+    """Download with an already-extracted info dict instead of re-extracting.
+
+    The video is re-extracted only when the cached stream URLs have expired
+    (or YouTube answers 403 on them). Returns the info dict that was used so
+    the caller can keep it for the next strategy.
+    """
+    if info is None or info_urls_expired(info):
+        logging.info("[INFO-CACHE] No usable cached info (missing or URLs expired), extracting again")
+        return ydl.extract_info(video_url, download=True)
+
+    try:
+        # Deep copy: process_ie_result writes into the format dicts, and the clip's audio and
+        # video threads download from the same info dict at the same time
+        ydl.process_ie_result(copy.deepcopy(info), download=True)
+    except Exception as e:
+        if 'HTTP Error 403' not in str(e):
+            raise
+        logging.warning("[INFO-CACHE] Cached stream URLs rejected (403), extracting again")
+        info = ydl.extract_info(video_url, download=True)
+    return info
+
+def download_dash_segmented(ydl, info, video_url, output_path, video_format_ids, progress_hook, is_cancelled):
+    """Fetch the selected DASH video and m4a audio streams with the segmented downloader.
+
+    The streams are written as <name>.f<id>.<ext>, the names yt-dlp would use,
+    so the regular post-download merge picks them up. Returns False (leaving
+    nothing behind) when the formats are not suitable or a download fails, so
+    the caller falls back to yt-dlp's own downloader.
+    """
+    if info_urls_expired(info):
+        logging.info("[SEGMENTED] Cached stream URLs expired, extracting again")
+        info = timed_extract(ydl, video_url, 'segmented-refresh')
+    # Let yt-dlp's own format selection pick the pair it would download (its ranking puts the
+    # original-language, non-DRC audio first among same-bitrate variants)
+    try:
+        selected = ydl.process_ie_result(copy.deepcopy(info), download=False)
+    except Exception as e:
+        logging.info(f"[SEGMENTED] Format selection failed ({str(e)[:100]}), using yt-dlp downloader")
+        return False
+    requested = selected.get('requested_formats') or []
+    video_fmt = next((f for f in requested if f.get('vcodec') not in (None, 'none')), None)
+    audio_fmt = next((f for f in requested if f.get('vcodec') == 'none' and f.get('acodec') not in (None, 'none')), None)
+    if video_fmt and (video_fmt.get('format_id') not in video_format_ids
+                      or not segmented_downloader.is_worthwhile(video_fmt)):
+        video_fmt = None
+    if audio_fmt and (audio_fmt.get('ext') != 'm4a' or audio_fmt.get('protocol') != 'https' or not audio_fmt.get('url')):
+        audio_fmt = None
+    if len(requested) != 2 or not video_fmt or not audio_fmt:
+        logging.info("[SEGMENTED] Selected formats are not single-file https streams, using yt-dlp downloader")
+        return False
+
+    base_name = os.path.splitext(output_path)[0]
+    written = []
+    for fmt in (video_fmt, audio_fmt):
+        dest = f"{base_name}.f{fmt['format_id']}.{fmt['ext']}"
+        try:
+            segmented_downloader.download(fmt['url'], dest, headers=fmt.get('http_headers'),
+                                          total_size=fmt.get('filesize'), progress_hook=progress_hook,
+                                          is_cancelled=is_cancelled, info_dict=fmt)
+            written.append(dest)
+        except segmented_downloader.SegmentedDownloadError as e:
+            for path in written:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            if is_cancelled[0]:
+                raise Exception('Download cancelled by user')
+            logging.warning(f"[SEGMENTED] {fmt['format_id']} failed ({e}), falling back to yt-dlp downloader")
+            return False
+    return True
+
 def _try_direct_ffmpeg_clip(video_info, target_height, clip_start, clip_end,
-                            video_file_path, ffmpeg_path, http_headers, is_cancelled):
+                            video_file_path, ffmpeg_path, http_headers, is_cancelled,
+                            cookie_source=None):
     """
     Fast clip extraction using FFmpeg's HTTP input-seek.
 
@@ -1725,6 +1401,9 @@ def _try_direct_ffmpeg_clip(video_info, target_height, clip_start, clip_end,
     For YouTube DASH streams the CDN honours Range requests, so FFmpeg
     downloads only the bytes needed for the clip — not the full file.
 
+    cookie_source is a cookie_store source; when the stream URL needs cookies
+    they are sent as a Cookie header built from the shared jar.
+
     Returns True on success, False to fall back to yt-dlp.
     """
     import threading
@@ -1812,15 +1491,20 @@ def _try_direct_ffmpeg_clip(video_info, target_height, clip_start, clip_end,
     # FFmpeg multi-header syntax: separate headers with \r\n
     hdr = f'User-Agent: {ua}\r\nAccept: */*\r\nAccept-Language: en-US,en;q=0.9'
 
+    def _with_cookie(headers, url):
+        cookies = cookie_header(cookie_source, url)
+        return f'{headers}\r\nCookie: {cookies}' if cookies else headers
+
     ss  = f'{clip_start:.3f}'
     dur = f'{clip_duration:.3f}'
 
     cmd = [ffmpeg_path, '-y', '-hide_banner', '-loglevel', 'warning']
     # Input 0: video — seek BEFORE -i so FFmpeg sends an HTTP Range request
-    cmd += ['-headers', hdr, '-ss', ss, '-i', video_url_direct]
+    cmd += ['-headers', _with_cookie(hdr, video_url_direct), '-ss', ss, '-i', video_url_direct]
     if audio_fmt:
         # Input 1: audio — same seek before -i (also strip range= param)
-        cmd += ['-headers', hdr, '-ss', ss, '-i', _strip_range_param(audio_fmt['url'])]
+        audio_url_direct = _strip_range_param(audio_fmt['url'])
+        cmd += ['-headers', _with_cookie(hdr, audio_url_direct), '-ss', ss, '-i', audio_url_direct]
         cmd += ['-t', dur, '-c:v', 'copy', '-c:a', 'copy',
                 '-map', '0:v:0', '-map', '1:a:0',
                 '-movflags', '+faststart', video_file_path]
@@ -1835,39 +1519,35 @@ def _try_direct_ffmpeg_clip(video_info, target_height, clip_start, clip_end,
 
     # ---- run & monitor ------------------------------------------------------
     try:
-        proc = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0,
-        )
-        stderr_lines = []
-
-        def _read_stderr():
-            for raw in proc.stderr:
-                line = raw.decode('utf-8', errors='replace').rstrip()
-                if line:
-                    stderr_lines.append(line)
-                    logging.debug(f'[DIRECT-FFmpeg] {line}')
-
-        t = threading.Thread(target=_read_stderr, daemon=True)
-        t.start()
-
-        t0 = time.time()
-        while proc.poll() is None:
-            if is_cancelled[0]:
-                proc.terminate()
-                logging.info('[DIRECT-FFmpeg] Cancelled by user')
-                return False
-            if time.time() - t0 > timeout_s:
-                proc.terminate()
-                logging.error(f'[DIRECT-FFmpeg] Timed out after {timeout_s}s')
-                return False
-            time.sleep(0.5)
-
-        t.join(timeout=5)
-        elapsed = time.time() - t0
-        rc = proc.returncode
+        with ffmpeg_executor.popen(cmd, priority=PRIORITY_CLIP, is_cancelled=is_cancelled,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+            stderr_lines = []
+
+            def _read_stderr():
+                for raw in proc.stderr:
+                    line = raw.decode('utf-8', errors='replace').rstrip()
+                    if line:
+                        stderr_lines.append(line)
+                        logging.debug(f'[DIRECT-FFmpeg] {line}')
+
+            t = threading.Thread(target=_read_stderr, daemon=True)
+            t.start()
+
+            t0 = time.time()
+            while proc.poll() is None:
+                if is_cancelled[0]:
+                    proc.terminate()
+                    logging.info('[DIRECT-FFmpeg] Cancelled by user')
+                    return False
+                if time.time() - t0 > timeout_s:
+                    proc.terminate()
+                    logging.error(f'[DIRECT-FFmpeg] Timed out after {timeout_s}s')
+                    return False
+                time.sleep(0.5)
+
+            t.join(timeout=5)
+            elapsed = time.time() - t0
+            rc = proc.returncode
 
         if rc != 0:
             logging.error(f'[DIRECT-FFmpeg] FFmpeg exit={rc} in {elapsed:.1f}s  '
@@ -1889,11 +1569,6 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
     # Clean up PATH environment variable to avoid conflicts
     clean_environment_path()
 
-    # Clean up resources before starting new download to prevent accumulation
-    logging.info("Cleaning up resources before clip download...")
-    cleanup_ffmpeg_processes()
-    cleanup_temporary_cookies()
-
     # Check if download path exists or try to get default path
     if not download_path:
         download_path = get_default_download_path(socketio)
@@ -1929,7 +1604,8 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
         pass
 
     # Run pre-download diagnostics
-    diag = run_pre_download_diagnostics(download_path, ffmpeg_path, socketio)
+    with job_metrics.span('diagnostics'):
+        diag = run_pre_download_diagnostics(download_path, ffmpeg_path, socketio)
     if not diag['success']:
         error_msg = diag['errors'][0] if diag['errors'] else "Diagnostic check failed"
         logging.error(f"[CLIP] Pre-download diagnostics failed: {error_msg}")
@@ -1964,17 +1640,8 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
                 logging.info(f"[CLIP] Normalized youtu.be URL to: {video_url}")
 
         # Prepare authentication first
-        cookies_file = None
-        browser_cookies = None
-
-        if cookies:
-            cookies_file = create_cookies_file(cookies)
-            if not cookies_file:
-                cookies_file = get_youtube_cookies_file()
-        else:
-            cookies_file = get_youtube_cookies_file()
-            if not cookies_file:
-                browser_cookies = try_extract_cookies_from_browser()
+        with job_metrics.span('cookies'):
+            cookies_file = select_cookie_source(cookies)
 
         # Get sanitized title for the output file
         # Try without cookies first - format availability is more consistent and we only need the title
@@ -1986,18 +1653,20 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
             opts['format'] = 'best'  # Force simple format to avoid "format not available" errors
             for key in ['format_sort', 'format_sort_force']:
                 opts.pop(key, None)
-            if with_cookies and browser_cookies:
-                opts['cookiesfrombrowser'] = browser_cookies
             return opts
 
+        title_info = None
+        title_used_cookies = False
         for use_cookies in (False, True):
             try:
-                with yt_dlp.YoutubeDL(_build_title_opts(use_cookies)) as ydl:
-                    video_info = ydl.extract_info(video_url, download=False)
+                with open_ydl(_build_title_opts(use_cookies)) as ydl:
+                    video_info = timed_extract(ydl, video_url, 'title-cookies' if use_cookies else 'title')
                     if video_info and video_info.get('title'):
                         sanitized_title = sanitize_youtube_title(video_info['title'])
                         logging.info(f"Successfully extracted title for clip (cookies={use_cookies}): {sanitized_title}")
                         log_youtube_formats(video_info, resolution)
+                        title_info = video_info
+                        title_used_cookies = use_cookies
                         break
             except Exception as e:
                 logging.warning(f"Title extraction failed (cookies={use_cookies}): {str(e)[:120]}")
@@ -2007,10 +1676,8 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
             logging.error("Could not extract video title, using timestamp fallback")
             
         # Get unique filename - always numbered: VideoTitle_clip1.mp4, _clip2.mp4, etc.
-        counter = 1
-        while os.path.exists(os.path.join(download_path, f"{sanitized_title}_clip{counter}.mp4")):
-            counter += 1
-        unique_filename = f"{sanitized_title}_clip{counter}.mp4"
+        unique_filename = allocate_filename(download_path, sanitized_title, 'mp4',
+                                            separator='_clip', always_number=True)
         video_file_path = os.path.join(download_path, unique_filename)
         logging.info(f"Setting output path to: {video_file_path}")
 
@@ -2134,41 +1801,43 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
                 logging.info('[FINISHED] Clip download finished')
                 # No percentage emission for clips - animation will stop when complete
 
-        # Extract video info: try WITHOUT cookies first (clips work better without them),
-        # fall back to WITH cookies only if the no-cookie attempt fails.
-        use_cookies_for_download = False  # Default: no cookies for clips
-        video_info = None
-        video_formats = []
-
-        logging.info("Extracting video info for clip WITHOUT cookies (preferred)...")
-        try:
-            no_cookie_opts = get_robust_ydl_options(ffmpeg_path, cookies_file=None, user_agent=user_agent)
-            no_cookie_opts['skip_download'] = True
-            no_cookie_opts.pop('cookiefile', None)
+        # Every clip strategy below runs from this single info dict. Reuse the one
+        # extracted for the title; only extract again if that failed.
+        # Without cookies is preferred (clips work better without them).
+        use_cookies_for_download = title_used_cookies
+        video_info = title_info
+        video_formats = [f for f in video_info.get('formats', []) if f.get('vcodec') != 'none'] if video_info else []
 
-            with yt_dlp.YoutubeDL(no_cookie_opts) as ydl_nocookie:
-                video_info = ydl_nocookie.extract_info(video_url, download=False)
-                if video_info:
-                    video_formats = [f for f in video_info.get('formats', []) if f.get('vcodec') != 'none']
-                    logging.info(f"Successfully extracted clip video info WITHOUT cookies: {len(video_formats)} video formats")
-        except Exception as nocookie_error:
-            logging.warning(f"Clip extraction without cookies failed: {str(nocookie_error)[:100]}")
-            logging.info("Retrying clip extraction WITH cookies...")
+        if video_info is None:
+            logging.info("Extracting video info for clip WITHOUT cookies (preferred)...")
             try:
-                extract_opts = get_robust_ydl_options(ffmpeg_path, cookies_file=cookies_file, user_agent=user_agent)
-                extract_opts['skip_download'] = True
-                extract_opts['format'] = 'best/worst'
-                if browser_cookies:
-                    extract_opts['cookiesfrombrowser'] = browser_cookies
+                no_cookie_opts = get_robust_ydl_options(ffmpeg_path, cookies_file=None, user_agent=user_agent)
+                no_cookie_opts['skip_download'] = True
+                no_cookie_opts.pop('cookiefile', None)
 
-                with yt_dlp.YoutubeDL(extract_opts) as ydl_extract:
-                    video_info = ydl_extract.extract_info(video_url, download=False)
+                with open_ydl(no_cookie_opts) as ydl_nocookie:
+                    video_info = timed_extract(ydl_nocookie, video_url, 'nocookie')
                     if video_info:
                         video_formats = [f for f in video_info.get('formats', []) if f.get('vcodec') != 'none']
-                        use_cookies_for_download = True
-                        logging.info(f"Successfully extracted clip video info WITH cookies: {len(video_formats)} video formats")
-            except Exception as cookie_error:
-                logging.error(f"Clip extraction with cookies also failed: {str(cookie_error)[:100]}")
+                        logging.info(f"Successfully extracted clip video info WITHOUT cookies: {len(video_formats)} video formats")
+            except Exception as nocookie_error:
+                logging.warning(f"Clip extraction without cookies failed: {str(nocookie_error)[:100]}")
+                logging.info("Retrying clip extraction WITH cookies...")
+                try:
+                    extract_opts = get_robust_ydl_options(ffmpeg_path, cookies_file=cookies_file, user_agent=user_agent)
+                    extract_opts['skip_download'] = True
+                    extract_opts['format'] = 'best/worst'
+
+                    with open_ydl(extract_opts) as ydl_extract:
+                        video_info = timed_extract(ydl_extract, video_url, 'extract')
+                        if video_info:
+                            video_formats = [f for f in video_info.get('formats', []) if f.get('vcodec') != 'none']
+                            use_cookies_for_download = True
+                            logging.info(f"Successfully extracted clip video info WITH cookies: {len(video_formats)} video formats")
+                except Exception as cookie_error:
+                    logging.error(f"Clip extraction with cookies also failed: {str(cookie_error)[:100]}")
+                    if cookies_file == FROM_BROWSER and is_auth_rejection(cookie_error):
+                        report_auth_failure()
         
         # Build format string based on available AVC1 formats
         # Detect format types: HLS (m3u8, already combined) vs DASH (https, video-only)
@@ -2242,7 +1911,20 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
         # This bypasses yt-dlp's FFmpegFD which would download the full stream.
         # =====================================================================
         _fast_path_done = False
-        if video_info:
+        # 'clipStrategy' pins one strategy ('direct', 'dash-partial' or 'ranges', used
+        # by the benchmarks to compare them); 'auto' tries them in order
+        clip_strategy = settings.get('clipStrategy', 'auto')
+        _clip_started = time.time()
+        _clip_strategy_used = 'ranges'
+        if video_info and info_urls_expired(video_info):
+            logging.info('[INFO-CACHE] Stream URLs expired since extraction, extracting again')
+            try:
+                with open_ydl(dict(ydl_opts, skip_download=True)) as ydl_refresh:
+                    video_info = timed_extract(ydl_refresh, video_url, 'refresh')
+            except Exception as _re:
+                logging.warning(f'[INFO-CACHE] Re-extraction failed: {str(_re)[:100]}')
+                video_info = None
+        if video_info and clip_strategy in ('auto', 'direct'):
             logging.info('[DIRECT-FFmpeg] Attempting fast HTTP-seek clip extraction...')
             try:
                 _direct_ok = _try_direct_ffmpeg_clip(
@@ -2254,40 +1936,24 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
                     ffmpeg_path=ffmpeg_path,
                     http_headers=ydl_opts.get('http_headers', {}),
                     is_cancelled=is_cancelled,
+                    cookie_source=cookies_file if use_cookies_for_download else None,
                 )
             except Exception as _de:
                 logging.warning(f'[DIRECT-FFmpeg] Unexpected error: {_de} — trying next strategy')
                 _direct_ok = False
 
             if _direct_ok and os.path.exists(video_file_path):
-                _fsize = os.path.getsize(video_file_path)
-                if _fsize >= 10_000:
-                    # Verify the output actually contains a video stream (not just audio)
-                    # Use ffmpeg -i (always available) — it prints "Video: ..." to stderr
-                    _has_video_stream = False
-                    try:
-                        import subprocess as _sp
-                        _probe = _sp.run(
-                            [ffmpeg_path, '-hide_banner', '-i', video_file_path],
-                            capture_output=True, text=True, timeout=15
-                        )
-                        # FFmpeg writes stream info to stderr even when no output is specified
-                        _has_video_stream = 'Video:' in (_probe.stderr or '')
-                    except Exception as _pe:
-                        logging.warning(f'[DIRECT-FFmpeg] stream check failed: {_pe} — assuming video present')
-                        _has_video_stream = True  # assume ok if check fails
-
-                    if _has_video_stream:
-                        logging.info(f'[DIRECT-FFmpeg] Clip ready: {_fsize / 1024 / 1024:.1f} MB (video+audio) — skipping yt-dlp')
-                        _fast_path_done = True
-                    else:
-                        logging.warning(f'[DIRECT-FFmpeg] Output has NO video stream ({_fsize / 1024:.0f} KB = audio only) — trying next strategy')
-                        try:
-                            os.remove(video_file_path)
-                        except Exception:
-                            pass
+                # Verify the output actually contains a video stream (not just audio)
+                _media = media_probe.probe(video_file_path, ffmpeg_path)
+                if _media.has_video:
+                    logging.info(f'[DIRECT-FFmpeg] Clip ready: {_media.size / 1024 / 1024:.1f} MB '
+                                 f'({_media.video_codec}+{_media.audio_codec or "no audio"}, '
+                                 f'{_media.duration or 0:.1f}s) — skipping yt-dlp')
+                    _fast_path_done = True
+                    _clip_strategy_used = 'direct'
                 else:
-                    logging.warning(f'[DIRECT-FFmpeg] Output too small ({_fsize} bytes) — trying next strategy')
+                    logging.warning(f'[DIRECT-FFmpeg] Output has NO video stream ({_media.size / 1024:.0f} KB, '
+                                    f'audio={_media.audio_codec}) — trying next strategy')
                     try:
                         os.remove(video_file_path)
                     except Exception:
@@ -2297,7 +1963,8 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
         # STRATEGY 2: DASH partial download (early-stop at byte threshold)
         # For proper DASH segmented streams — downloads only up to clip_end.
         # =====================================================================
-        if not _fast_path_done and not use_hls_formats and dash_avc1_formats and video_info:
+        if (not _fast_path_done and not use_hls_formats and dash_avc1_formats and video_info
+                and clip_strategy in ('auto', 'dash-partial')):
             _clip_dur = clip_end - clip_start
             _vid_duration = video_info.get('duration', 0)
 
@@ -2327,15 +1994,65 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
             # Temp files for separate video and audio
             _vid_temp = video_file_path + '._vid.mp4'
             _aud_temp = video_file_path + '._aud.m4a'
-            _vid_clip_temp = video_file_path + '._vid_clip.mp4'
-            _aud_clip_temp = video_file_path + '._aud_clip.m4a'
-            for _tf in [_vid_temp, _vid_temp + '.part', _aud_temp, _aud_temp + '.part',
-                        _vid_clip_temp, _aud_clip_temp]:
+            for _tf in [_vid_temp, _vid_temp + '.part', _aud_temp, _aud_temp + '.part']:
                 if os.path.exists(_tf):
                     try: os.remove(_tf)
                     except: pass
 
-            # --- Step 1: video-only download with early stop ---
+            # --- Audio-only download (small, no early stop needed) ---
+            # Runs in parallel with the video stream (CLIP_PARALLEL_STREAMS) or after it.
+            _aud_result = {'path': None, 'error': None}
+            _aud_abort = [False]
+            _aud_info = video_info
+
+            def _aud_progress_hook(d):
+                if _aud_abort[0]:
+                    raise Exception('AUD_ABORTED')
+                progress_hook(d)
+
+            _aud_opts = dict(ydl_opts)
+            _aud_opts.update({
+                'format': '140/bestaudio[ext=m4a]/bestaudio',
+                'outtmpl': _aud_temp,
+                'no_part': True,
+                'progress_hooks': [_aud_progress_hook],
+            })
+
+            _clip_job = bandwidth.current_job()
+            _metrics_job = job_metrics.current_job()
+
+            def _download_clip_audio():
+                bandwidth.bind(_clip_job)
+                job_metrics.bind(_metrics_job)
+                try:
+                    with open_ydl(_aud_opts) as ydl_a:
+                        if not CLIP_PARALLEL_STREAMS:
+                            current_download['ydl'] = ydl_a
+                        download_from_info(ydl_a, _aud_info, video_url)
+                    _aud_result['path'] = _aud_temp if os.path.exists(_aud_temp) else None
+                    logging.info(f"[CLIP-PARTIAL] Audio download completed")
+                except Exception as _ae:
+                    _aud_result['error'] = _ae
+                    if not _aud_abort[0] and 'cancelled' not in str(_ae).lower():
+                        logging.warning(f"[CLIP-PARTIAL] Audio download error: {str(_ae)[:200]}")
+
+            def _discard_audio():
+                """Stop the audio download (if running) and remove its files"""
+                _aud_abort[0] = True
+                if _aud_thread:
+                    _aud_thread.join()
+                for _tf in [_aud_temp, _aud_temp + '.part']:
+                    if os.path.exists(_tf):
+                        try: os.remove(_tf)
+                        except: pass
+
+            _aud_thread = None
+            if CLIP_PARALLEL_STREAMS:
+                _aud_thread = threading.Thread(target=_download_clip_audio, daemon=True)
+                _aud_thread.start()
+                logging.info("[CLIP-PARTIAL] Downloading video and audio streams in parallel")
+
+            # --- Video-only download with early stop ---
             _vid_early_stopped = [False]
 
             def _vid_progress_hook(d):
@@ -2371,21 +2088,20 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
                 'no_part': False,
                 'progress_hooks': [_vid_progress_hook],
             })
-            if browser_cookies and use_cookies_for_download:
-                _vid_opts['cookiesfrombrowser'] = browser_cookies
 
             _vid_actual = None
             socketio.emit('progress', {'progress': '0', 'percentage': '0%', 'type': 'clip', 'status': 'downloading'})
             socketio.emit('percentage', {'percentage': '0%'})
 
             try:
-                with yt_dlp.YoutubeDL(_vid_opts) as ydl_v:
+                with open_ydl(_vid_opts) as ydl_v:
                     current_download['ydl'] = ydl_v
-                    ydl_v.download([video_url])
+                    video_info = download_from_info(ydl_v, video_info, video_url)
                 _vid_actual = _vid_temp if os.path.exists(_vid_temp) else None
                 logging.info(f"[CLIP-PARTIAL] Video download completed normally")
             except Exception as _ve:
                 if 'cancelled' in str(_ve).lower():
+                    _discard_audio()
                     for _tf in [_vid_temp, _vid_temp + '.part']:
                         if os.path.exists(_tf): os.remove(_tf)
                     return {"error": "Download cancelled by user"}
@@ -2407,66 +2123,64 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
                             try: os.remove(_tf)
                             except: pass
 
-            if _vid_actual:
-                # --- Step 2: audio-only download (small, no early stop needed) ---
-                _aud_opts = dict(ydl_opts)
-                _aud_opts.update({
-                    'format': '140/bestaudio[ext=m4a]/bestaudio',
-                    'outtmpl': _aud_temp,
-                    'no_part': True,
-                    'progress_hooks': [progress_hook],
-                })
-                if browser_cookies and use_cookies_for_download:
-                    _aud_opts['cookiesfrombrowser'] = browser_cookies
+            if not _vid_actual:
+                _discard_audio()
+            else:
+                if _aud_thread:
+                    _aud_thread.join()
+                else:
+                    _download_clip_audio()
 
-                _aud_actual = None
-                try:
-                    with yt_dlp.YoutubeDL(_aud_opts) as ydl_a:
-                        current_download['ydl'] = ydl_a
-                        ydl_a.download([video_url])
-                    _aud_actual = _aud_temp if os.path.exists(_aud_temp) else None
-                    logging.info(f"[CLIP-PARTIAL] Audio download completed")
-                except Exception as _ae:
-                    if 'cancelled' in str(_ae).lower():
-                        return {"error": "Download cancelled by user"}
-                    logging.warning(f"[CLIP-PARTIAL] Audio download error: {str(_ae)[:200]}")
+                if is_cancelled[0] or 'cancelled' in str(_aud_result['error'] or '').lower():
+                    _discard_audio()
+                    if os.path.exists(_vid_actual): os.remove(_vid_actual)
+                    return {"error": "Download cancelled by user"}
 
+                _aud_actual = _aud_result['path']
                 if _aud_actual:
-                    # --- Step 3: trim + merge with ffmpeg ---
+                    # --- Trim + mux in a single FFmpeg pass, stream copy ---
+                    # itag 140 / m4a audio is already AAC and goes into the MP4 as-is;
+                    # only a non-AAC fallback stream (opus/vorbis) is encoded.
+                    _aud_codec = probe_audio_codec(ffmpeg_path, _aud_actual)
                     try:
-                        _fv = [ffmpeg_path, '-ss', f'{clip_start:.3f}', '-t', f'{_clip_dur:.3f}',
-                               '-i', _vid_actual, '-c:v', 'copy', '-avoid_negative_ts', 'make_zero', '-y', _vid_clip_temp]
-                        run_hidden_subprocess(_fv, timeout=120, check=True, capture_output=True,
-                                              text=True, encoding='utf-8', errors='replace')
-
-                        _fa = [ffmpeg_path, '-ss', f'{clip_start:.3f}', '-t', f'{_clip_dur:.3f}',
-                               '-i', _aud_actual, '-c:a', 'copy', '-y', _aud_clip_temp]
-                        run_hidden_subprocess(_fa, timeout=60, check=True, capture_output=True,
-                                              text=True, encoding='utf-8', errors='replace')
-
-                        _fm = [ffmpeg_path, '-i', _vid_clip_temp, '-i', _aud_clip_temp,
-                               '-c:v', 'copy', '-c:a', 'aac', '-b:a', '192k',
+                        _fm = [ffmpeg_path,
+                               '-ss', f'{clip_start:.3f}', '-t', f'{_clip_dur:.3f}', '-i', _vid_actual,
+                               '-ss', f'{clip_start:.3f}', '-t', f'{_clip_dur:.3f}', '-i', _aud_actual,
+                               '-map', '0:v:0', '-map', '1:a:0',
+                               '-c:v', 'copy'] + audio_codec_args(_aud_codec) + [
+                               '-avoid_negative_ts', 'make_zero',
                                '-movflags', '+faststart', '-y', video_file_path]
-                        run_hidden_subprocess(_fm, timeout=120, check=True, capture_output=True,
-                                              text=True, encoding='utf-8', errors='replace')
+                        with encoder_slot(_aud_codec):
+                            run_hidden_subprocess(_fm, timeout=120, priority=PRIORITY_CLIP, is_cancelled=is_cancelled,
+                                                  check=True, capture_output=True,
+                                                  text=True, encoding='utf-8', errors='replace')
 
-                        logging.info(f"[CLIP-PARTIAL] Trim+merge succeeded: {video_file_path}")
+                        logging.info(f"[CLIP-PARTIAL] Trim+mux succeeded (audio {_aud_codec or 'unknown'}, {'encoded to AAC' if needs_transcode(_aud_codec) else 'copied'}): {video_file_path}")
                         _fast_path_done = True
+                        _clip_strategy_used = 'dash-partial'
                     except Exception as _mfe:
-                        logging.warning(f"[CLIP-PARTIAL] FFmpeg trim/merge failed: {str(_mfe)[:300]}, falling back")
+                        logging.warning(f"[CLIP-PARTIAL] FFmpeg trim/mux failed: {str(_mfe)[:300]}, falling back")
                         if os.path.exists(video_file_path):
                             try: os.remove(video_file_path)
                             except: pass
                     finally:
-                        for _tf in [_vid_actual, _aud_actual, _vid_clip_temp, _aud_clip_temp]:
+                        for _tf in [_vid_actual, _aud_actual]:
                             if _tf and os.path.exists(_tf):
                                 try: os.remove(_tf)
                                 except: pass
                 else:
+                    _discard_audio()
                     if os.path.exists(_vid_actual):
                         try: os.remove(_vid_actual)
                         except: pass
 
+        if not _fast_path_done and clip_strategy in ('direct', 'dash-partial'):
+            # A pinned strategy that failed must not be measured as another one
+            error_message = f"Clip strategy '{clip_strategy}' failed (pinned by the clipStrategy setting)"
+            logging.error(f"[CLIP] {error_message}")
+            socketio.emit('download-failed', {'message': error_message})
+            return {"error": error_message}
+
         if not _fast_path_done:
             # yt-dlp wiki (2025) recommends: --download-sections + -S proto:https
             # proto:https sorts formats preferring combined HTTPS streams (no embedded
@@ -2493,12 +2207,9 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
             })
             logging.info('[CLIP] Strategy 3: yt-dlp download_range_func + proto:https sort')
 
-            if browser_cookies and use_cookies_for_download:
-                ydl_opts['cookiesfrombrowser'] = browser_cookies
-                logging.info("Using browser cookies for clip download")
 
             try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                with open_ydl(ydl_opts) as ydl:
                     current_download['ydl'] = ydl
                     logging.info('[DOWNLOAD] Set ydl object in current_download structure for clip download')
 
@@ -2515,7 +2226,7 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
                     socketio.emit('progress', {'progress': '0', 'percentage': '0%', 'type': 'clip', 'status': 'downloading'})
                     socketio.emit('percentage', {'percentage': '0%'})
 
-                    ydl.download([video_url])
+                    download_from_info(ydl, video_info, video_url)
 
                     if is_cancelled[0]:
                         if os.path.exists(video_file_path):
@@ -2575,19 +2286,16 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
 
                         socketio.emit('download-failed', {'message': error_message})
                         return {"error": error_message}
+
+        # Time to cut the clip, failed attempts included, under the strategy that produced it
+        job_metrics.record('clip_cut', time.time() - _clip_started, start=_clip_started,
+                           strategy=_clip_strategy_used)
         
         # Cleanup after download
         try:
                 current_download['ydl'] = None
                 current_download['cancel_callback'] = None
                 
-                # Clean up the cookies file after download (Windows only)
-                if sys.platform == 'win32' and cookies_file and os.path.exists(cookies_file):
-                    try:
-                        os.remove(cookies_file)
-                        logging.info(f"[Windows] Cleaned up temporary cookies file: {cookies_file}")
-                    except Exception as e:
-                        logging.debug(f"Could not remove cookies file: {e}")
         except Exception as cleanup_error:
             logging.debug(f"Error during cleanup: {cleanup_error}")
 
@@ -2611,10 +2319,11 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
 
         # Add metadata to the video file if it exists
         if os.path.exists(video_file_path):
-            file_size = os.path.getsize(video_file_path)
+            clip_media = media_probe.probe(video_file_path, ffmpeg_path)
+            file_size = clip_media.size
             logging.info(f"[CLIP-COMPLETE] Clip downloaded successfully: {video_file_path} ({file_size/1024/1024:.1f} MB)")
-            if file_size < 10_000:  # Less than 10 KB → corrupt/empty
-                logging.error(f"[CLIP-COMPLETE] Downloaded file is too small ({file_size} bytes) — likely corrupt or incomplete. Skipping metadata and import.")
+            if not clip_media.has_video:  # No readable video stream → corrupt/empty
+                logging.error(f"[CLIP-COMPLETE] Downloaded file has no readable video stream ({file_size} bytes) — likely corrupt or incomplete. Skipping metadata and import.")
                 socketio.emit('download-failed', {'message': f'Le fichier téléchargé est vide ou corrompu ({file_size} octets). Essayez à nouveau.'})
                 return {"error": f"Downloaded clip is corrupt ({file_size} bytes)"}
             socketio.emit('percentage', {'percentage': '100% - Ajout métadonnées clip...'})
@@ -2633,28 +2342,29 @@ def download_and_process_clip(video_url, resolution, download_path, clip_start,
 
             try:
                 # Use 5 minute timeout for clip metadata
-                run_hidden_subprocess(metadata_command, timeout=300, check=True, capture_output=True, text=True, encoding='utf-8', errors='replace')
+                with job_metrics.span('metadata'):
+                    run_hidden_subprocess(metadata_command, timeout=300, priority=PRIORITY_CLIP, check=True, capture_output=True, text=True, encoding='utf-8', errors='replace')
                 os.replace(f'{video_file_path}_with_metadata.mp4', video_file_path)
                 logging.info(f"[CLIP-METADATA] Metadata added: {video_file_path}")
                 
                 # Emit events
                 socketio.emit('complete', {'type': 'clip', 'message': 'Clip téléchargé avec succès'})
                 socketio.emit('download-complete', {'url': video_url, 'path': video_file_path})
-                socketio.emit('import_video', {'path': video_file_path, 'bin': settings.get('premiereBin', '')})
+                queue_import(video_file_path, settings.get('premiereBin', ''))
                 logging.info("[CLIP-COMPLETE] Import signal sent to Premiere Pro extension via SocketIO")
                 return {"success": True, "path": video_file_path}
             except subprocess.TimeoutExpired as e:
                 logging.error(f"[CLIP-METADATA] FFmpeg timeout after {e.timeout}s")
                 # Continue anyway, as the clip itself is fine
                 socketio.emit('download-complete', {'url': video_url, 'path': video_file_path})
-                socketio.emit('import_video', {'path': video_file_path, 'bin': settings.get('premiereBin', '')})
+                queue_import(video_file_path, settings.get('premiereBin', ''))
                 logging.info("[CLIP-COMPLETE] Import signal sent (without metadata due to timeout)")
                 return {"success": True, "path": video_file_path}
             except subprocess.CalledProcessError as e:
                 logging.error(f"[CLIP-METADATA] Error adding metadata: {e.stderr}")
                 # Continue anyway, as the clip itself is fine
                 socketio.emit('download-complete', {'url': video_url, 'path': video_file_path})
-                socketio.emit('import_video', {'path': video_file_path, 'bin': settings.get('premiereBin', '')})
+                queue_import(video_file_path, settings.get('premiereBin', ''))
                 logging.info("[CLIP-COMPLETE] Import signal sent (without metadata due to error)")
                 return {"success": True, "path": video_file_path}
         else:
@@ -2682,30 +2392,19 @@ def get_unique_filename(base_path, filename, extension):
     Generate a unique filename by adding incremental numbers if the file already exists.
     Example: if 'video.mp4' exists, try 'video_1.mp4', 'video_2.mp4', etc.
     """
-    if not os.path.exists(os.path.join(base_path, f"{filename}.{extension}")):
-        return f"{filename}.{extension}"
-    
-    counter = 1
-    while os.path.exists(os.path.join(base_path, f"{filename}_{counter}.{extension}")):
-        counter += 1
-    
-    return f"{filename}_{counter}.{extension}"
+    return allocate_filename(base_path, filename, extension)
 
 def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_path, socketio, settings, current_download, cookies=None, user_agent=None):
     # Clean up PATH environment variable to avoid conflicts
     clean_environment_path()
     
-    # Clean up resources before starting new download to prevent accumulation
-    logging.info("Cleaning up resources before video download...")
-    cleanup_ffmpeg_processes()
-    cleanup_temporary_cookies()
-    
     check_result = check_ffmpeg(settings, socketio)
     if not check_result['success']:
         return None
     
     # Run pre-download diagnostics
-    diag = run_pre_download_diagnostics(download_path, ffmpeg_path, socketio)
+    with job_metrics.span('diagnostics'):
+        diag = run_pre_download_diagnostics(download_path, ffmpeg_path, socketio)
     if not diag['success']:
         error_msg = diag['errors'][0] if diag['errors'] else "Diagnostic check failed"
         logging.error(f"[DOWNLOAD] Pre-download diagnostics failed: {error_msg}")
@@ -2713,8 +2412,6 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
         return {"error": error_msg}
 
     try:
-        import yt_dlp
-
         # Handle cancellation
         is_cancelled = [False]
         def cancel_callback():
@@ -2888,19 +2585,8 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
             return None
 
         # Prepare authentication first
-        cookies_file = None
-        browser_cookies = None
-        
-        if cookies:
-            cookies_file = create_cookies_file(cookies)
-            if not cookies_file:
-                # Fallback to manual cookies file
-                cookies_file = get_youtube_cookies_file()
-        else:
-            # Check for manual cookies file or try browser extraction
-            cookies_file = get_youtube_cookies_file()
-            if not cookies_file:
-                browser_cookies = try_extract_cookies_from_browser()
+        with job_metrics.span('cookies'):
+            cookies_file = select_cookie_source(cookies)
         
         # Clean the video URL to remove playlist parameters that can trigger format validation
         # YouTube URLs with &list= parameters can cause yt-dlp to validate formats even with noplaylist=True
@@ -2950,8 +2636,8 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
         try:
             no_cookie_first_opts = get_robust_ydl_options(ffmpeg_path, cookies_file=None, user_agent=user_agent)
             no_cookie_first_opts['skip_download'] = True
-            with yt_dlp.YoutubeDL(no_cookie_first_opts) as ydl_first:
-                info = ydl_first.extract_info(video_url, download=False)
+            with open_ydl(no_cookie_first_opts) as ydl_first:
+                info = timed_extract(ydl_first, video_url, 'no-cookies')
                 if info:
                     logging.info("Successfully extracted video info without cookies")
                     use_cookies_for_download = False
@@ -2964,20 +2650,19 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
         if not info:
             initial_ydl_opts = get_robust_ydl_options(ffmpeg_path, cookies_file=cookies_file, user_agent=user_agent)
             initial_ydl_opts['skip_download'] = True
-            if browser_cookies:
-                initial_ydl_opts['cookiesfrombrowser'] = browser_cookies
-                logging.info(f"Using cookies from browser for info extraction: {browser_cookies[0]}")
             initial_ydl_opts['format'] = 'best/worst'  # Ultra-permissive: any format works for metadata
 
             logging.info("Extracting video information with authentication...")
             try:
-                with yt_dlp.YoutubeDL(initial_ydl_opts) as ydl:
-                    info = ydl.extract_info(video_url, download=False)
+                with open_ydl(initial_ydl_opts) as ydl:
+                    info = timed_extract(ydl, video_url, 'cookies')
                     if not info:
                         raise Exception("Could not extract video information")
                     logging.info("Successfully extracted video information with cookies")
             except Exception as info_error:
                 error_str = str(info_error)
+                if cookies_file == FROM_BROWSER and is_auth_rejection(info_error):
+                    report_auth_failure()
                 # Check for cookie-related errors and retry without cookies
                 if "invalid Netscape format cookies file" in error_str or "CookieLoadError" in error_str or "failed to load cookies" in error_str:
                     logging.warning("Cookie format error during info extraction. Retrying without cookies...")
@@ -2986,8 +2671,8 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
                         fallback_ydl_opts['skip_download'] = True
                         fallback_ydl_opts['format'] = 'best/worst'
 
-                        with yt_dlp.YoutubeDL(fallback_ydl_opts) as ydl_fallback:
-                            info = ydl_fallback.extract_info(video_url, download=False)
+                        with open_ydl(fallback_ydl_opts) as ydl_fallback:
+                            info = timed_extract(ydl_fallback, video_url, 'fallback')
                             if not info:
                                 raise Exception("Could not extract video information")
                             logging.info("Successfully extracted video info without cookies")
@@ -3010,8 +2695,8 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
                         if 'format' in initial_ydl_opts:
                             del initial_ydl_opts['format']
 
-                        with yt_dlp.YoutubeDL(initial_ydl_opts) as ydl_retry:
-                            info = ydl_retry.extract_info(video_url, download=False)
+                        with open_ydl(initial_ydl_opts) as ydl_retry:
+                            info = timed_extract(ydl_retry, video_url, 'retry')
                             if not info:
                                 raise Exception("Could not extract video information")
                             logging.info("Successfully extracted video info with default format")
@@ -3028,8 +2713,8 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
                                 del android_fallback_opts['format']
 
                             logging.info("Using Android player client as fallback...")
-                            with yt_dlp.YoutubeDL(android_fallback_opts) as ydl_android:
-                                info = ydl_android.extract_info(video_url, download=False)
+                            with open_ydl(android_fallback_opts) as ydl_android:
+                                info = timed_extract(ydl_android, video_url, 'android')
                                 if not info:
                                     raise Exception("Could not extract video information with Android client")
                                 logging.info("Successfully extracted video info with Android player client fallback")
@@ -3046,8 +2731,8 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
                                 tv_fallback_opts['extractor_args'] = {'youtube': {'player_client': ['tv']}}
                                 tv_fallback_opts.pop('format', None)
 
-                                with yt_dlp.YoutubeDL(tv_fallback_opts) as ydl_tv:
-                                    info = ydl_tv.extract_info(video_url, download=False)
+                                with open_ydl(tv_fallback_opts) as ydl_tv:
+                                    info = timed_extract(ydl_tv, video_url, 'tv')
                                     if info and info.get('formats'):
                                         logging.info("Successfully extracted video info with TV (TVHTML5) player client")
                                         # Tell download phase to use tv client too
@@ -3067,8 +2752,8 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
                                 last_resort_opts.pop('format', None)
                                 last_resort_opts['ignoreerrors'] = True
 
-                                with yt_dlp.YoutubeDL(last_resort_opts) as ydl_last:
-                                    info = ydl_last.extract_info(video_url, download=False)
+                                with open_ydl(last_resort_opts) as ydl_last:
+                                    info = timed_extract(ydl_last, video_url, 'last')
                                     if info:
                                         logging.info("Last-resort extraction succeeded")
                                     else:
@@ -3112,8 +2797,8 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
                                                 import shutil as _shutil
                                                 if _shutil.which('node') or _shutil.which('nodejs'):
                                                     shorts_opts.setdefault('js_runtimes', {'node': {}})
-                                                with yt_dlp.YoutubeDL(shorts_opts) as ydl_shorts:
-                                                    info = ydl_shorts.extract_info(shorts_url_attempt, download=False)
+                                                with open_ydl(shorts_opts) as ydl_shorts:
+                                                    info = timed_extract(ydl_shorts, shorts_url_attempt, 'shorts')
                                                     if info and info.get('formats'):
                                                         logging.info(f"Shorts fallback succeeded: client={web_client} url={shorts_url_attempt}")
                                                         video_url = shorts_url_attempt
@@ -3204,9 +2889,6 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
         
         # Add browser cookies if that's what we're using (fallback when no cookies file)
         # But only if we're supposed to use cookies!
-        if browser_cookies and use_cookies_for_download:
-            ydl_opts['cookiesfrombrowser'] = browser_cookies
-            logging.info("Using browser cookies for download")
 
         # Download the video
         logging.info("Starting video download...")
@@ -3235,6 +2917,7 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
         # IMPORTANT: Build format string based on AVAILABLE AVC1 formats
         # This ensures we only request formats that actually exist
         
+        format_selection_started = time.time()
         # Detect format types: HLS (m3u8, already combined) vs DASH (https, video-only)
         # HLS formats have protocol starting with 'm3u8' and already include audio
         # DASH formats have protocol 'https' and are typically video-only (acodec='none')
@@ -3250,6 +2933,7 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
         
         # Determine which format type to use
         use_hls_formats = False
+        selected_format_ids = []
         if dash_avc1_formats:
             # Prefer DASH formats (better quality, separate streams)
             avc1_formats = dash_avc1_formats
@@ -3294,6 +2978,7 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
             if valid_avc1:
                 # Use specific format IDs that we KNOW exist
                 format_ids = [f.get('format_id') for f in valid_avc1[:3] if f.get('format_id')]
+                selected_format_ids = format_ids
                 if format_ids:
                     if use_hls_formats:
                         # HLS/Combined formats already include audio - use directly without +bestaudio
@@ -3311,8 +2996,47 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
             socketio.emit('download-failed', {'message': f"Aucun format AVC1 disponible pour cette vidéo. Codecs disponibles: {set(f.get('vcodec', 'none') for f in video_formats)}"})
             return None
         
+        job_metrics.record('format_selection', time.time() - format_selection_started, format=ydl_opts['format'])
+
+        # Same video already downloaded with the same formats: reuse the finished file
+        dedup_key = None
+        if info.get('id'):
+            dedup_key = download_cache.make_key(info['id'], ydl_opts['format'], preferred_language, 'mp4')
+            cached_file = download_cache.lookup(dedup_key)
+            if cached_file:
+                try:
+                    reused_file = download_cache.materialize(cached_file, download_path)
+                    logging.info(f"[DEDUP] Reusing finished download instead of downloading again: {reused_file}")
+                    queue_import(reused_file, settings.get('premiereBin', ''))
+                    socketio.emit('download-complete', {'url': video_url, 'path': reused_file})
+                    socketio.emit('complete', {'type': 'full', 'success': True, 'path': reused_file})
+                    return reused_file
+                except OSError as e:
+                    logging.warning(f"[DEDUP] Could not reuse {cached_file}, downloading again: {e}")
+
+        # Resume mode: an interrupted download of the same video/format keeps its
+        # output name so yt-dlp continues its .part files instead of starting over
+        resume_key = resumed_path = None
+        if resume_index.is_enabled(settings) and info.get('id'):
+            resume_key = (info['id'], ydl_opts['format'])
+            resumed_path = resume_index.find_partial(download_path, *resume_key)
+            if resumed_path:
+                output_path = resumed_path
+                unique_filename = os.path.basename(resumed_path)
+                ydl_opts['outtmpl'] = {
+                    'default': os.path.join(download_path, os.path.splitext(unique_filename)[0] + '.%(ext)s')
+                }
+            else:
+                resume_index.record_partial(download_path, *resume_key, output_path)
+            ydl_opts['continuedl'] = True
+
+        # Segmented downloader for DASH streams (per job via the 'segmentedDownloads' setting);
+        # an interrupted yt-dlp download being resumed keeps using yt-dlp
+        use_segmented = bool(settings.get('segmentedDownloads', True) and not use_hls_formats
+                             and selected_format_ids and not resumed_path)
+
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            with open_ydl(ydl_opts) as ydl:
                 current_download['ydl'] = ydl
                 logging.info('[DOWNLOAD] Set ydl object in current_download structure for video download')
                 
@@ -3329,9 +3053,12 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
                 # and trigger SABR again (even with ios client, YouTube may return SABR on retry).
                 # process_ie_result reuses the HTTPS URLs already fetched during extraction.
                 # See: https://github.com/yt-dlp/yt-dlp/issues/12482
-                if not use_cookies_for_download and info is not None:
+                if use_segmented and download_dash_segmented(ydl, info, video_url, output_path,
+                                                            selected_format_ids, progress_hook, is_cancelled):
+                    logging.info("[SEGMENTED] Streams downloaded, merging")
+                elif not use_cookies_for_download and info is not None:
                     logging.info("[FIX-SABR] Using pre-extracted info dict to avoid SABR re-extraction (process_ie_result)")
-                    ydl.process_ie_result(info.copy(), download=True)
+                    download_from_info(ydl, info, video_url)
                 else:
                     ydl.download([video_url])
         except Exception as e:
@@ -3360,8 +3087,11 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
             # Check if this is a cancellation exception
             if 'cancelled' in str(e).lower():
                 logging.info("Video download cancelled by user")
-                # Clean up all partial files created by yt-dlp
-                cleanup_partial_video_files(output_path)
+                # Clean up all partial files created by yt-dlp (kept in resume mode)
+                if resume_key:
+                    logging.info(f"[RESUME] Keeping partial files of {os.path.basename(output_path)}")
+                else:
+                    cleanup_partial_video_files(output_path)
                 logging.info('[CANCEL] Video download successfully cancelled - cleanup completed')
                 return None
             
@@ -3389,13 +3119,9 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
             current_download['ydl'] = None
             current_download['cancel_callback'] = None
             
-            # Clean up the cookies file after download (Windows only)
-            if sys.platform == 'win32' and cookies_file and os.path.exists(cookies_file):
-                try:
-                    os.remove(cookies_file)
-                    logging.info(f"[Windows] Cleaned up temporary cookies file: {cookies_file}")
-                except Exception as e:
-                    logging.debug(f"Could not remove cookies file: {e}")
+
+        if resume_key:
+            resume_index.forget_partial(download_path, *resume_key)
 
         # Get the final path of the downloaded file
         final_path = output_path
@@ -3438,19 +3164,21 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
                 logging.info(f"[MERGE] Starting video+audio merge: {video_file} + {audio_file}")
                 socketio.emit('percentage', {'percentage': '100% - Fusion vidéo/audio...'})
                 
+                # AAC audio is copied; only opus/vorbis is encoded
+                audio_codec = probe_audio_codec(ffmpeg_path, audio_file)
                 merge_command = [
                     ffmpeg_path,
                     '-i', video_file,
                     '-i', audio_file,
-                    '-c:v', 'copy',
-                    '-c:a', 'aac'
-                ] + get_ffmpeg_postprocessor_args() + [
+                    '-c:v', 'copy'
+                ] + audio_codec_args(audio_codec) + get_ffmpeg_postprocessor_args() + [
                     final_path
                 ]
                 
                 try:
                     # Use 10 minute timeout for large video merges
-                    run_hidden_subprocess(merge_command, timeout=600, check=True, capture_output=True, text=True)
+                    with job_metrics.span('merge'), encoder_slot(audio_codec):
+                        run_hidden_subprocess(merge_command, timeout=600, priority=PRIORITY_FULL, is_cancelled=is_cancelled, check=True, capture_output=True, text=True)
                     logging.info(f"[MERGE] Successfully merged files into: {final_path}")
                     
                     # Clean up separate files
@@ -3521,11 +3249,15 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
 
             try:
                 # Use 5 minute timeout for metadata (should be quick with -codec copy)
-                run_hidden_subprocess(metadata_command, timeout=300, check=True)
+                with job_metrics.span('metadata'):
+                    run_hidden_subprocess(metadata_command, timeout=300, priority=PRIORITY_FULL, check=True)
                 os.replace(f'{actual_file}_with_metadata.mp4', actual_file)
                 
                 logging.info(f"[COMPLETE] Video downloaded and processed: {actual_file}")
-                socketio.emit('import_video', {'path': actual_file, 'bin': settings.get('premiereBin', '')})
+                # Only complete, merged outputs are reused by later requests
+                if dedup_key and actual_file == final_path:
+                    download_cache.record(dedup_key, actual_file)
+                queue_import(actual_file, settings.get('premiereBin', ''))
                 # Emit both formats to ensure compatibility
                 socketio.emit('download-complete', {'url': video_url, 'path': actual_file})  # Hyphenated format for Chrome extension
                 socketio.emit('complete', {'type': 'full', 'success': True, 'path': actual_file})  # Direct reset for Chrome button
@@ -3536,7 +3268,7 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
                 logging.error(f"[METADATA] FFmpeg metadata TIMEOUT after {e.timeout}s")
                 # Still return the file even if metadata failed
                 logging.info(f"[METADATA] Returning file without metadata due to timeout: {actual_file}")
-                socketio.emit('import_video', {'path': actual_file, 'bin': settings.get('premiereBin', '')})
+                queue_import(actual_file, settings.get('premiereBin', ''))
                 socketio.emit('download-complete', {'url': video_url, 'path': actual_file})
                 socketio.emit('complete', {'type': 'full', 'success': True, 'path': actual_file})  # Direct reset for Chrome button
                 logging.info("Import signal sent to Premiere Pro extension via SocketIO")
@@ -3546,7 +3278,7 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
                 logging.error(f"[METADATA] FFmpeg stderr: {e.stderr if hasattr(e, 'stderr') else 'No stderr'}")
                 # Still return the file even if metadata failed
                 logging.info(f"[METADATA] Returning file without metadata: {actual_file}")
-                socketio.emit('import_video', {'path': actual_file, 'bin': settings.get('premiereBin', '')})
+                queue_import(actual_file, settings.get('premiereBin', ''))
                 socketio.emit('download-complete', {'url': video_url, 'path': actual_file})
                 socketio.emit('complete', {'type': 'full', 'success': True, 'path': actual_file})  # Direct reset for Chrome button
                 logging.info("Import signal sent to Premiere Pro extension via SocketIO")
@@ -3587,11 +3319,11 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
                 # No cookies or browser auth for fallback
                 logging.info("Retrying download without authentication...")
                 
-                with yt_dlp.YoutubeDL(fallback_ydl_opts) as ydl_fallback:
+                with open_ydl(fallback_ydl_opts) as ydl_fallback:
                     current_download['ydl'] = ydl_fallback
                     
                     # Extract info again without cookies
-                    info_fallback = ydl_fallback.extract_info(video_url, download=False)
+                    info_fallback = timed_extract(ydl_fallback, video_url, 'fallback')
                     if info_fallback:
                         ydl_fallback.process_ie_result(info_fallback, download=True)
                         
@@ -3603,7 +3335,7 @@ def download_video(video_url, resolution, download_path, download_mp3, ffmpeg_pa
                             test_path = os.path.splitext(final_path)[0] + '.' + ext
                             if os.path.exists(test_path):
                                 logging.info(f"Found fallback downloaded file: {test_path}")
-                                socketio.emit('import_video', {'path': test_path, 'bin': settings.get('premiereBin', '')})
+                                queue_import(test_path, settings.get('premiereBin', ''))
                                 socketio.emit('download-complete', {'url': video_url, 'path': test_path})
                                 logging.info("Import signal sent to Premiere Pro extension via SocketIO")
                                 return test_path
@@ -3704,7 +3436,8 @@ def download_audio(video_url, download_path, ffmpeg_path, socketio, current_down
             return None
 
         # Run pre-download diagnostics
-        diag = run_pre_download_diagnostics(download_path, ffmpeg_path, socketio)
+        with job_metrics.span('diagnostics'):
+            diag = run_pre_download_diagnostics(download_path, ffmpeg_path, socketio)
         if not diag['success']:
             error_msg = diag['errors'][0] if diag['errors'] else "Diagnostic check failed"
             logging.error(f"[AUDIO] Pre-download diagnostics failed: {error_msg}")
@@ -3783,17 +3516,8 @@ def download_audio(video_url, download_path, ffmpeg_path, socketio, current_down
                 last_progress_value_audio[0] = 95
 
         # Prepare authentication first
-        cookies_file = None
-        browser_cookies = None
-        
-        if cookies:
-            cookies_file = create_cookies_file(cookies)
-            if not cookies_file:
-                cookies_file = get_youtube_cookies_file()
-        else:
-            cookies_file = get_youtube_cookies_file()
-            if not cookies_file:
-                browser_cookies = try_extract_cookies_from_browser()
+        with job_metrics.span('cookies'):
+            cookies_file = select_cookie_source(cookies)
         
         # Extract audio info: try WITHOUT cookies first (works better without them),
         # fall back to WITH cookies only if the no-cookie attempt fails.
@@ -3807,8 +3531,8 @@ def download_audio(video_url, download_path, ffmpeg_path, socketio, current_down
             no_cookie_opts['format'] = 'bestaudio/best'
             no_cookie_opts.pop('cookiefile', None)
 
-            with yt_dlp.YoutubeDL(no_cookie_opts) as ydl_nocookie:
-                info = ydl_nocookie.extract_info(video_url, download=False)
+            with open_ydl(no_cookie_opts) as ydl_nocookie:
+                info = timed_extract(ydl_nocookie, video_url, 'nocookie')
                 if info:
                     logging.info(f"Successfully extracted audio info WITHOUT cookies: {info.get('title', 'Unknown')}")
         except Exception as nocookie_error:
@@ -3818,16 +3542,16 @@ def download_audio(video_url, download_path, ffmpeg_path, socketio, current_down
                 extract_opts = get_robust_ydl_options(ffmpeg_path, cookies_file=cookies_file, user_agent=user_agent)
                 extract_opts['skip_download'] = True
                 extract_opts['format'] = 'bestaudio/best'
-                if browser_cookies:
-                    extract_opts['cookiesfrombrowser'] = browser_cookies
 
-                with yt_dlp.YoutubeDL(extract_opts) as ydl_extract:
-                    info = ydl_extract.extract_info(video_url, download=False)
+                with open_ydl(extract_opts) as ydl_extract:
+                    info = timed_extract(ydl_extract, video_url, 'extract')
                     if info:
                         use_cookies_for_download = True
                         logging.info(f"Successfully extracted audio info WITH cookies: {info.get('title', 'Unknown')}")
             except Exception as cookie_error:
                 logging.error(f"Audio extraction with cookies also failed: {str(cookie_error)[:100]}")
+                if cookies_file == FROM_BROWSER and is_auth_rejection(cookie_error):
+                    report_auth_failure()
         
         if not info:
             error_msg = "Could not extract video information for audio download"
@@ -3845,33 +3569,22 @@ def download_audio(video_url, download_path, ffmpeg_path, socketio, current_down
                 del ydl_opts['cookiefile']
             logging.info("Audio download will NOT use cookies (extraction succeeded without them)")
         
+        # No FFmpegExtractAudio: the raw stream is kept and the metadata pass
+        # below writes the .m4a, copying AAC and encoding only opus/vorbis.
         ydl_opts.update({
             'format': audio_format,
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'm4a',  # Use M4A (AAC) instead of WAV - much smaller and Premiere-compatible
-                'preferredquality': '192',  # High quality audio
-            }],
+            'postprocessors': [],
             'progress_hooks': [progress_hook],
             'writesubtitles': False,  # Don't download subtitles for audio
             'writeautomaticsub': False,  # Don't download auto subtitles
             'writedescription': False,  # Don't write description
             'writeinfojson': False,  # Don't write info JSON
             'writethumbnail': False,  # Don't download thumbnail
-            'postprocessor_args': get_ffmpeg_postprocessor_args() + [
-                '-metadata', f'comment={video_url}',
-                '-c:a', 'aac',  # Use AAC codec
-                '-b:a', '192k',  # 192kbps bitrate (high quality)
-                '-threads', '2'  # Reduced threads to avoid disk saturation
-            ],
         })
         
         # Add browser cookies only if we should use cookies
-        if browser_cookies and use_cookies_for_download:
-            ydl_opts['cookiesfrombrowser'] = browser_cookies
-            logging.info("Using browser cookies for audio download")
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with open_ydl(ydl_opts) as ydl:
             try:
                 # Check for cancellation before starting
                 if is_cancelled[0]:
@@ -3915,10 +3628,10 @@ def download_audio(video_url, download_path, ffmpeg_path, socketio, current_down
                         pass
 
                 # Set output template after getting info
-                ydl_opts['outtmpl'] = os.path.join(download_path, f'temp_{sanitized_title}')
+                ydl_opts['outtmpl'] = os.path.join(download_path, f'temp_{sanitized_title}.%(ext)s')
                 
                 # Create new YoutubeDL instance with updated options
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl_download:
+                with open_ydl(ydl_opts) as ydl_download:
                     if current_download:
                         current_download['ydl'] = ydl_download
                         logging.info('[DOWNLOAD] Set ydl object in current_download structure for audio download')
@@ -3957,12 +3670,12 @@ def download_audio(video_url, download_path, ffmpeg_path, socketio, current_down
                                 if 'cookiefile' in fallback_opts_nocookie:
                                     del fallback_opts_nocookie['cookiefile']
                                 fallback_opts_nocookie['format'] = 'bestaudio[ext=m4a]/bestaudio[ext=webm]/bestaudio/best'
-                                fallback_opts_nocookie['outtmpl'] = os.path.join(download_path, f'temp_{sanitized_title}')
+                                fallback_opts_nocookie['outtmpl'] = os.path.join(download_path, f'temp_{sanitized_title}.%(ext)s')
                                 fallback_opts_nocookie['postprocessors'] = ydl_opts.get('postprocessors', [])
                                 fallback_opts_nocookie['progress_hooks'] = [progress_hook]
                                 
-                                with yt_dlp.YoutubeDL(fallback_opts_nocookie) as ydl_nocookie:
-                                    fresh_info = ydl_nocookie.extract_info(video_url, download=False)
+                                with open_ydl(fallback_opts_nocookie) as ydl_nocookie:
+                                    fresh_info = timed_extract(ydl_nocookie, video_url, 'nocookie')
                                     if fresh_info:
                                         ydl_nocookie.process_ie_result(fresh_info, download=True)
                                         fallback_success = True
@@ -3985,12 +3698,12 @@ def download_audio(video_url, download_path, ffmpeg_path, socketio, current_down
                                         del fallback_opts_web['cookiefile']
                                     fallback_opts_web['format'] = 'bestaudio/best'
                                     fallback_opts_web['extractor_args'] = {'youtube': {'player_client': ['web']}}
-                                    fallback_opts_web['outtmpl'] = os.path.join(download_path, f'temp_{sanitized_title}')
+                                    fallback_opts_web['outtmpl'] = os.path.join(download_path, f'temp_{sanitized_title}.%(ext)s')
                                     fallback_opts_web['postprocessors'] = ydl_opts.get('postprocessors', [])
                                     fallback_opts_web['progress_hooks'] = [progress_hook]
                                     
-                                    with yt_dlp.YoutubeDL(fallback_opts_web) as ydl_web:
-                                        fresh_info = ydl_web.extract_info(video_url, download=False)
+                                    with open_ydl(fallback_opts_web) as ydl_web:
+                                        fresh_info = timed_extract(ydl_web, video_url, 'web')
                                         if fresh_info:
                                             ydl_web.process_ie_result(fresh_info, download=True)
                                             fallback_success = True
@@ -4014,12 +3727,12 @@ def download_audio(video_url, download_path, ffmpeg_path, socketio, current_down
                                     # iOS client with m3u8 formats
                                     fallback_opts_ios['format'] = 'bestaudio[protocol=m3u8_native]/bestaudio/best'
                                     fallback_opts_ios['extractor_args'] = {'youtube': {'player_client': ['ios']}}
-                                    fallback_opts_ios['outtmpl'] = os.path.join(download_path, f'temp_{sanitized_title}')
+                                    fallback_opts_ios['outtmpl'] = os.path.join(download_path, f'temp_{sanitized_title}.%(ext)s')
                                     fallback_opts_ios['postprocessors'] = ydl_opts.get('postprocessors', [])
                                     fallback_opts_ios['progress_hooks'] = [progress_hook]
                                     
-                                    with yt_dlp.YoutubeDL(fallback_opts_ios) as ydl_ios:
-                                        fresh_info = ydl_ios.extract_info(video_url, download=False)
+                                    with open_ydl(fallback_opts_ios) as ydl_ios:
+                                        fresh_info = timed_extract(ydl_ios, video_url, 'ios')
                                         if fresh_info:
                                             ydl_ios.process_ie_result(fresh_info, download=True)
                                             fallback_success = True
@@ -4034,13 +3747,9 @@ def download_audio(video_url, download_path, ffmpeg_path, socketio, current_down
                         else:
                             raise download_error  # Re-raise non-empty-file errors
                     
-                    # IMPORTANT: Wait for post-processing to complete
-                    # yt-dlp's process_ie_result is synchronous and should wait,
-                    # but we add a small delay to ensure FFmpeg has written everything
-                    import time
-                    time.sleep(0.5)
-                    
-                    logging.info('[AUDIO] Post-processing completed, searching for final file...')
+                    # process_ie_result is synchronous and there is no yt-dlp
+                    # post-processor anymore, so the file is complete here
+                    logging.info('[AUDIO] Download completed, searching for final file...')
                     
                     # Check for cancellation after download
                     if is_cancelled[0]:
@@ -4064,29 +3773,24 @@ def download_audio(video_url, download_path, ffmpeg_path, socketio, current_down
                 logging.info(f'[AUDIO] Files in download directory: {all_files}')
                 
                 # Look for the processed audio file (prioritize m4a)
+                audio_media = None
                 for file in all_files:
-                    if file.startswith('temp_') and sanitized_title in file:
-                        file_path = os.path.join(download_path, file)
-                        file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
-                        
-                        if file.endswith('.m4a') and file_size > 1000:  # At least 1KB
-                            downloaded_file = file_path
-                            logging.info(f'[AUDIO] Found M4A file: {file} ({file_size} bytes)')
-                            break
-                        elif file.endswith('.wav') and file_size > 1000:
-                            downloaded_file = file_path
-                            logging.info(f'[AUDIO] Found WAV file: {file} ({file_size} bytes)')
+                    if file.startswith('temp_') and sanitized_title in file and \
+                            file.endswith(('.m4a', '.webm', '.opus', '.ogg', '.wav')):
+                        media = media_probe.probe(os.path.join(download_path, file), ffmpeg_path)
+                        if media.has_audio:
+                            downloaded_file, audio_media = media.path, media
+                            logging.info(f'[AUDIO] Found audio file: {file} ({media.size} bytes, {media.audio_codec})')
                             break
 
                 if not downloaded_file:
-                    # Last resort: find ANY temp file with the title that has reasonable size
+                    # Last resort: find ANY temp file with the title that has an audio stream
                     for file in all_files:
-                        if 'temp_' in file and sanitized_title in file:
-                            file_path = os.path.join(download_path, file)
-                            file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
-                            if file_size > 1000:  # At least 1KB
-                                downloaded_file = file_path
-                                logging.warning(f'[AUDIO] Found fallback file: {file} ({file_size} bytes)')
+                        if 'temp_' in file and sanitized_title in file and not file.endswith(('.part', '.ytdl')):
+                            media = media_probe.probe(os.path.join(download_path, file), ffmpeg_path)
+                            if media.has_audio:
+                                downloaded_file, audio_media = media.path, media
+                                logging.warning(f'[AUDIO] Found fallback file: {file} ({media.size} bytes)')
                                 break
                 
                 if not downloaded_file:
@@ -4098,23 +3802,31 @@ def download_audio(video_url, download_path, ffmpeg_path, socketio, current_down
                 final_size = os.path.getsize(downloaded_file)
                 logging.info(f'[AUDIO] Using downloaded file: {os.path.basename(downloaded_file)} ({final_size} bytes)')
 
-                # Add metadata using ffmpeg (copy codec to avoid reencoding)
+                # Write the .m4a with metadata: AAC sources are copied (no reencoding),
+                # opus/vorbis sources are encoded to AAC
+                audio_codec = normalize_audio_codec(audio_media.audio_codec)
                 temp_output = output_path + "_with_metadata.m4a"
                 metadata_cmd = [
                     ffmpeg_path,
                     '-i', downloaded_file,
                     '-metadata', f'comment={video_url}',
-                    '-c', 'copy',  # Copy without reencoding - much faster!
-                ] + get_ffmpeg_postprocessor_args() + [
+                    '-map', '0:a:0',
+                ] + audio_codec_args(audio_codec) + get_ffmpeg_postprocessor_args() + [
                     temp_output
                 ]
 
-                logging.info('[AUDIO-METADATA] Adding metadata - fast copy mode (no reencoding)')
-                socketio.emit('percentage', {'percentage': '100% - Ajout métadonnées audio...'})
+                if needs_transcode(audio_codec):
+                    logging.info(f'[AUDIO-METADATA] Adding metadata - encoding {audio_codec or "unknown"} audio to AAC')
+                    socketio.emit('percentage', {'percentage': '100% - Conversion audio...'})
+                else:
+                    logging.info('[AUDIO-METADATA] Adding metadata - fast copy mode (no reencoding)')
+                    socketio.emit('percentage', {'percentage': '100% - Ajout métadonnées audio...'})
                 
                 try:
-                    # Use 2 minute timeout for audio metadata (should be quick)
-                    run_hidden_subprocess(metadata_cmd, timeout=120, check=True)
+                    # 2 minute timeout for a copy (should be quick), longer for an encode
+                    with job_metrics.span('metadata'), encoder_slot(audio_codec):
+                        run_hidden_subprocess(metadata_cmd, timeout=600 if needs_transcode(audio_codec) else 120,
+                                              priority=PRIORITY_AUDIO, is_cancelled=is_cancelled, check=True)
                     logging.info('[AUDIO-METADATA] Metadata added successfully')
 
                     # Clean up and rename
@@ -4134,17 +3846,20 @@ def download_audio(video_url, download_path, ffmpeg_path, socketio, current_down
                         except OSError:
                             pass
 
-                except subprocess.TimeoutExpired as e:
-                    logging.error(f'[AUDIO-METADATA] FFmpeg timeout after {e.timeout}s')
-                    # Use original file without metadata
-                    try:
-                        os.rename(downloaded_file, output_path)
-                    except OSError:
-                        import shutil
-                        shutil.copy2(downloaded_file, output_path)
-                except subprocess.CalledProcessError as e:
-                    logging.error(f'[AUDIO-METADATA] FFmpeg error: {e}')
-                    # Use original file without metadata
+                except (subprocess.TimeoutExpired, subprocess.CalledProcessError) as e:
+                    if isinstance(e, subprocess.TimeoutExpired):
+                        logging.error(f'[AUDIO-METADATA] FFmpeg timeout after {e.timeout}s')
+                    else:
+                        logging.error(f'[AUDIO-METADATA] FFmpeg error: {e}')
+                    if os.path.exists(temp_output):
+                        try:
+                            os.remove(temp_output)
+                        except OSError:
+                            pass
+                    if needs_transcode(audio_codec):
+                        # The source is opus/vorbis: renaming it to .m4a would hand Premiere a file it can't read
+                        raise Exception(f"Audio conversion to AAC failed ({audio_codec or 'unknown'} source): {e}")
+                    # AAC source: use the original file without metadata
                     try:
                         os.rename(downloaded_file, output_path)
                     except OSError:
@@ -4163,7 +3878,7 @@ def download_audio(video_url, download_path, ffmpeg_path, socketio, current_down
 
                 # Emit both completion events before returning
                 if socketio:
-                    socketio.emit('import_video', {'path': output_path, 'bin': settings.get('premiereBin', '')})
+                    queue_import(output_path, settings.get('premiereBin', ''))
                     # Emit both formats to ensure compatibility
                     socketio.emit('download-complete', {'url': video_url, 'path': output_path})  # Hyphenated format for Chrome extension
                     logging.info("Import signal sent to Premiere Pro extension via SocketIO")
@@ -4192,13 +3907,6 @@ def download_audio(video_url, download_path, ffmpeg_path, socketio, current_down
                     current_download['ydl'] = None
                     current_download['cancel_callback'] = None
                 
-                # Clean up the cookies file after download (Windows only)
-                if sys.platform == 'win32' and cookies_file and os.path.exists(cookies_file):
-                    try:
-                        os.remove(cookies_file)
-                        logging.info(f"[Windows] Cleaned up temporary cookies file: {cookies_file}")
-                    except Exception as e:
-                        logging.debug(f"Could not remove cookies file: {e}")
 
     except Exception as e:
         logging.error(f"Error in download_audio: {str(e)}")
@@ -4254,7 +3962,7 @@ def get_audio_language_options(video_url):
     Returns a list of available languages.
     """
     try:
-        with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
+        with open_ydl({'quiet': True, 'cachedir': ytdlp_cache.get_cache_dir()}) as ydl:
             info = ydl.extract_info(video_url, download=False)
             if not info:
                 return []
@@ -4291,6 +3999,7 @@ def cleanup_partial_video_files(output_path):
             f"{base_name}.part",        # Partial download files
             f"{base_name}.ytdl",        # yt-dlp temporary files
             f"{base_name}*.part",       # More partial patterns
+            os.path.join(base_dir, f".{os.path.basename(base_name)}.*.segmented"),  # Segmented downloader streams
             output_path,                # Final output file if it exists
         ]
         
@@ -4392,6 +4101,51 @@ def _setup_nodejs_fallback(base_options, cookies_file=None):
         logging.info("[NODE-FALLBACK] Using android client (format 18 = 360p combined mp4)")
 
 
+def probe_js_runtime(force=False):
+    """Find Deno and check that it actually runs. Cached for the process lifetime.
+
+    Returns a dict with 'deno_path' (or None) and 'deno_working'.
+    """
+    global _js_runtime_cache
+    with _js_runtime_lock:
+        if _js_runtime_cache is not None and not force:
+            return _js_runtime_cache
+
+        import shutil
+        runtime = {'deno_path': shutil.which('deno'), 'deno_working': False}
+        deno_path = runtime['deno_path']
+        if deno_path:
+            logging.info(f"[OK] Deno runtime found at: {deno_path}")
+            
+            # Actually TEST if Deno works (not just exists)
+            try:
+                result = subprocess.run(
+                    [deno_path, '--version'],
+                    capture_output=True,
+                    text=True,
+                    timeout=10,
+                    creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
+                )
+                if result.returncode == 0:
+                    deno_version = result.stdout.strip().split('\n')[0] if result.stdout else 'unknown'
+                    logging.info(f"[OK] Deno is working: {deno_version}")
+                    logging.info("[OK] External JavaScript runtime enabled (EJS challenge solver ready)")
+                    runtime['deno_working'] = True
+                else:
+                    logging.warning(f"[WARNING] Deno found but failed to execute: exit code {result.returncode}")
+                    logging.warning(f"  stderr: {result.stderr[:200] if result.stderr else 'none'}")
+            except subprocess.TimeoutExpired:
+                logging.warning("[WARNING] Deno found but timed out when testing")
+            except Exception as deno_test_error:
+                logging.warning(f"[WARNING] Deno found but failed to test: {deno_test_error}")
+        else:
+            logging.warning("[WARNING] Deno runtime not found in PATH.")
+            logging.warning("  Install Deno with: .\\scripts\\install-deno.ps1")
+            logging.warning("  Then restart the application or run: .\\scripts\\add-deno-to-path.ps1")
+
+        _js_runtime_cache = runtime
+        return runtime
+
 def get_robust_ydl_options(ffmpeg_path, cookies_file=None, user_agent=None):
     """Get robust yt-dlp options to handle YouTube changes and SABR streaming"""
     import sys
@@ -4399,6 +4153,10 @@ def get_robust_ydl_options(ffmpeg_path, cookies_file=None, user_agent=None):
     
     # Configure stdout/stderr redirection for Windows to prevent BrokenPipeError
     redirect_output = sys.platform == 'win32'
+
+    # Browser cookies are extracted (or loaded from cache) only at this point
+    if is_cookie_source(cookies_file) and get_jar(cookies_file) is None:
+        cookies_file = None
     
     base_options = {
         'quiet': redirect_output,  # Suppress stdout/stderr on Windows to prevent BrokenPipeError
@@ -4412,6 +4170,7 @@ def get_robust_ydl_options(ffmpeg_path, cookies_file=None, user_agent=None):
         'socket_timeout': 60,  # Increase socket timeout
         'fragment_retries': 10,  # Retry fragment downloads
         'concurrent_fragment_downloads': 2,  # Download 2 DASH/HLS segments in parallel (4 can trigger YouTube throttling)
+        'cachedir': ytdlp_cache.get_cache_dir(),  # Player JS / solved signatures survive restarts
         'file_access_retries': 15,  # Retry file access operations (Windows Defender needs time)
         'retry_sleep_functions': {'file_access': lambda n: 2.0},  # 2s between rename retries (Windows file lock)
         'ignoreerrors': False,  # Don't ignore errors during extraction
@@ -4438,7 +4197,7 @@ def get_robust_ydl_options(ffmpeg_path, cookies_file=None, user_agent=None):
         
         # FFmpeg configuration - handle both absolute paths and PATH resolution
         'ffmpeg_location': get_ffmpeg_location_for_ydl(ffmpeg_path),
-        'postprocessor_args': get_ffmpeg_postprocessor_args() + ['-threads', '4'],
+        'postprocessor_args': get_ffmpeg_postprocessor_args() + ['-threads', str(ffmpeg_executor.thread_budget())],
         'external_downloader_args': ['-timeout', '120'],  # Increase timeout
     }
     
@@ -4451,8 +4210,9 @@ def get_robust_ydl_options(ffmpeg_path, cookies_file=None, user_agent=None):
     
     # Add authentication if available
     if cookies_file:
+        # A cookie source key: open_ydl() injects the shared in-memory jar
         base_options['cookiefile'] = cookies_file
-        logging.info(f"Using cookies file: {cookies_file}")
+        logging.info(f"Using cookies: {cookies_file.split(':')[0]}")
     
     # Add comprehensive browser headers to avoid 403 errors
     http_headers = {}
@@ -4478,38 +4238,10 @@ def get_robust_ydl_options(ffmpeg_path, cookies_file=None, user_agent=None):
     # Deno is enabled by default in yt-dlp, so we just verify it's available AND working
     # IMPORTANT: Do NOT specify player_client in extractor_args - it severely limits format availability!
     # yt-dlp's default logic works best with Deno/EJS
-    deno_working = False
     try:
-        # Check if Deno is available in PATH
-        import shutil
-        import subprocess
-        deno_path = shutil.which('deno')
-        if deno_path:
-            logging.info(f"[OK] Deno runtime found at: {deno_path}")
-            
-            # Actually TEST if Deno works (not just exists)
-            try:
-                result = subprocess.run(
-                    [deno_path, '--version'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                    creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
-                )
-                if result.returncode == 0:
-                    deno_version = result.stdout.strip().split('\n')[0] if result.stdout else 'unknown'
-                    logging.info(f"[OK] Deno is working: {deno_version}")
-                    deno_working = True
-                else:
-                    logging.warning(f"[WARNING] Deno found but failed to execute: exit code {result.returncode}")
-                    logging.warning(f"  stderr: {result.stderr[:200] if result.stderr else 'none'}")
-            except subprocess.TimeoutExpired:
-                logging.warning("[WARNING] Deno found but timed out when testing")
-            except Exception as deno_test_error:
-                logging.warning(f"[WARNING] Deno found but failed to test: {deno_test_error}")
-            
-            if deno_working:
-                logging.info("[OK] External JavaScript runtime enabled (EJS challenge solver ready)")
+        runtime = probe_js_runtime()
+        if runtime['deno_path']:
+            if runtime['deno_working']:
                 # web_safari (default client since yt-dlp 2026.01.29) is now SABR-only - it no longer
                 # provides HTTPS adaptive formats (video OR audio). This causes silent download failures
                 # because bestaudio[ext=m4a] (format 140) becomes unavailable.
@@ -4522,8 +4254,6 @@ def get_robust_ydl_options(ffmpeg_path, cookies_file=None, user_agent=None):
                 _setup_nodejs_fallback(base_options, cookies_file)
         else:
             logging.warning("[WARNING] Deno runtime not found in PATH. Trying Node.js as JS runtime fallback.")
-            logging.warning("  Install Deno with: .\\scripts\\install-deno.ps1")
-            logging.warning("  Then restart the application or run: .\\scripts\\add-deno-to-path.ps1")
             _setup_nodejs_fallback(base_options, cookies_file)
     except Exception as e:
         logging.warning(f"Error checking for Deno runtime: {e}")
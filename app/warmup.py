@@ -0,0 +1,85 @@
+"""
+Background warm-up of the download engine.
+
+Runs right after the server port is bound so the first download does not pay
+the cold costs (settings load, FFmpeg check, yt-dlp extractor import, JS
+runtime probe, license validation). Readiness of each component is reported
+on /health, and download requests wait on a component that is still warming
+instead of starting the same cold work a second time.
+"""
+import time
+import logging
+import threading
+from config import WARMUP_WAIT_TIMEOUT
+
+COMPONENTS = ('settings', 'ytdlp_cache', 'ffmpeg', 'yt_dlp', 'js_runtime', 'license')
+
+_status = {name: {'status': 'pending'} for name in COMPONENTS}
+_ready_events = {name: threading.Event() for name in COMPONENTS}
+_status_lock = threading.Lock()
+_started = False
+
+
+def run_component(name, warm_fn):
+    """Run one warm-up step, recording its status and duration"""
+    with _status_lock:
+        _status[name] = {'status': 'warming'}
+    start = time.time()
+    try:
+        detail = warm_fn()
+        entry = {'status': 'ready'}
+        if detail:
+            entry['detail'] = detail
+    except Exception as e:
+        logging.warning(f"[WARMUP] {name} failed: {e}")
+        entry = {'status': 'failed', 'error': str(e)}
+    entry['elapsed_ms'] = round((time.time() - start) * 1000)
+    with _status_lock:
+        _status[name] = entry
+    _ready_events[name].set()
+    logging.info(f"[WARMUP] {name}: {entry['status']} in {entry['elapsed_ms']} ms")
+
+
+def start_warmup(steps):
+    """Run warm-up steps in background threads.
+
+    Args:
+        steps: list of (component, warm_fn, depends_on) tuples. A step starts
+               once the components it depends on are done (ready or failed).
+
+    Returns the list of started threads.
+    """
+    global _started
+    _started = True
+
+    def run_after(name, warm_fn, depends_on):
+        for dependency in depends_on:
+            _ready_events[dependency].wait()
+        run_component(name, warm_fn)
+
+    threads = []
+    for name, warm_fn, depends_on in steps:
+        thread = threading.Thread(target=run_after, args=(name, warm_fn, depends_on), daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+
+def wait_until_ready(*names, timeout=WARMUP_WAIT_TIMEOUT):
+    """Wait for components that are still warming. Returns immediately if warm-up never started."""
+    if not _started:
+        return True
+    deadline = time.time() + timeout
+    for name in names:
+        if not _ready_events[name].wait(max(0, deadline - time.time())):
+            logging.warning(f"[WARMUP] Timed out waiting for {name}, continuing cold")
+            return False
+    return True
+
+
+def get_status():
+    """Per-component readiness, for /health"""
+    with _status_lock:
+        components = {name: dict(entry) for name, entry in _status.items()}
+    ready = all(entry['status'] in ('ready', 'failed') for entry in components.values())
+    return {'ready': ready, 'components': components}
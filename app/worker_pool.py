@@ -0,0 +1,268 @@
+"""
+Optional process pool for downloads ('processWorkers' setting).
+
+By default downloads run as threads of the server process, where yt-dlp's
+extraction and format processing compete under the GIL with Socket.IO, and a
+wedged job can only be abandoned. With the setting on, each job runs in one of
+DOWNLOAD_WORKER_PROCESSES worker processes instead. A job is sent as a plain
+spec (the handle_video_url arguments). Worker output comes back over a queue:
+Socket.IO emits, Premiere imports, log records, timing spans and the result.
+The server re-emits it, so clients see no difference.
+
+Bandwidth stays scheduled by the server (bandwidth.py): run() registers the
+job there, so priority changes and the weighted shares cover every worker.
+Each worker reports the bytes it received and applies the rate the server
+computes for its job, through two shared values.
+
+Cancelling sets the worker's cancel event, which runs the job's own cancel
+callback. A worker that has not finished WORKER_CANCEL_GRACE seconds later,
+or has sent nothing for WORKER_STALL_TIMEOUT seconds, is killed with its
+FFmpeg children and replaced. The server does not need a restart.
+
+Workers are started with 'spawn', so they also work in the frozen
+executable (see multiprocessing.freeze_support in YoutubetoPremiere.py).
+"""
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+import bandwidth
+import job_metrics
+from config import DOWNLOAD_WORKER_PROCESSES, WORKER_CANCEL_GRACE, WORKER_STALL_TIMEOUT
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+_context = multiprocessing.get_context('spawn')
+_lock = threading.Condition()
+_idle = []
+_started = 0
+_sequence = 0
+
+
+def is_enabled(settings):
+    return bool(settings and settings.get('processWorkers'))
+
+
+# ---- worker process side ---------------------------------------------------
+
+class _SocketIOProxy:
+    """Stands in for the server's socketio object inside a worker"""
+
+    def __init__(self, events):
+        self._events = events
+
+    def emit(self, event, data=None, **kwargs):
+        self._events.put(('emit', event, data, None))
+
+
+class _EventLogHandler(logging.Handler):
+    """Forward worker log records to the server's log"""
+
+    def __init__(self, events):
+        super().__init__()
+        self._events = events
+
+    def emit(self, record):
+        try:
+            message = record.getMessage()
+            if record.exc_info:
+                message += '\n' + logging.Formatter().formatException(record.exc_info)
+            self._events.put(('log', record.name, record.levelno, message))
+        except Exception:
+            self.handleError(record)
+
+
+def _watch_cancel(cancel_event, current_download, finished):
+    while not finished.is_set():
+        if cancel_event.wait(0.5):
+            callback = current_download.get('cancel_callback')
+            if callback:
+                callback()
+            return
+
+
+def _worker_main(tasks, events, cancel_event, rate, received):
+    logging.basicConfig(level=logging.INFO, handlers=[_EventLogHandler(events)], force=True)
+    bandwidth.set_external(rate, received)
+    import video_processing
+    import import_batcher
+    video_processing.set_emit_function(lambda event, data, client_type=None:
+                                       events.put(('emit', event, data, client_type)))
+    import_batcher.set_forward_function(lambda path, bin_path: events.put(('import', path, bin_path)))
+    job_metrics.set_forward_function(lambda *span: events.put(('span',) + span))
+    socketio = _SocketIOProxy(events)
+
+    while True:
+        spec = tasks.get()
+        if spec is None:
+            return
+        current_download = {'process': None, 'ydl': None, 'cancel_callback': None}
+        finished = threading.Event()
+        threading.Thread(target=_watch_cancel, args=(cancel_event, current_download, finished),
+                         daemon=True).start()
+        try:
+            result = video_processing.handle_video_url(current_download=current_download,
+                                                       socketio=socketio, **spec)
+        except Exception as e:
+            logging.error(f"[WORKER] Job failed: {e}", exc_info=True)
+            result = {'error': str(e)}
+        finished.set()
+        events.put(('result', result))
+
+
+# ---- server side ------------------------------------------------------------
+
+class _Worker:
+    def __init__(self, number):
+        self.name = f"worker-{number}"
+        self.tasks = _context.Queue()
+        self.events = _context.Queue()
+        self.cancel_event = _context.Event()
+        self.cancel_requested = None
+        self.rate = _context.Value('d', 0.0)      # bytes/s the server allows the job, 0 = unlimited
+        self.received = _context.Value('q', 0)    # bytes received since the server last read it
+        self.process = _context.Process(target=_worker_main, name=self.name,
+                                        args=(self.tasks, self.events, self.cancel_event, self.rate, self.received),
+                                        daemon=True)
+        self.process.start()
+        logging.info(f"[WORKER] Started {self.name} (PID {self.process.pid})")
+
+    def kill(self, reason):
+        logging.warning(f"[WORKER] Killing {self.name} (PID {self.process.pid}): {reason}")
+        if PSUTIL_AVAILABLE:
+            try:
+                for child in psutil.Process(self.process.pid).children(recursive=True):
+                    child.kill()
+            except psutil.Error:
+                pass
+        self.process.kill()
+        self.process.join(5)
+
+
+def _acquire():
+    """Take an idle worker, starting one if the pool is not full yet"""
+    global _started, _sequence
+    with _lock:
+        while True:
+            while _idle:
+                worker = _idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                _started -= 1
+            if _started < DOWNLOAD_WORKER_PROCESSES:
+                _started += 1
+                _sequence += 1
+                number = _sequence
+                break
+            _lock.wait()
+    try:
+        return _Worker(number)
+    except Exception:
+        with _lock:
+            _started -= 1
+            _lock.notify()
+        raise
+
+
+def _release(worker, alive):
+    global _started
+    with _lock:
+        if alive:
+            _idle.append(worker)
+        else:
+            _started -= 1
+        _lock.notify()
+
+
+def _dispatch(worker, event, emit_fn, socketio, job_id):
+    kind = event[0]
+    if kind == 'emit':
+        _, name, data, client_type = event
+        if client_type and emit_fn:
+            emit_fn(name, data, client_type)
+        else:
+            socketio.emit(name, data)
+    elif kind == 'import':
+        import import_batcher
+        import_batcher.queue_import(event[1], event[2])
+    elif kind == 'span':
+        _, phase, start, seconds, status, fields = event
+        job_metrics.record(phase, seconds, job_id=job_id, status=status, start=start, **fields)
+    elif kind == 'log':
+        _, logger_name, level, message = event
+        logging.getLogger(logger_name).log(level, f"[{worker.name}] {message}")
+
+
+def _sync_bandwidth(worker, bandwidth_job):
+    """Hand the worker's received bytes to the server's scheduler, and its new rate to the worker"""
+    with worker.received.get_lock():
+        received, worker.received.value = worker.received.value, 0
+    if received:
+        bandwidth.add_bytes(bandwidth_job, received)
+    worker.rate.value = bandwidth.get_rate(bandwidth_job) or 0.0
+
+
+def run(spec, current_download, socketio, emit_fn=None):
+    """Run a download job (handle_video_url keyword arguments) in a worker process.
+
+    Blocks until the job finishes and returns its result dict. The job can be
+    cancelled through current_download['cancel_callback'] like a threaded job.
+    """
+    job_id = job_metrics.current_job()
+    settings = spec.get('settings') or {}
+    bandwidth_job = bandwidth.start_job(settings.get('downloadPriority') or spec.get('download_type'),
+                                        spec.get('video_url'), settings)
+    try:
+        worker = _acquire()
+    except Exception:
+        bandwidth.end_job(bandwidth_job)
+        raise
+    alive = True
+    with worker.received.get_lock():
+        worker.received.value = 0
+    _sync_bandwidth(worker, bandwidth_job)
+    worker.cancel_event.clear()
+    worker.cancel_requested = None
+
+    def cancel():
+        worker.cancel_requested = time.time()
+        worker.cancel_event.set()
+
+    current_download['cancel_callback'] = cancel
+    worker.tasks.put(spec)
+    last_event = time.time()
+    try:
+        while True:
+            try:
+                event = worker.events.get(timeout=1)
+            except queue.Empty:
+                event = None
+            now = time.time()
+            _sync_bandwidth(worker, bandwidth_job)
+            if event is not None:
+                last_event = now
+                if event[0] == 'result':
+                    return event[1]
+                _dispatch(worker, event, emit_fn, socketio, job_id)
+            elif not worker.process.is_alive():
+                alive = False
+                logging.error(f"[WORKER] {worker.name} exited unexpectedly (code {worker.process.exitcode})")
+                return {'error': 'Download worker stopped unexpectedly'}
+            if worker.cancel_requested and now - worker.cancel_requested > WORKER_CANCEL_GRACE:
+                alive = False
+                worker.kill('job did not stop after cancellation')
+                return {'error': 'Download cancelled by user'}
+            if now - last_event > WORKER_STALL_TIMEOUT:
+                alive = False
+                worker.kill(f'no activity for {WORKER_STALL_TIMEOUT}s')
+                return {'error': 'Download stalled and was stopped'}
+    finally:
+        current_download['cancel_callback'] = None
+        bandwidth.end_job(bandwidth_job)
+        _release(worker, alive)
+
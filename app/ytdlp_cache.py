@@ -0,0 +1,102 @@
+"""
+Persistent yt-dlp cache directory.
+
+yt-dlp caches YouTube player JS, solved signature/n-challenge functions and
+similar artifacts in its cachedir. Left to its default, that location is
+often missing or unwritable in the packaged app, so every restart fetched
+and solved them again. The app owns a cache directory next to the settings
+folder instead, capped at YTDLP_CACHE_MAX_MB by removing the least recently
+used files.
+"""
+import os
+import time
+import logging
+import threading
+import settings_store
+from config import YTDLP_CACHE_MAX_MB, YTDLP_CACHE_PRUNE_INTERVAL
+
+_lock = threading.Lock()
+_cache_dir = None
+_last_prune = 0
+_stats = {}
+
+
+def _ensure_cache_dir():
+    """The cachedir, created on first use (call with _lock held)"""
+    global _cache_dir
+    if _cache_dir is None:
+        _cache_dir = os.path.join(settings_store.get_settings_dir(), 'ytdlp_cache')
+        os.makedirs(_cache_dir, exist_ok=True)
+    return _cache_dir
+
+
+def get_cache_dir():
+    """Return the yt-dlp cachedir (created on first use), pruning it now and then"""
+    global _last_prune
+    with _lock:
+        cache_dir = _ensure_cache_dir()
+        # Claimed under the lock so concurrent first calls start a single prune
+        prune_due = time.time() - _last_prune > YTDLP_CACHE_PRUNE_INTERVAL
+        if prune_due:
+            _last_prune = time.time()
+    if prune_due:
+        threading.Thread(target=prune, daemon=True).start()
+    return cache_dir
+
+
+def _cache_files(cache_dir):
+    """(last use, size, path) of every cached file"""
+    files = []
+    for root, _dirs, names in os.walk(cache_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            # Access times are often disabled (Windows, noatime), so also use mtime
+            files.append((max(st.st_atime, st.st_mtime), st.st_size, path))
+    return files
+
+
+def prune(max_mb=YTDLP_CACHE_MAX_MB):
+    """Remove least recently used files until the cache fits in max_mb. Returns the stats."""
+    global _last_prune, _stats
+    with _lock:
+        _last_prune = time.time()
+        cache_dir = _ensure_cache_dir()
+        files = _cache_files(cache_dir)
+        total = sum(size for _, size, _ in files)
+        limit = max_mb * 1024 * 1024
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        # Drop sections emptied by pruning
+        for root, dirs, names in os.walk(cache_dir, topdown=False):
+            if root != cache_dir and not dirs and not names:
+                try:
+                    os.rmdir(root)
+                except OSError:
+                    pass
+        _stats = {
+            'path': cache_dir,
+            'files': len(files) - removed,
+            'size_mb': round(total / 1024 / 1024, 1),
+            'max_mb': max_mb,
+            'pruned_files': removed,
+        }
+    if removed:
+        logging.info(f"[YTDLP-CACHE] Pruned {removed} least recently used file(s), {_stats['size_mb']} MB left")
+    return dict(_stats)
+
+
+def get_status():
+    """Cache location and size as of the last prune, for /health"""
+    return dict(_stats) if _stats else {'path': _cache_dir}
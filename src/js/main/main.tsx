@@ -244,7 +244,7 @@ const Main = () => {
     // interfere with emit_to_client_type('premiere') calls. The actual import
     // socket that receives import_video events is in videoImport.js.
     const socket = io(`http://${serverIP}:17845`, {
-      transports: ['polling', 'websocket'],
+      transports: ['websocket', 'polling'],
       reconnectionAttempts: 5,
       reconnectionDelay: 1000,
       reconnectionDelayMax: 5000,
@@ -97,14 +97,14 @@ export async function setupVideoImportHandler(csInterface) {
         }
 
         socket = io(`http://${serverIP}:17845`, {
-            transports: ['polling'], // Force polling only to avoid WebSocket instability
+            transports: ['websocket', 'polling'], // WebSocket first: the event-loop server holds no thread per socket
             reconnection: true,
             reconnectionAttempts: 10, // More attempts
             reconnectionDelay: 2000, // Longer delays
             reconnectionDelayMax: 10000,
             timeout: 30000, // Longer timeout
             forceNew: true,
-            upgrade: false, // Disable upgrade to WebSocket
+            upgrade: true,
             rememberUpgrade: false,
             autoConnect: true,
             query: { client_type: 'premiere' }
@@ -379,6 +379,58 @@ export async function setupVideoImportHandler(csInterface) {
             }
         });
 
+        // Batched imports: one importFiles() call per bin, one ordered result per path
+        socket.on('import_videos', async (data) => {
+            console.log('📥 Received import_videos batch from Python server:', JSON.stringify(data, null, 2));
+            const paths = (data && data.paths) || [];
+            if (paths.length === 0) {
+                console.error('❌ Empty import batch');
+                return;
+            }
+
+            let results;
+            try {
+                // Wait a bit to ensure the files are fully written
+                await new Promise(resolve => setTimeout(resolve, 1000));
+
+                const effectiveBin = data.bin || JSON.parse(localStorage.getItem('settings') || '{}').premiereBin || '';
+                console.log(`Importing batch ${data.batch_id} (${paths.length} files) into bin "${effectiveBin || '(root)'}"`);
+
+                let result = await evalTS('importVideosToSource', paths, effectiveBin);
+                if (typeof result === 'string') {
+                    result = JSON.parse(result);
+                }
+
+                if (result && Array.isArray(result.results)) {
+                    results = result.results;
+                } else if (result === undefined && navigator.platform.indexOf('Mac') > -1) {
+                    // Same CEP bridge timing issue as single imports
+                    results = paths.map(path => ({
+                        success: true,
+                        path,
+                        note: 'Success assumed on Mac due to response timing'
+                    }));
+                } else {
+                    results = paths.map(path => ({
+                        success: false,
+                        path,
+                        error: 'Invalid response format from Premiere'
+                    }));
+                }
+            } catch (error) {
+                console.error('Error during batch import:', error);
+                results = paths.map(path => ({
+                    success: false,
+                    path,
+                    error: error.message || String(error)
+                }));
+            }
+
+            if (socket && socket.connected) {
+                socket.emit('import_batch_complete', { batch_id: data.batch_id, results });
+            }
+        });
+
         socket.on('download_complete', async (data) => {
             console.log('Download complete:', data);
             if (!data) return;
@@ -69,6 +69,40 @@ const getAllNodeIds = (container: any) => {
   return ids;
 };
 
+// Resolve (and create if needed) a nested bin path like "Youtube/CLIP" under rootItem
+const getTargetBin = (rootItem: any, binPath: string) => {
+  if (!binPath || !binPath.trim()) {
+    return rootItem;
+  }
+  var parts = binPath.split('/');
+  var currentBin = rootItem;
+  for (var p = 0; p < parts.length; p++) {
+    var part = parts[p].trim();
+    if (!part) continue;
+    var foundBin = null;
+    for (var c = 0; c < currentBin.children.numItems; c++) {
+      var child = currentBin.children[c];
+      //@ts-ignore - ExtendScript globals
+      if (child.type === ProjectItemType.BIN && child.name === part) {
+        foundBin = child;
+        break;
+      }
+    }
+    if (foundBin) {
+      currentBin = foundBin;
+    } else {
+      try {
+        //@ts-ignore - ExtendScript globals
+        currentBin = currentBin.createBin(part);
+      } catch(binErr) {
+        // Could not create bin — fall back to current level
+        break;
+      }
+    }
+  }
+  return currentBin;
+};
+
 // Main function to import a file and open it in the Source Monitor
 export const importVideoToSource = (videoPath: string, binPath: string = '') => {
   try {
@@ -113,36 +147,7 @@ export const importVideoToSource = (videoPath: string, binPath: string = '') =>
     var rootItem = project.rootItem;
 
     // Resolve target bin — supports nested paths like "Youtube/CLIP"
-    var targetBin = rootItem;
-    if (binPath && binPath.trim()) {
-      var parts = binPath.split('/');
-      var currentBin = rootItem;
-      for (var p = 0; p < parts.length; p++) {
-        var part = parts[p].trim();
-        if (!part) continue;
-        var foundBin = null;
-        for (var c = 0; c < currentBin.children.numItems; c++) {
-          var child = currentBin.children[c];
-          //@ts-ignore - ExtendScript globals
-          if (child.type === ProjectItemType.BIN && child.name === part) {
-            foundBin = child;
-            break;
-          }
-        }
-        if (foundBin) {
-          currentBin = foundBin;
-        } else {
-          try {
-            //@ts-ignore - ExtendScript globals
-            currentBin = currentBin.createBin(part);
-          } catch(binErr) {
-            // Could not create bin — fall back to current level
-            break;
-          }
-        }
-      }
-      targetBin = currentBin;
-    }
+    var targetBin = getTargetBin(rootItem, binPath);
 
     // Use the getAllNodeIds function from $._ext if available, otherwise fallback to local function
     //@ts-ignore - ExtendScript globals
@@ -261,3 +266,117 @@ export const importVideoToSource = (videoPath: string, binPath: string = '') =>
     };
   }
 };
+
+// Import several files into the same bin with a single importFiles() call.
+// Returns one result per input path, in the same order as videoPaths. Only the
+// last imported item is opened in the Source Monitor.
+export const importVideosToSource = (videoPaths: string[], binPath: string = '') => {
+  var results = [];
+  try {
+    //@ts-ignore - ExtendScript globals
+    if (typeof app === 'undefined' || !app.project) {
+      for (var n = 0; n < videoPaths.length; n++) {
+        results.push({ success: false, error: "No active Premiere Pro project", path: videoPaths[n] });
+      }
+      return { success: false, results: results };
+    }
+
+    //@ts-ignore - ExtendScript globals
+    var pathNormalizer = (typeof $._ext !== 'undefined' && $._ext.normalizePath) ? $._ext.normalizePath : normalizePath;
+    //@ts-ignore - ExtendScript globals
+    var existsChecker = (typeof $._ext !== 'undefined' && $._ext.fileExists) ? $._ext.fileExists : fileExists;
+
+    // Keep only the files that exist; missing ones get a failure result in place
+    var toImport = [];
+    for (var i = 0; i < videoPaths.length; i++) {
+      var normalizedPath = pathNormalizer(videoPaths[i]);
+      if (existsChecker(normalizedPath)) {
+        toImport.push(normalizedPath);
+        results.push({ success: true, path: normalizedPath, projectItem: null });
+      } else {
+        results.push({ success: false, error: "Video file not found at path: " + normalizedPath, path: videoPaths[i] });
+      }
+    }
+
+    if (toImport.length === 0) {
+      return { success: false, results: results };
+    }
+
+    //@ts-ignore - ExtendScript globals
+    var project = app.project;
+    var targetBin = getTargetBin(project.rootItem, binPath);
+
+    // Items already in the bin, so that an older item with the same media path
+    // is not reported as the new import
+    var existingIds = {};
+    for (var b = 0; b < targetBin.children.numItems; b++) {
+      existingIds[targetBin.children[b].nodeId] = true;
+    }
+
+    var imported = project.importFiles(toImport,
+      false,             // suppressUI
+      targetBin,         // parentBin — root or named bin
+      false              // importAsNumberedStills
+    );
+
+    if (!imported) {
+      for (var f = 0; f < results.length; f++) {
+        if (results[f].success) {
+          results[f] = { success: false, error: "Import returned null or empty array", path: results[f].path };
+        }
+      }
+      return { success: false, results: results };
+    }
+
+    // Map the items the import added back to their source paths
+    var lastItem = null;
+    for (var k = 0; k < targetBin.children.numItems; k++) {
+      var item = targetBin.children[k];
+      //@ts-ignore - ExtendScript globals
+      if (item.type === ProjectItemType.BIN || existingIds[item.nodeId]) continue;
+      var mediaPath = '';
+      try {
+        mediaPath = pathNormalizer(item.getMediaPath());
+      } catch (e) {
+        continue;
+      }
+      for (var r = 0; r < results.length; r++) {
+        if (results[r].success && results[r].path === mediaPath && !results[r].projectItem) {
+          results[r].projectItem = item.nodeId;
+          lastItem = item;
+          break;
+        }
+      }
+    }
+
+    // Files importFiles() skipped without an error produced no new item
+    var importedCount = 0;
+    for (var q = 0; q < results.length; q++) {
+      if (!results[q].success) continue;
+      if (results[q].projectItem) {
+        importedCount++;
+      } else {
+        results[q] = { success: false, error: "File was not added to the project", path: results[q].path };
+      }
+    }
+
+    // One Source Monitor open per batch instead of one per file
+    //@ts-ignore - ExtendScript globals
+    if (lastItem && app.sourceMonitor) {
+      try {
+        //@ts-ignore - ExtendScript globals
+        app.sourceMonitor.openProjectItem(lastItem);
+      } catch (e) {
+        // Import succeeded even if the Source Monitor cannot open the item
+      }
+    }
+
+    return { success: importedCount > 0, results: results };
+  } catch (e) {
+    var failed = [];
+    for (var m = 0; m < videoPaths.length; m++) {
+      failed.push({ success: false, error: String(e), path: videoPaths[m] });
+    }
+    return { success: false, error: String(e), results: failed };
+  }
+};